@@ -0,0 +1,330 @@
+# analytics.py
+import hashlib
+import io
+import itertools
+import os
+import threading
+import time
+import numpy as np
+import pandas as pd
+from data_store import CROP_DATA_PATH, load_table_snapshot
+
+# Historical statistics of the crop dataset, pre-aggregated for every
+# combination of district, crop, season and sowing month. Each finest
+# (district, crop, season, month) cell keeps a fixed-bin histogram and a sum
+# per metric; histograms add up, so every roll-up ("all districts", "all
+# months", ...) is a sum of cells and appended rows only touch their cells.
+# The roll-ups are stored as dense arrays with one extra "all" slot per
+# dimension, so a query is a single index into them.
+
+DIMENSIONS = ["district", "crop", "season", "sowing_month"]
+METRICS = ["yield_kg_per_ha", "harvest_days", "fertilizer_N_kg_ha", "fertilizer_P_kg_ha", "fertilizer_K_kg_ha"]
+QUANTILES = (0.10, 0.25, 0.50, 0.75, 0.90)
+QUANTILE_NAMES = ("p10", "p25", "median", "p75", "p90")
+# Quantiles are interpolated within histogram bins, so they are exact to
+# about (max - min) / HISTOGRAM_BINS of each metric
+HISTOGRAM_BINS = 256
+RANGE_PADDING = 0.1
+MONTHS = list(range(1, 13))
+# Bytes at the start of the CSV (header and first rows) and just before the
+# refresh offset that must be unchanged for appended rows to be folded in
+CHECKSUM_BLOCK_BYTES = 64 * 1024
+
+class CubeView:
+    """
+    Immutable snapshot of the roll-up arrays. Every array is indexed by one
+    code per dimension, where code len(labels[dim]) means "all".
+    """
+
+    def __init__(self, labels: dict, rows, counts, sums, quantiles, n_source_rows: int):
+        self.labels = labels
+        self.codes = {dim: {self.normalize(value): i for i, value in enumerate(values)} for dim, values in labels.items()}
+        self.rows = rows  # (..., ) rows per cell
+        self.counts = counts  # (..., n_metrics) non-missing values per metric
+        self.sums = sums  # (..., n_metrics)
+        self.quantiles = quantiles  # (..., n_metrics, n_quantiles) float32
+        self.n_source_rows = n_source_rows
+        self.built_at = time.time()
+
+    @staticmethod
+    def normalize(value) -> str:
+        return str(value).strip().lower()
+
+    def index(self, filters: dict) -> list:
+        """One code per dimension for {dim: value} filters; KeyError naming an unknown value"""
+        index = []
+        for dim in DIMENSIONS:
+            value = filters.get(dim)
+            if value is None:
+                index.append(len(self.labels[dim]))
+                continue
+            code = self.codes[dim].get(self.normalize(value))
+            if code is None:
+                raise KeyError(f"{dim} '{value}'")
+            index.append(code)
+        return index
+
+    def cell(self, index) -> dict:
+        index = tuple(index)
+        counts = self.counts[index]
+        stats = {}
+        for m, metric in enumerate(METRICS):
+            if counts[m] == 0:
+                continue
+            stats[metric] = {"count": int(counts[m]), "mean": round(float(self.sums[index][m] / counts[m]), 2)}
+            stats[metric].update(
+                (name, round(float(value), 2)) for name, value in zip(QUANTILE_NAMES, self.quantiles[index][m])
+            )
+        return {"rows": int(self.rows[index]), "metrics": stats}
+
+    def query(self, filters: dict) -> dict:
+        """Statistics of all rows matching the filters; dimensions left out are rolled up"""
+        return self.cell(self.index(filters))
+
+    def breakdown(self, dimension: str, filters: dict) -> list:
+        """Statistics for every value of one dimension under the other filters, empty groups left out"""
+        axis = DIMENSIONS.index(dimension)
+        index = self.index({dim: value for dim, value in filters.items() if dim != dimension})
+        groups = []
+        for code, label in enumerate(self.labels[dimension]):
+            index[axis] = code
+            if self.rows[tuple(index)] > 0:
+                groups.append(dict(self.cell(index), **{dimension: label}))
+        return groups
+
+class StatsCube:
+    """
+    Builds the cube from the crop dataset once, then folds in rows appended
+    to the CSV without rescanning it. Queries read the current CubeView,
+    which refreshes replace with a single assignment.
+    """
+
+    def __init__(self, path: str = CROP_DATA_PATH, watch_interval: float = 0.0):
+        self.path = path
+        self.watch_interval = watch_interval
+        self.view = None
+        self.last_error = None
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.labels = {dim: [] for dim in DIMENSIONS}
+        self.labels["sowing_month"] = list(MONTHS)
+        self._label_codes = {dim: {CubeView.normalize(v): i for i, v in enumerate(values)}
+                             for dim, values in self.labels.items()}
+        self.cell_keys = np.zeros((0, len(DIMENSIONS)), dtype=np.int64)
+        self._cell_index = {}
+        self.cell_rows = np.zeros(0, dtype=np.int64)
+        self.cell_sums = np.zeros((0, len(METRICS)))
+        self.cell_hist = np.zeros((0, len(METRICS), HISTOGRAM_BINS), dtype=np.uint32)
+        self.edges = None
+        self.offset = 0
+        self.checksum = None
+        self.columns = None
+        self.n_source_rows = 0
+
+    def _codes(self, dim: str, values) -> np.ndarray:
+        """Codes of a column, registering values not seen before"""
+        uniques, inverse = np.unique(np.asarray(values, dtype=str), return_inverse=True)
+        mapping = np.empty(len(uniques), dtype=np.int64)
+        codes = self._label_codes[dim]
+        for i, value in enumerate(uniques):
+            key = CubeView.normalize(value)
+            if key not in codes:
+                codes[key] = len(self.labels[dim])
+                self.labels[dim].append(str(value))
+            mapping[i] = codes[key]
+        return mapping[inverse.ravel()]
+
+    def _ingest(self, frame: pd.DataFrame):
+        frame = frame.dropna(subset=["district", "crop", "season", "sowing_date"])
+        if frame.empty:
+            return
+        values = frame[METRICS].to_numpy(dtype=np.float64)
+        if self.edges is None:
+            # Bin ranges are fixed by the first data seen; later outliers land in the end bins
+            with np.errstate(all="ignore"):
+                low, high = np.nanmin(values, axis=0), np.nanmax(values, axis=0)
+            low, high = np.nan_to_num(low), np.nan_to_num(high, nan=1.0)
+            pad = np.maximum((high - low) * RANGE_PADDING, 1.0)
+            self.edges = np.linspace(low - pad, high + pad, HISTOGRAM_BINS + 1, axis=1)
+
+        months = pd.to_datetime(frame["sowing_date"]).dt.month.to_numpy()
+        keys = np.column_stack([
+            self._codes("district", frame["district"]),
+            self._codes("crop", frame["crop"]),
+            self._codes("season", frame["season"]),
+            months - 1,
+        ])
+
+        # Rows -> finest cells, appending cells seen for the first time
+        unique_keys, inverse = np.unique(keys, axis=0, return_inverse=True)
+        inverse = inverse.ravel()
+        cell_of_key = np.empty(len(unique_keys), dtype=np.int64)
+        new_keys = []
+        for i, key in enumerate(map(tuple, unique_keys)):
+            if key not in self._cell_index:
+                self._cell_index[key] = len(self.cell_keys) + len(new_keys)
+                new_keys.append(key)
+            cell_of_key[i] = self._cell_index[key]
+        if new_keys:
+            n_new = len(new_keys)
+            self.cell_keys = np.concatenate([self.cell_keys, np.asarray(new_keys, dtype=np.int64)])
+            self.cell_rows = np.concatenate([self.cell_rows, np.zeros(n_new, dtype=np.int64)])
+            self.cell_sums = np.concatenate([self.cell_sums, np.zeros((n_new, len(METRICS)))])
+            self.cell_hist = np.concatenate([self.cell_hist, np.zeros((n_new, len(METRICS), HISTOGRAM_BINS), np.uint32)])
+        cells = cell_of_key[inverse]
+        n_cells = len(self.cell_keys)
+
+        self.cell_rows += np.bincount(cells, minlength=n_cells)
+        present = ~np.isnan(values)
+        width = self.edges[:, 1] - self.edges[:, 0]
+        bins = np.clip(((np.nan_to_num(values) - self.edges[:, 0]) // width).astype(np.int64), 0, HISTOGRAM_BINS - 1)
+        metric = np.broadcast_to(np.arange(len(METRICS)), values.shape)
+        flat = ((cells[:, None] * len(METRICS) + metric) * HISTOGRAM_BINS + bins)[present]
+        self.cell_hist += np.bincount(flat, minlength=self.cell_hist.size).reshape(self.cell_hist.shape).astype(np.uint32)
+        for m in range(len(METRICS)):
+            self.cell_sums[:, m] += np.bincount(cells[present[:, m]], values[present[:, m], m], minlength=n_cells)
+        self.n_source_rows += len(frame)
+
+    def _quantiles(self, hist: np.ndarray) -> np.ndarray:
+        """(n, n_metrics, n_quantiles) values by linear interpolation inside the histogram bins"""
+        cum = np.cumsum(hist, axis=-1, dtype=np.int64)
+        total = cum[..., -1:]
+        targets = total * np.asarray(QUANTILES)  # (n, n_metrics, n_quantiles)
+        idx = np.minimum((cum[..., None, :] < targets[..., None]).sum(axis=-1), HISTOGRAM_BINS - 1)
+        before = np.where(idx > 0, np.take_along_axis(cum, np.maximum(idx - 1, 0), axis=-1), 0)
+        in_bin = np.maximum(np.take_along_axis(hist, idx, axis=-1), 1)
+        frac = np.clip((targets - before) / in_bin, 0.0, 1.0)
+        low = self.edges[np.arange(len(METRICS))[:, None], idx]
+        width = (self.edges[:, 1] - self.edges[:, 0])[:, None]
+        return (low + frac * width).astype(np.float32)
+
+    def _build_view(self) -> CubeView:
+        sizes = [len(self.labels[dim]) for dim in DIMENSIONS]
+        shape = tuple(size + 1 for size in sizes)
+        n_metrics = len(METRICS)
+        rows = np.zeros(shape, dtype=np.int64)
+        counts = np.zeros(shape + (n_metrics,), dtype=np.int64)
+        sums = np.zeros(shape + (n_metrics,))
+        quantiles = np.full(shape + (n_metrics, len(QUANTILES)), np.nan, dtype=np.float32)
+
+        if len(self.cell_keys):
+            # Every subset of dimensions rolled up into their "all" slot
+            for rolled in itertools.product([False, True], repeat=len(DIMENSIONS)):
+                keys = np.where(rolled, sizes, self.cell_keys)
+                unique_keys, inverse = np.unique(keys, axis=0, return_inverse=True)
+                order = np.argsort(inverse.ravel(), kind="stable")
+                starts = np.flatnonzero(np.r_[True, np.diff(inverse.ravel()[order]) != 0])
+                hist = np.add.reduceat(self.cell_hist[order].astype(np.int64), starts, axis=0)
+                at = tuple(unique_keys.T)
+                rows[at] = np.add.reduceat(self.cell_rows[order], starts)
+                sums[at] = np.add.reduceat(self.cell_sums[order], starts, axis=0)
+                counts[at] = hist.sum(axis=-1)
+                quantiles[at] = self._quantiles(hist)
+
+        labels = {dim: list(values) for dim, values in self.labels.items()}
+        return CubeView(labels, rows, counts, sums, quantiles, self.n_source_rows)
+
+    def _read_appended(self) -> pd.DataFrame:
+        """Complete CSV lines written since the last refresh, parsed like the original file"""
+        size = os.path.getsize(self.path)
+        if size <= self.offset:
+            return pd.DataFrame()
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            data = f.read(size - self.offset)
+        end = data.rfind(b"\n") + 1  # a line still being written is read next time
+        if end == 0:
+            return pd.DataFrame()
+        self.offset += end
+        return pd.read_csv(io.BytesIO(data[:end]), names=self.columns, header=None, parse_dates=["sowing_date"])
+
+    def _source_checksum(self) -> str:
+        """
+        Digest of the file's identity, its first block and the block ending
+        at the offset. Appends leave it unchanged; an in-place rewrite or a
+        replaced file changes it, even when the new file is just as large.
+        """
+        digest = hashlib.sha1()
+        with open(self.path, "rb") as f:
+            digest.update(str(os.fstat(f.fileno()).st_ino).encode())
+            digest.update(f.read(min(self.offset, CHECKSUM_BLOCK_BYTES)))
+            tail = max(self.offset - CHECKSUM_BLOCK_BYTES, 0)
+            f.seek(tail)
+            digest.update(f.read(self.offset - tail))
+        return digest.hexdigest()
+
+    def build(self):
+        """Full build from the columnar store or the CSV"""
+        with self._lock:
+            self._reset()
+            if os.path.exists(self.path):
+                self.columns = list(pd.read_csv(self.path, nrows=0).columns)
+            # Refreshes continue from the bytes this build actually covered
+            frame, self.offset = load_table_snapshot(self.path)
+            self.checksum = self._source_checksum()
+            self._ingest(frame)
+            self.view = self._build_view()
+        print(f"Stats cube built from {self.n_source_rows} rows, {len(self.cell_keys)} cells")
+
+    def refresh(self) -> int:
+        """
+        Folds in appended rows and returns how many. A file that shrank or
+        whose already-read bytes changed is rebuilt from scratch, and all
+        of its rows are returned.
+        """
+        if self.columns is None or not os.path.exists(self.path):
+            return 0
+        if os.path.getsize(self.path) < self.offset or self._source_checksum() != self.checksum:
+            self.build()
+            return self.n_source_rows
+        with self._lock:
+            frame = self._read_appended()
+            if frame.empty:
+                return 0
+            self._ingest(frame)
+            self.checksum = self._source_checksum()
+            self.view = self._build_view()  # atomic swap
+        return len(frame)
+
+    def _build_safely(self):
+        try:
+            self.build()
+            self.last_error = None
+        except Exception as e:
+            self.last_error = str(e)
+            print(f"Warning: building the stats cube from {self.path} failed: {e}")
+
+    def _watch(self):
+        while True:
+            time.sleep(self.watch_interval)
+            try:
+                self.refresh()
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"Warning: refreshing the stats cube failed: {e}")
+
+    def _build_and_watch(self):
+        self._build_safely()
+        if self.watch_interval > 0:
+            self._watch()
+
+    def start(self, background: bool = True):
+        if background:
+            threading.Thread(target=self._build_and_watch, name="stats-cube", daemon=True).start()
+            return
+        self._build_safely()
+        if self.watch_interval > 0:
+            threading.Thread(target=self._watch, name="stats-watcher", daemon=True).start()
+
+    def info(self) -> dict:
+        view = self.view
+        return {
+            "path": self.path,
+            "ready": view is not None,
+            "source_rows": view.n_source_rows if view is not None else 0,
+            "cells": len(self.cell_keys),
+            "nbytes": (view.rows.nbytes + view.counts.nbytes + view.sums.nbytes + view.quantiles.nbytes) if view else 0,
+            "error": self.last_error,
+        }
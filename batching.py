@@ -0,0 +1,79 @@
+# batching.py
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-item calls into batches.
+
+    Callers await submit(item). Items that arrive within window_ms of the
+    first one (up to max_batch_size) are passed together to score_batch,
+    which runs on a thread pool and must return one result per item. Each
+    result is handed back to the caller that submitted it; an exception
+    raised by score_batch is re-raised in every caller of that batch.
+    """
+
+    def __init__(self, score_batch: Callable[[list], List], window_ms: float = 2.0,
+                 max_batch_size: int = 256, workers: int = 1):
+        self.score_batch = score_batch
+        self.window = max(window_ms, 0.0) / 1000.0
+        self.max_batch_size = max(max_batch_size, 1)
+        self.workers = max(workers, 1)
+        self._loop = None
+        self._queue = None
+        self._tasks = []
+        self._executor = None
+
+    def _ensure_started(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        # First call, or the app is now served from a different event loop
+        for task in self._tasks:
+            task.cancel()
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="predict-batch")
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        self._tasks = [loop.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def submit(self, item):
+        self._ensure_started()
+        future = self._loop.create_future()
+        self._queue.put_nowait((item, future))
+        return await future
+
+    async def _collect(self) -> list:
+        batch = [await self._queue.get()]
+        deadline = self._loop.time() + self.window
+        while len(batch) < self.max_batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - self._loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _worker(self):
+        while True:
+            batch = await self._collect()
+            items = [item for item, _ in batch]
+            try:
+                results = await self._loop.run_in_executor(self._executor, self.score_batch, items)
+                error = None
+            except Exception as e:
+                results, error = None, e
+
+            for i, (_, future) in enumerate(batch):
+                if future.done():
+                    continue  # caller went away
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(results[i])
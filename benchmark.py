@@ -0,0 +1,281 @@
+# benchmark.py
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import time
+import timeit
+from datetime import datetime
+from types import SimpleNamespace
+import numpy as np
+import pandas as pd
+
+# Micro-benchmarks of the hot functions and an in-process load test of the
+# FastAPI app. Results are written as JSON and can be compared against a
+# stored baseline:
+#
+#   python benchmark.py --save-baseline            # record benchmark_baseline.json
+#   python benchmark.py --baseline benchmark_baseline.json --threshold 0.15
+
+PIPE_PATH = "odisha_crop_pipeline.joblib"
+DATA_PATH = "odisha_all_districts_crop_data.csv"
+DEFAULT_OUTPUT = "benchmark_results.json"
+DEFAULT_BASELINE = "benchmark_baseline.json"
+
+SAMPLE_REQUEST = {"district": "Cuttack", "crop": "Rice", "season": "Kharif", "sowing_date": "2024-06-15"}
+SAMPLE_RESPONSE = {
+    "predicted_environmental_conditions": {"season_total_rainfall_mm": 990.4, "season_avg_temp_c": 28.8, "season_avg_humidity": 80.3},
+    "predicted_soil_conditions": {"soil_pH": 6.6, "soil_N_kg_ha": 236.8, "soil_P_kg_ha": 40.2, "soil_K_kg_ha": 198.1,
+                                  "organic_carbon_pct": 1.06, "soil_moisture_pct": 26.9},
+    "predicted_fertilizer_recommendation": {"N": 99.1, "P": 38.5, "K": 44.6},
+    "predicted_yield_kg_per_ha": 4406.43,
+    "predicted_harvest_days": 137.0,
+}
+
+# Metrics where a larger number is an improvement; everything else is a latency
+HIGHER_IS_BETTER = {"ops_per_s", "rps"}
+# How long the load test waits for a model load that is already running
+MODEL_READY_TIMEOUT_S = 600
+
+def measure(fn, repeat: int = 5, min_time: float = 0.2) -> dict:
+    """Per-call time of fn: loops are calibrated to ~min_time per repeat, median and best of `repeat`"""
+    timer = timeit.Timer(fn)
+    loops, _ = timer.autorange()
+    loops = max(1, int(loops * min_time / 0.2))
+    per_call = [t / loops for t in timer.repeat(repeat=repeat, number=loops)]
+    median = float(np.median(per_call))
+    return {
+        "median_us": median * 1e6,
+        "min_us": min(per_call) * 1e6,
+        "ops_per_s": 1.0 / median,
+        "loops": loops,
+    }
+
+def sample_requests(n: int, seed: int = 0) -> list:
+    """Realistic request bodies drawn from the crop dataset"""
+    df = pd.read_csv(DATA_PATH, usecols=["district", "crop", "season", "sowing_date"])
+    rows = df.sample(n=n, replace=len(df) < n, random_state=seed)
+    return [row._asdict() for row in rows.itertuples(index=False)]
+
+def micro_benchmarks(repeat: int) -> dict:
+    from climate import climate
+    from simple_fertilizer_recommender import CROPS, recommend_fertilizer, recommend_fertilizer_batch
+    import report_utils
+
+    rng = np.random.default_rng(0)
+    plot_crops = rng.choice(CROPS, 100_000)
+    plot_soil = rng.uniform(0, 400, size=(3, 100_000))
+
+    benches = {
+        "get_rainfall_forecast": lambda: climate.rainfall_forecast("Cuttack", "2024-06-15"),
+        "get_avg_temperature": lambda: climate.avg_temperature("Cuttack", 6, 15, days=100),
+        "recommend_fertilizer": lambda: recommend_fertilizer("rice", 200.0, 40.0, 180.0),
+        "recommend_fertilizer_batch_100k": lambda: recommend_fertilizer_batch(plot_crops, *plot_soil),
+        "generate_pdf_report": lambda: report_utils.generate_pdf_report(
+            SimpleNamespace(**SAMPLE_RESPONSE), SimpleNamespace(**SAMPLE_REQUEST)
+        ),
+    }
+
+    if os.path.exists(PIPE_PATH):
+        from model_registry import ModelVersion
+        from train_model import feature_cols
+        version = ModelVersion("benchmark", PIPE_PATH)
+        pipeline = version.get_pipeline()
+        batch = pd.DataFrame(sample_requests(1000))
+        batch["sowing_doy"] = pd.to_datetime(batch["sowing_date"]).dt.dayofyear
+        batch = batch[feature_cols]
+        one_row = batch.iloc[:1]
+        benches["pipeline_predict_single"] = lambda: pipeline.predict(one_row)
+        benches["pipeline_predict_batch_1000"] = lambda: pipeline.predict(batch)
+        if version.fast_path is not None:
+            row = one_row.iloc[0]
+            benches["fast_path_predict_one"] = lambda: version.fast_path.predict_one(row.district, row.crop, row.season, row.sowing_doy)
+    else:
+        print(f"Warning: {PIPE_PATH} not found, skipping pipeline.predict benchmarks. Train the model first.")
+
+    results = {}
+    for name, fn in benches.items():
+        results[name] = measure(fn, repeat=repeat)
+        print(f"{name:32s} {results[name]['median_us']:12.1f} us/call  ({results[name]['ops_per_s']:.0f}/s)")
+    return results
+
+async def _load_test(app, method: str, path: str, bodies: list, n_requests: int, concurrency: int,
+                     reset=None) -> dict:
+    """Latency percentiles and throughput; reset, if given, runs between the warm-up and the timed requests"""
+    import httpx
+
+    latencies = []
+    errors = 0
+    next_index = 0
+
+    async def worker(client):
+        nonlocal errors, next_index
+        while next_index < n_requests:
+            body = bodies[next_index % len(bodies)]
+            next_index += 1
+            start = time.perf_counter()
+            response = await client.request(method, path, json=body)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        # Warm-up so lazy model loading and the first batcher start are not measured
+        await client.request(method, path, json=bodies[0])
+        if reset is not None:
+            reset()
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    ms = np.asarray(latencies) * 1000
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "concurrency": concurrency,
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p95_ms": float(np.percentile(ms, 95)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "rps": len(latencies) / elapsed,
+    }
+
+def wait_until_ready(registry, timeout: float):
+    """Block until the default model serves; exits if it failed to load or timed out"""
+    deadline = time.monotonic() + timeout
+    while not registry.ready():
+        if registry.default not in registry.loading:
+            sys.exit(f"❌ Model not loaded: {registry.last_error.get(registry.default, 'unknown error')}")
+        if time.monotonic() > deadline:
+            sys.exit(f"❌ Model not loaded after {timeout:.0f}s")
+        time.sleep(0.1)
+
+def clear_caches():
+    import main
+    main.prediction_cache.clear()
+    main.report_cache.clear()
+
+def load_benchmarks(endpoints, concurrency_levels, n_requests: int) -> dict:
+    # Load the model before the first request, so no request meets a 503
+    os.environ.setdefault("MODEL_BACKGROUND_LOAD", "0")
+    import main
+    # The in-process transport sends no lifespan events
+    main.start_services()
+    wait_until_ready(main.registry, MODEL_READY_TIMEOUT_S)
+
+    bodies = sample_requests(max(n_requests, 1))
+    results = {}
+    for endpoint in endpoints:
+        for concurrency in concurrency_levels:
+            if endpoint == "/predict/batch":
+                # 100-item batches so the cost per call is comparable across runs
+                payload = [{"items": bodies[i:i + 100]} for i in range(0, len(bodies), 100)]
+            else:
+                payload = bodies
+            count = n_requests if endpoint != "/download-report" else max(1, n_requests // 10)
+            # Every run starts cold, so earlier runs over the same bodies do not turn it into a cache benchmark
+            result = asyncio.run(_load_test(main.app, "POST", endpoint, payload, count, concurrency, reset=clear_caches))
+            name = f"{endpoint}@c{concurrency}"
+            results[name] = result
+            print(f"{name:32s} p50 {result['p50_ms']:8.2f} ms  p95 {result['p95_ms']:8.2f} ms  "
+                  f"p99 {result['p99_ms']:8.2f} ms  {result['rps']:8.0f} req/s  {result['errors']} errors")
+    return results
+
+def compare(current: dict, baseline: dict, threshold: float) -> list:
+    """
+    Every metric that got worse than the baseline by more than threshold (a
+    fraction), and any increase in failed requests
+    """
+    regressions = []
+    for section in ("micro", "load"):
+        for name, metrics in current.get(section, {}).items():
+            base = baseline.get(section, {}).get(name)
+            if base is None:
+                continue
+            for metric, value in metrics.items():
+                if metric == "errors":
+                    old = base.get(metric, 0)
+                    if value > old:
+                        regressions.append((f"{section}.{name}.{metric}", old, value, (value - old) / old if old else float("inf")))
+                    continue
+                if metric not in base or metric in ("loops", "requests", "concurrency", "min_us"):
+                    continue
+                old = base[metric]
+                if not old:
+                    continue
+                change = (value - old) / old
+                worse = change < -threshold if metric in HIGHER_IS_BETTER else change > threshold
+                if worse:
+                    regressions.append((f"{section}.{name}.{metric}", old, value, change))
+    return regressions
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the Odisha crop prediction service")
+    parser.add_argument("--suite", choices=["all", "micro", "load"], default="all")
+    parser.add_argument("--repeat", type=int, default=5, help="repeats per micro-benchmark")
+    parser.add_argument("--endpoints", default="/predict,/predict/batch",
+                        help="comma-separated endpoints for the load test, e.g. /predict,/download-report")
+    parser.add_argument("--concurrency", default="1,8,32", help="comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=2000, help="requests per load-test run")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="where to write the results JSON")
+    parser.add_argument("--baseline", default=None, help="results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="allowed slowdown as a fraction before a metric counts as a regression")
+    parser.add_argument("--save-baseline", action="store_true", help=f"also write the results to {DEFAULT_BASELINE}")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    results = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+    }
+    if args.suite in ("all", "micro"):
+        print("Micro-benchmarks:")
+        results["micro"] = micro_benchmarks(args.repeat)
+    if args.suite in ("all", "load"):
+        print("\nLoad test:")
+        endpoints = [e.strip() for e in args.endpoints.split(",") if e.strip()]
+        levels = [int(c) for c in args.concurrency.split(",") if c.strip()]
+        results["load"] = load_benchmarks(endpoints, levels, args.requests)
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\n✅ Results saved as {args.output}")
+    if args.save_baseline:
+        with open(DEFAULT_BASELINE, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"✅ Baseline saved as {DEFAULT_BASELINE}")
+
+    failed = False
+    # Timings of failing requests are meaningless, so any error fails the run
+    errors = {name: result["errors"] for name, result in results.get("load", {}).items() if result["errors"]}
+    if errors:
+        print("\n❌ Requests failed during the load test:")
+        for name, count in errors.items():
+            print(f"  {name}: {count} errors")
+        failed = True
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regressions over {args.threshold:.0%}:")
+            for name, old, new, change in regressions:
+                print(f"  {name}: {old:.3f} -> {new:.3f} ({change:+.1%})")
+            failed = True
+        else:
+            print(f"\n✅ No regressions over {args.threshold:.0%} against {args.baseline}")
+
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
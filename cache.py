@@ -0,0 +1,143 @@
+# cache.py
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+class LRUCache:
+    """
+    Thread-safe LRU cache bounded by an approximate memory budget.
+
+    Callers pass the size of each value in bytes; least recently used
+    entries are evicted until the total fits in max_bytes.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, nbytes: int):
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.current_bytes -= old[1]
+            self._entries[key] = (value, nbytes)
+            self.current_bytes += nbytes
+            while self.current_bytes > self.max_bytes:
+                _, (_, evicted_bytes) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_bytes
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+class ArtifactFingerprint:
+    """
+    Digest of the size and mtime of a set of files, re-checked at most once
+    per check_interval seconds. Anything derived from those files should be
+    keyed on (or invalidated by) the fingerprint.
+    """
+
+    def __init__(self, paths, check_interval: float = 1.0):
+        self.paths = list(paths)
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._checked_at = 0.0
+        self.value = self._compute()
+
+    def _compute(self) -> str:
+        digest = hashlib.sha1()
+        for path in self.paths:
+            try:
+                stat = os.stat(path)
+                digest.update(f"{path}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+            except OSError:
+                digest.update(f"{path}:missing;".encode())
+        return digest.hexdigest()
+
+    def check(self):
+        """Returns (fingerprint, changed_since_last_check)"""
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return self.value, False
+        with self._lock:
+            self._checked_at = now
+            value = self._compute()
+            changed = value != self.value
+            self.value = value
+            return value, changed
+
+# Digests by (path, size, mtime_ns), so a file is hashed once per process
+_digests = {}
+
+def artifact_signature(path: str) -> dict:
+    """
+    Size, mtime and SHA-256 of the file a derived artifact was built from.
+    Compare it with matches_signature, which only hashes when the mtime moved.
+    """
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    if key not in _digests:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(2**20), b""):
+                digest.update(block)
+        _digests[key] = digest.hexdigest()
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": _digests[key]}
+
+def matches_signature(path: str, recorded) -> bool:
+    """
+    Whether path still matches a signature recorded by artifact_signature.
+    Same size and mtime is taken as a match without reading the file; the
+    content hash only settles it when the mtime changed, e.g. after a copy
+    or checkout of the same bytes.
+    """
+    if not isinstance(recorded, dict):
+        return False
+    stat = os.stat(path)
+    if stat.st_size != recorded.get("size"):
+        return False
+    if stat.st_mtime_ns == recorded.get("mtime_ns"):
+        return True
+    return artifact_signature(path)["sha256"] == recorded.get("sha256")
+
+def make_etag(fingerprint: str, key) -> str:
+    return '"' + hashlib.sha1(f"{fingerprint}:{key!r}".encode()).hexdigest() + '"'
+
+def etag_matches(if_none_match, etag: str) -> bool:
+    """True if an If-None-Match header value matches etag"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
@@ -0,0 +1,327 @@
+# climate.py
+import re
+import threading
+import time
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from cache import ArtifactFingerprint
+from data_store import RAINFALL_PATH, TEMPERATURE_PATH, load_table
+
+# Rainfall and temperature lookups behind one service. District names are
+# interned once into integer ids shared by every dataset, and each dataset
+# is a set of prefix-sum arrays indexed by those ids, so a lookup is a dict
+# hit plus a few array reads. A watcher rebuilds a dataset whose file
+# changed and swaps it in with a single assignment.
+
+# Climatology is laid out on a leap reference year so every MM-DD has a slot
+REF_YEAR = 2000
+DAYS_IN_REF_YEAR = 366
+FORECAST_DAYS = 100
+TEMPERATURE_DAYS = 75
+# Offset of the first day of each month within the reference year
+MONTH_OFFSETS = np.cumsum([0, 31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30]).tolist()
+
+# Spellings that name the same district, by normalized key
+DISTRICT_ALIASES = {
+    "khurda": "khordha",
+    "baleshwar": "balasore",
+    "bolangir": "balangir",
+    "baudh": "boudh",
+    "debagarh": "deogarh",
+    "jagatsinghapur": "jagatsinghpur",
+    "kendujhar": "keonjhar",
+    "nawarangpur": "nabarangpur",
+    "sonepur": "subarnapur",
+    "sundergarh": "sundargarh",
+    "anugul": "angul",
+}
+# Raw spellings DistrictTable remembers; later ones are resolved on every lookup
+MAX_RESOLVED_NAMES = 4096
+
+class DistrictTable:
+    """
+    Interns district names to integer ids. Names are compared by a key with
+    case, spacing and punctuation removed and aliases resolved, and raw
+    spellings that resolved once are remembered, so repeat lookups do no
+    string work.
+    """
+
+    def __init__(self):
+        self.ids = {}
+        self.names = []
+        self._resolved = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def normalize(name) -> str:
+        key = re.sub(r"[^a-z0-9]", "", str(name).lower())
+        return DISTRICT_ALIASES.get(key, key)
+
+    def intern(self, name) -> int:
+        """Id of a district, registering it (with its title-cased name) if it is new"""
+        key = self.normalize(name)
+        with self._lock:
+            if key not in self.ids:
+                self.ids[key] = len(self.names)
+                self.names.append(str(name).strip().title())
+            return self.ids[key]
+
+    def lookup(self, name) -> int:
+        """Id of a known district, -1 otherwise"""
+        district_id = self._resolved.get(name)
+        if district_id is None:
+            district_id = self.ids.get(self.normalize(name), -1)
+            # Only hits are remembered, and at most MAX_RESOLVED_NAMES spellings
+            # of them, since punctuation and case give endless variants
+            if district_id >= 0 and len(self._resolved) < MAX_RESOLVED_NAMES:
+                self._resolved[name] = district_id
+        return district_id
+
+    def lookup_batch(self, names) -> np.ndarray:
+        """Ids for an array of names, -1 where unknown; each distinct spelling is resolved once"""
+        inverse, uniques = pd.factorize(np.asarray(names, dtype=object), use_na_sentinel=False)
+        ids = np.fromiter((self.lookup(name) for name in uniques), dtype=np.int64, count=len(uniques))
+        return ids[inverse]
+
+def day_offsets(months, days_of_month) -> np.ndarray:
+    """Offset of MM-DD within the reference year"""
+    months = np.asarray(months, dtype=np.int64)
+    return np.asarray(MONTH_OFFSETS, dtype=np.int64)[months - 1] + np.asarray(days_of_month, dtype=np.int64) - 1
+
+class RainfallData:
+    """
+    Daily rainfall climatology from monthly totals. cum[i, d] is the rainfall
+    of district id i over reference days [0, d), so any window sum is
+    cum[i, end] - cum[i, start]; coverage does the same for days with data.
+    Several rows for one district and month (years, aliases) are averaged.
+    """
+
+    def __init__(self, df: pd.DataFrame, districts: DistrictTable):
+        self.cum = np.zeros((0, DAYS_IN_REF_YEAR + 1))
+        self.coverage = np.zeros((0, DAYS_IN_REF_YEAR + 1), dtype=np.int32)
+        self.available = []
+        if df.empty:
+            return
+
+        ids = np.fromiter((districts.intern(name) for name in df["District"]), dtype=np.int64, count=len(df))
+        monthly = pd.DataFrame({"id": ids, "month": df["Date"].dt.month.to_numpy(),
+                                "rainfall": df["Rainfall_mm"].to_numpy(dtype=float)})
+        monthly = monthly.groupby(["id", "month"], as_index=False)["rainfall"].mean()
+
+        n_ids = len(districts.names)
+        daily = np.zeros((n_ids, DAYS_IN_REF_YEAR))
+        covered = np.zeros((n_ids, DAYS_IN_REF_YEAR), dtype=np.int32)
+        lengths = np.diff(MONTH_OFFSETS + [DAYS_IN_REF_YEAR])
+        for district_id, month, amount in monthly.itertuples(index=False):
+            start, length = MONTH_OFFSETS[month - 1], lengths[month - 1]
+            daily[district_id, start:start + length] = amount / length
+            covered[district_id, start:start + length] = 1
+
+        self.cum = np.zeros((n_ids, DAYS_IN_REF_YEAR + 1))
+        np.cumsum(daily, axis=1, out=self.cum[:, 1:])
+        self.coverage = np.zeros((n_ids, DAYS_IN_REF_YEAR + 1), dtype=np.int32)
+        np.cumsum(covered, axis=1, out=self.coverage[:, 1:])
+        self.available = sorted(districts.names[i] for i in monthly["id"].unique())
+
+    @property
+    def nbytes(self) -> int:
+        return self.cum.nbytes + self.coverage.nbytes
+
+    def window_sums(self, cum: np.ndarray, ids: np.ndarray, starts: np.ndarray, days: int) -> np.ndarray:
+        ends = starts + days
+        head = cum[ids, np.minimum(ends, DAYS_IN_REF_YEAR)] - cum[ids, starts]
+        # wrap-around into the start of the reference year
+        tail = np.where(ends > DAYS_IN_REF_YEAR, cum[ids, np.maximum(ends - DAYS_IN_REF_YEAR, 0)], 0)
+        return head + tail
+
+    def window_sum(self, cum: np.ndarray, district_id: int, start: int, days: int) -> float:
+        end = start + days
+        if end <= DAYS_IN_REF_YEAR:
+            return float(cum[district_id, end] - cum[district_id, start])
+        return float((cum[district_id, DAYS_IN_REF_YEAR] - cum[district_id, start]) + cum[district_id, end - DAYS_IN_REF_YEAR])
+
+    def totals(self, ids: np.ndarray, starts: np.ndarray, days: int = FORECAST_DAYS) -> np.ndarray:
+        """Window totals per (id, start day), NaN for unknown ids or windows without data"""
+        if not len(self.cum):
+            return np.full(len(ids), np.nan)
+        known = (ids >= 0) & (ids < len(self.cum))
+        ids = np.where(known, ids, 0)
+        totals = self.window_sums(self.cum, ids, starts, days)
+        totals[~known | (self.window_sums(self.coverage, ids, starts, days) == 0)] = np.nan
+        return totals
+
+class TemperatureData:
+    """
+    Monthly temperatures expanded to one value per calendar day, so each
+    month is weighted by the number of its days inside a window, then
+    prefix-summed per district id along with a count of days with data.
+    """
+
+    def __init__(self, df: pd.DataFrame, districts: DistrictTable):
+        self.cum = np.zeros((0, 1))
+        self.count = np.zeros((0, 1), dtype=np.int64)
+        self.month_offsets = np.zeros(12, dtype=np.int64)
+        self.available = []
+        if df.empty:
+            return
+
+        ids = np.fromiter((districts.intern(name) for name in df["District"]), dtype=np.int64, count=len(df))
+        n_ids = len(districts.names)
+        month_starts = pd.DatetimeIndex(df["Date"])
+        months = pd.date_range(month_starts.min(), month_starts.max(), freq="MS")
+        matrix = np.full((n_ids, len(months)), np.nan)
+        matrix[ids, months.get_indexer(month_starts)] = df["Temp_C"].to_numpy(dtype=float)
+
+        daily = np.repeat(matrix, months.days_in_month.to_numpy(), axis=1)
+        has_value = ~np.isnan(daily)
+        self.cum = np.zeros((n_ids, daily.shape[1] + 1))
+        np.cumsum(np.where(has_value, daily, 0.0), axis=1, out=self.cum[:, 1:])
+        self.count = np.zeros((n_ids, daily.shape[1] + 1), dtype=np.int64)
+        np.cumsum(has_value, axis=1, out=self.count[:, 1:])
+
+        # Day offset of the first of each month in the first year of data
+        start_date = months[0]
+        ref_months = pd.date_range(datetime(start_date.year, 1, 1), periods=12, freq="MS")
+        self.month_offsets = np.asarray((ref_months - start_date).days, dtype=np.int64)
+        self.available = sorted(districts.names[i] for i in np.unique(ids))
+
+    @property
+    def nbytes(self) -> int:
+        return self.cum.nbytes + self.count.nbytes
+
+    def means(self, ids: np.ndarray, months, days_of_month, days: int = TEMPERATURE_DAYS) -> np.ndarray:
+        """Window means per (id, MM-DD), NaN for unknown ids or windows without data"""
+        if not len(self.cum):
+            return np.full(len(ids), np.nan)
+        known = (ids >= 0) & (ids < len(self.cum))
+        ids = np.where(known, ids, 0)
+        n_days = self.cum.shape[1] - 1
+        starts = self.month_offsets[np.asarray(months, dtype=np.int64) - 1] + np.asarray(days_of_month, dtype=np.int64) - 1
+        starts = np.clip(starts, 0, n_days)
+        ends = np.clip(starts + days, 0, n_days)
+        total = self.cum[ids, ends] - self.cum[ids, starts]
+        count = self.count[ids, ends] - self.count[ids, starts]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            result = np.where(count > 0, total / np.maximum(count, 1), np.nan)
+        result[~known] = np.nan
+        return result
+
+class ClimateService:
+    """
+    Current rainfall and temperature datasets over one DistrictTable.
+    Datasets are never mutated once built; a reload builds a new one and
+    swaps it in, so a lookup always sees one consistent version.
+    """
+
+    def __init__(self, rainfall_path: str = RAINFALL_PATH, temperature_path: str = TEMPERATURE_PATH):
+        self.districts = DistrictTable()
+        self.sources = {"rainfall": (rainfall_path, RainfallData), "temperature": (temperature_path, TemperatureData)}
+        self.fingerprints = {name: ArtifactFingerprint([path], check_interval=0.0) for name, (path, _) in self.sources.items()}
+        self.data = {}
+        self.generation = 0
+        self.loaded_at = {}
+        for name in self.sources:
+            self._load(name)
+
+    @property
+    def version(self) -> str:
+        """Changes whenever a dataset is swapped; anything derived from the weather keys on it"""
+        return f"{self.generation}:" + ":".join(fp.value[:8] for fp in self.fingerprints.values())
+
+    def _load(self, name: str):
+        path, dataset = self.sources[name]
+        try:
+            df = load_table(path)
+        except FileNotFoundError:
+            print(f"ERROR: File '{path}' not found.")
+            df = pd.DataFrame()
+        self.data[name] = dataset(df, self.districts)  # atomic swap
+        self.loaded_at[name] = time.time()
+        self.generation += 1
+
+    def check(self) -> list:
+        """Reloads every dataset whose file changed since it was loaded; returns their names"""
+        changed = []
+        for name, fingerprint in self.fingerprints.items():
+            if fingerprint.check()[1]:
+                self._load(name)
+                changed.append(name)
+        if changed:
+            print(f"Reloaded climate data: {', '.join(changed)}")
+        return changed
+
+    def _watch(self, interval: float):
+        while True:
+            time.sleep(interval)
+            try:
+                self.check()
+            except Exception as e:
+                print(f"Warning: reloading climate data failed: {e}")
+
+    def start(self, watch_interval: float):
+        if watch_interval > 0:
+            threading.Thread(target=self._watch, args=(watch_interval,), name="climate-watcher", daemon=True).start()
+
+    def rainfall_forecast(self, district: str, start_date_str: str, days: int = FORECAST_DAYS) -> float:
+        """
+        Total rainfall for `days` days starting from the given date's MM-DD
+        (approximates daily values from monthly averages).
+        """
+        rainfall = self.data["rainfall"]
+        if not len(rainfall.cum):
+            raise ValueError("Rainfall data file not found.")
+        try:
+            start_date_obj = datetime.strptime(start_date_str, "%Y-%m-%d")
+        except ValueError:
+            raise ValueError("Invalid date format. Use YYYY-MM-DD.")
+
+        district_id = self.districts.lookup(district)
+        if district_id < 0 or district_id >= len(rainfall.cum) or rainfall.coverage[district_id, -1] == 0:
+            raise ValueError(f"District '{district.strip().title()}' not found. Available: {rainfall.available}")
+
+        start = MONTH_OFFSETS[start_date_obj.month - 1] + start_date_obj.day - 1
+        if rainfall.window_sum(rainfall.coverage, district_id, start, days) == 0:
+            raise ValueError("No rainfall data available for this date range.")
+        return rainfall.window_sum(rainfall.cum, district_id, start, days)
+
+    def rainfall_forecast_batch(self, districts, months, days_of_month, days: int = FORECAST_DAYS) -> np.ndarray:
+        """Vectorized rainfall_forecast; unknown districts or windows without data come back as NaN"""
+        return self.data["rainfall"].totals(self.districts.lookup_batch(districts), day_offsets(months, days_of_month), days)
+
+    def avg_temperature(self, district: str, month: int, day: int, days: int = TEMPERATURE_DAYS) -> float:
+        temperature = self.data["temperature"]
+        if temperature.cum.shape[1] <= 1:
+            raise ValueError("Temperature data file not found or empty.")
+        district_id = self.districts.lookup(district)
+        if district_id < 0 or district_id >= len(temperature.cum) or temperature.count[district_id, -1] == 0:
+            raise ValueError(f"District '{district}' not found in dataset.")
+        n_days = temperature.cum.shape[1] - 1
+        start = min(max(int(temperature.month_offsets[month - 1]) + day - 1, 0), n_days)
+        end = min(start + days, n_days)
+        count = temperature.count[district_id, end] - temperature.count[district_id, start]
+        if count <= 0:
+            raise ValueError("No temperature data found for the given date range.")
+        return float((temperature.cum[district_id, end] - temperature.cum[district_id, start]) / count)
+
+    def avg_temperature_batch(self, districts, months, days_of_month, days: int = TEMPERATURE_DAYS) -> np.ndarray:
+        """Vectorized avg_temperature; unknown districts or empty windows come back as NaN"""
+        return self.data["temperature"].means(self.districts.lookup_batch(districts), months, days_of_month, days)
+
+    def info(self) -> dict:
+        return {
+            "version": self.version,
+            "districts": len(self.districts.names),
+            "datasets": {
+                name: {
+                    "path": self.sources[name][0],
+                    "districts": len(self.data[name].available),
+                    "nbytes": self.data[name].nbytes,
+                    "loaded_at": datetime.fromtimestamp(self.loaded_at[name]).isoformat(timespec="seconds"),
+                }
+                for name in self.sources
+            },
+        }
+
+# Shared by every importer
+climate = ClimateService()
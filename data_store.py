@@ -0,0 +1,174 @@
+# data_store.py
+import io
+import json
+import os
+import sys
+import numpy as np
+import pandas as pd
+from cache import artifact_signature, matches_signature
+
+# Typed, columnar copies of the CSV datasets. Every column is a plain .npy
+# file that np.load maps read-only; string columns are stored as int32
+# codes with their categories in meta.json, and derived columns (dates,
+# sowing_doy, harvest_days, the melted temperature table) are computed once
+# at conversion time instead of on every import.
+
+CROP_DATA_PATH = "odisha_all_districts_crop_data.csv"
+RAINFALL_PATH = "rainfall.csv"
+TEMPERATURE_PATH = "temperature.csv"
+
+def store_dir(csv_path: str) -> str:
+    base, _ = os.path.splitext(csv_path)
+    return base + ".columns"
+
+def derive_crop_data(df: pd.DataFrame) -> pd.DataFrame:
+    df["harvest_days"] = (df["harvest_date"] - df["sowing_date"]).dt.days
+    df["sowing_doy"] = df["sowing_date"].dt.dayofyear
+    return df
+
+def derive_rainfall(df: pd.DataFrame) -> pd.DataFrame:
+    # Full month names, e.g. January
+    df["Date"] = pd.to_datetime(df["Year"].astype(str) + "-" + df["Month"], format="%Y-%B")
+    df["District"] = df["District"].str.title()
+    return df
+
+def derive_temperature(df: pd.DataFrame) -> pd.DataFrame:
+    """Wide Mon-YYYY columns (e.g. Jan-2023) melted to one District/Date/Temp_C row per month"""
+    month_cols = [c for c in df.columns if c != "District"]
+    long = df.melt(id_vars="District", value_vars=month_cols, var_name="Month", value_name="Temp_C")
+    long["Date"] = pd.to_datetime(long["Month"], format="%b-%Y", errors="coerce")
+    long = long.dropna(subset=["Date"])
+    return long[["District", "Date", "Temp_C"]].reset_index(drop=True)
+
+# read_csv options and the row-wise preparation of every known dataset
+PREPARERS = {
+    CROP_DATA_PATH: ({"parse_dates": ["sowing_date", "harvest_date"]}, derive_crop_data),
+    RAINFALL_PATH: ({}, derive_rainfall),
+    TEMPERATURE_PATH: ({}, derive_temperature),
+}
+
+def _preparer(csv_path: str):
+    name = os.path.basename(csv_path)
+    if name not in PREPARERS:
+        raise ValueError(f"No converter for '{name}'. Known datasets: {sorted(PREPARERS)}")
+    return PREPARERS[name]
+
+def prepare(csv_path: str) -> pd.DataFrame:
+    """Parses a CSV dataset and adds its derived columns"""
+    read_kwargs, derive = _preparer(csv_path)
+    return derive(pd.read_csv(csv_path, **read_kwargs))
+
+def _is_categorical(column: pd.Series) -> bool:
+    return not (pd.api.types.is_numeric_dtype(column) or pd.api.types.is_datetime64_any_dtype(column))
+
+def as_categorical(frame: pd.DataFrame) -> pd.DataFrame:
+    """String columns as categoricals in order of first appearance, as the store returns them"""
+    for name in frame.columns:
+        if _is_categorical(frame[name]):
+            codes, categories = pd.factorize(frame[name])
+            frame[name] = pd.Categorical.from_codes(codes, categories)
+    return frame
+
+def write_store(frame: pd.DataFrame, csv_path: str) -> str:
+    directory = store_dir(csv_path)
+    os.makedirs(directory, exist_ok=True)
+    columns = {}
+    for name in frame.columns:
+        column = frame[name]
+        if _is_categorical(column):
+            codes, categories = pd.factorize(column)  # -1 marks missing values
+            np.save(os.path.join(directory, name + ".npy"), codes.astype(np.int32))
+            columns[name] = {"categories": [str(value) for value in categories]}
+        else:
+            np.save(os.path.join(directory, name + ".npy"), column.to_numpy())
+            columns[name] = {}
+    with open(os.path.join(directory, "meta.json"), "w") as f:
+        json.dump({"rows": len(frame), "columns": columns, "source": artifact_signature(csv_path)}, f, indent=2)
+    return directory
+
+def convert(csv_path: str) -> str:
+    """Parses a CSV dataset once and writes its columnar copy next to it"""
+    return write_store(prepare(csv_path), csv_path)
+
+def read_store(csv_path: str):
+    """
+    (meta, read-only mapped column arrays), or None if the store is missing
+    or stale, i.e. the CSV no longer matches the signature it was built from
+    """
+    directory = store_dir(csv_path)
+    meta_path = os.path.join(directory, "meta.json")
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path) as f:
+        meta = json.load(f)
+    if os.path.exists(csv_path) and not matches_signature(csv_path, meta.get("source")):
+        print(f"Warning: {directory} was built from a different {csv_path}, ignoring it. Run data_store.py to refresh it.")
+        return None
+    arrays = {name: np.load(os.path.join(directory, name + ".npy"), mmap_mode="r") for name in meta["columns"]}
+    return meta, arrays
+
+def load_table(csv_path: str) -> pd.DataFrame:
+    """
+    The prepared dataset from its columnar store, or parsed from the CSV
+    when the store is missing or stale. String columns come back as
+    categoricals either way; raises FileNotFoundError if neither exists.
+    """
+    stored = read_store(csv_path)
+    if stored is None:
+        return as_categorical(prepare(csv_path))
+    return _store_frame(*stored)
+
+def _store_frame(meta: dict, arrays: dict) -> pd.DataFrame:
+    data = {}
+    for name, info in meta["columns"].items():
+        if "categories" in info:
+            data[name] = pd.Categorical.from_codes(arrays[name], info["categories"])
+        else:
+            data[name] = arrays[name]
+    # copy=False keeps numeric columns on the mapped pages
+    return pd.DataFrame(data, copy=False)
+
+def load_table_snapshot(csv_path: str):
+    """
+    (prepared dataset, bytes of the CSV it covers), for readers that fold
+    in rows appended after that offset. Parsed from the CSV, only complete
+    lines count; a line still being written is left for the next read.
+    """
+    stored = read_store(csv_path)
+    if stored is not None:
+        return _store_frame(*stored), stored[0]["source"]["size"]
+    with open(csv_path, "rb") as f:
+        data = f.read()
+    end = data.rfind(b"\n") + 1
+    read_kwargs, derive = _preparer(csv_path)
+    return as_categorical(derive(pd.read_csv(io.BytesIO(data[:end]), **read_kwargs))), end
+
+def iter_chunks(csv_path: str, chunk_size: int, columns=None):
+    """
+    The prepared dataset as DataFrames of at most chunk_size rows, so only
+    one chunk is ever materialized. Slices the store when it is fresh,
+    otherwise parses the CSV chunk by chunk. Categorical columns carry the
+    full category list from the store; CSV chunks hold plain strings.
+    """
+    stored = read_store(csv_path)
+    if stored is None:
+        read_kwargs, derive = _preparer(csv_path)
+        for chunk in pd.read_csv(csv_path, chunksize=chunk_size, **read_kwargs):
+            chunk = derive(chunk)
+            yield chunk if columns is None else chunk[columns]
+        return
+
+    meta, arrays = stored
+    names = list(meta["columns"]) if columns is None else list(columns)
+    for start in range(0, meta["rows"], chunk_size):
+        data = {}
+        for name in names:
+            values = np.asarray(arrays[name][start:start + chunk_size])
+            info = meta["columns"][name]
+            data[name] = pd.Categorical.from_codes(values, info["categories"]) if "categories" in info else values
+        yield pd.DataFrame(data)
+
+if __name__ == "__main__":
+    # Convert datasets: python data_store.py [file.csv ...]
+    for path in sys.argv[1:] or list(PREPARERS):
+        print(f"✅ {path} converted to {convert(path)}")
@@ -0,0 +1,97 @@
+# fast_path.py
+import threading
+import numpy as np
+import pandas as pd
+
+class FastFeaturizer:
+    """
+    Builds the model's feature vector for a single request without pandas
+    or the ColumnTransformer.
+
+    The fitted imputer/scaler parameters and one-hot category positions are
+    read from the pipeline once; each call then fills a preallocated row
+    and hands it straight to the model. Only the layout produced by
+    train_model.build_preprocessor is supported.
+    """
+
+    def __init__(self, pipeline):
+        preproc = pipeline.named_steps["preproc"]
+        transformers = [(name, cols) for name, _, cols in preproc.transformers_ if name != "remainder"]
+        if [name for name, _ in transformers] != ["num", "cat"]:
+            raise ValueError(f"Unsupported preprocessor layout: {transformers}")
+        self.numeric_features = list(transformers[0][1])
+        self.categorical_features = list(transformers[1][1])
+        if self.numeric_features != ["sowing_doy"]:
+            raise ValueError(f"Unsupported numeric features: {self.numeric_features}")
+
+        num = preproc.named_transformers_["num"]
+        imputer = num.named_steps["imputer"]
+        scaler = num.named_steps["scaler"]
+        self.num_fill = float(imputer.statistics_[0])
+        self.num_mean = float(scaler.mean_[0]) if scaler.with_mean else 0.0
+        self.num_scale = float(scaler.scale_[0]) if scaler.with_std else 1.0
+
+        ohe = preproc.named_transformers_["cat"].named_steps["ohe"]
+        if getattr(ohe, "drop_idx_", None) is not None:
+            raise ValueError("One-hot encoders with dropped categories are not supported")
+
+        # Column of every known category in the transformed row; unknown
+        # categories leave their block at zero, as handle_unknown="ignore" does
+        offset = 1
+        self.category_columns = []
+        for categories in ohe.categories_:
+            self.category_columns.append({value: offset + i for i, value in enumerate(categories)})
+            offset += len(categories)
+        self.n_features = offset
+
+        self.model = pipeline.named_steps["model"]
+        self._local = threading.local()
+
+    def _buffer(self) -> np.ndarray:
+        buf = getattr(self._local, "buf", None)
+        if buf is None:
+            buf = self._local.buf = np.zeros((1, self.n_features))
+        return buf
+
+    def transform_one(self, district: str, crop: str, season: str, sowing_doy) -> np.ndarray:
+        buf = self._buffer()
+        buf.fill(0.0)
+        doy = self.num_fill if sowing_doy is None else float(sowing_doy)
+        buf[0, 0] = (doy - self.num_mean) / self.num_scale
+        for columns, value in zip(self.category_columns, (district, crop, season)):
+            col = columns.get("missing" if value is None else value)
+            if col is not None:
+                buf[0, col] = 1.0
+        return buf
+
+    def predict_one(self, district: str, crop: str, season: str, sowing_doy) -> np.ndarray:
+        return self.model.predict(self.transform_one(district, crop, season, sowing_doy))[0]
+
+def equivalence_samples(fast: FastFeaturizer, doys=(1, 60, 152, 250, 366)) -> pd.DataFrame:
+    """Known category combinations on the given days plus one unknown, to compare against the full pipeline"""
+    districts, crops, seasons = ([*columns] for columns in fast.category_columns)
+    rows = [
+        {"district": districts[i % len(districts)], "crop": crops[i % len(crops)],
+         "season": seasons[i % len(seasons)], "sowing_doy": doy}
+        for i, doy in enumerate(doys)
+    ]
+    rows.append({"district": "__unknown__", "crop": crops[0], "season": "__unknown__", "sowing_doy": doys[0]})
+    return pd.DataFrame(rows)
+
+def build_fast_path(pipeline):
+    """
+    FastFeaturizer for the pipeline, or None if its layout is not supported.
+    tests/test_fast_path.py checks that it reproduces pipeline.predict.
+    """
+    try:
+        fast = FastFeaturizer(pipeline)
+        width = pipeline.named_steps["preproc"].transform(equivalence_samples(fast, doys=(1,))).shape[1]
+    except (AttributeError, KeyError, IndexError, ValueError) as e:
+        print(f"Warning: single-row fast path disabled: {e}")
+        return None
+
+    # One transformed row is enough to catch a layout the featurizer misreads
+    if width != fast.n_features:
+        print(f"Warning: single-row fast path disabled: {fast.n_features} features, the preprocessor makes {width}")
+        return None
+    return fast
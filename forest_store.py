@@ -0,0 +1,238 @@
+# forest_store.py
+import json
+import os
+import sys
+import joblib
+import numpy as np
+from cache import artifact_signature, matches_signature
+
+# Flattened, uncompressed forest layout. Every node array is a plain .npy
+# file that np.load maps read-only, so all workers on a box share the same
+# page-cache pages instead of each unpickling a private copy of the trees.
+NODE_ARRAYS = ["left", "right", "feature", "threshold", "value", "roots"]
+# Rows per pass when computing per-tree values, so temporaries stay at a
+# few tens of MB whatever the batch size
+ROWS_PER_CHUNK = 1024
+
+def forest_dir(pipe_path: str) -> str:
+    base, _ = os.path.splitext(pipe_path)
+    return base + ".forest"
+
+def _forest_groups(model):
+    """
+    Splits a fitted model into groups of trees whose averaged leaf values
+    give consecutive output columns: one group per target for
+    MultiOutputRegressor, a single group for a native multi-output forest.
+    """
+    if hasattr(model, "n_outputs_") and hasattr(model, "estimators_"):
+        return [model.estimators_]
+    if hasattr(model, "estimators_"):
+        return [forest.estimators_ for forest in model.estimators_]
+    raise ValueError(f"Unsupported model type: {type(model).__name__}")
+
+def flatten_forest(model) -> dict:
+    """Concatenates all trees of a fitted forest into flat node arrays"""
+    groups = _forest_groups(model)
+    trees_per_group = len(groups[0])
+    if any(len(group) != trees_per_group for group in groups):
+        raise ValueError("All forests must have the same number of trees")
+
+    left, right, feature, threshold, value, roots = [], [], [], [], [], []
+    offset = 0
+    max_depth = 0
+    for group in groups:
+        for estimator in group:
+            tree = estimator.tree_
+            n_nodes = tree.node_count
+            ids = np.arange(n_nodes)
+            is_leaf = tree.children_left == -1
+            # Leaves point at themselves so traversal can run a fixed number of steps
+            left.append(np.where(is_leaf, ids, tree.children_left) + offset)
+            right.append(np.where(is_leaf, ids, tree.children_right) + offset)
+            feature.append(np.where(is_leaf, 0, tree.feature))
+            threshold.append(np.where(is_leaf, np.inf, tree.threshold))
+            value.append(tree.value[:, :, 0])
+            roots.append(offset)
+            offset += n_nodes
+            max_depth = max(max_depth, tree.max_depth)
+
+    index_dtype = np.int32 if offset < 2**31 else np.int64
+    return {
+        "left": np.concatenate(left).astype(index_dtype),
+        "right": np.concatenate(right).astype(index_dtype),
+        "feature": np.concatenate(feature).astype(np.int32),
+        "threshold": np.concatenate(threshold).astype(np.float64),
+        "value": np.concatenate(value).astype(np.float64),
+        "roots": np.asarray(roots, dtype=index_dtype),
+        "max_depth": max_depth,
+        "n_groups": len(groups),
+    }
+
+def _row_chunks(X):
+    for start in range(0, X.shape[0], ROWS_PER_CHUNK):
+        yield X[start:start + ROWS_PER_CHUNK]
+
+class PerTreeForest:
+    """
+    Point predictions plus percentiles of the per-tree predictions, one
+    chunk of rows at a time. Subclasses provide tree_values for a chunk.
+    """
+
+    def tree_values(self, X) -> np.ndarray:
+        """Per-tree leaf values, shape (n_rows, n_groups, trees_per_group, outputs_per_group)"""
+        raise NotImplementedError
+
+    def predict(self, X) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float32)
+        out = np.empty((X.shape[0], self.n_outputs_))
+        start = 0
+        for chunk in _row_chunks(X):
+            values = self.tree_values(chunk)
+            out[start:start + len(chunk)] = values.mean(axis=2).reshape(len(chunk), self.n_outputs_)
+            start += len(chunk)
+        return out
+
+    def predict_with_quantiles(self, X, percentiles=(10, 50, 90)):
+        """
+        Point predictions plus percentiles of the per-tree predictions from
+        a single traversal. Returns (mean of shape (n_rows, n_outputs),
+        quantiles of shape (len(percentiles), n_rows, n_outputs)).
+        """
+        X = np.asarray(X, dtype=np.float32)
+        mean = np.empty((X.shape[0], self.n_outputs_))
+        quantiles = np.empty((len(percentiles), X.shape[0], self.n_outputs_))
+        start = 0
+        for chunk in _row_chunks(X):
+            values = self.tree_values(chunk)
+            rows = slice(start, start + len(chunk))
+            mean[rows] = values.mean(axis=2).reshape(len(chunk), self.n_outputs_)
+            quantiles[:, rows] = np.percentile(values, percentiles, axis=2).reshape(len(percentiles), len(chunk), self.n_outputs_)
+            start += len(chunk)
+        return mean, quantiles
+
+class CompiledForest(PerTreeForest):
+    """
+    Per-tree values of a fitted sklearn forest from each tree's compiled
+    predict, for models that are in memory anyway (pickle load mode).
+    """
+
+    def __init__(self, model):
+        self.groups = [[estimator.tree_ for estimator in group] for group in _forest_groups(model)]
+        self.n_groups = len(self.groups)
+        self.trees_per_group = len(self.groups[0])
+        self.outputs_per_group = self.groups[0][0].n_outputs
+        self.n_outputs_ = self.n_groups * self.outputs_per_group
+
+    def tree_values(self, X) -> np.ndarray:
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        values = np.empty((X.shape[0], self.n_groups, self.trees_per_group, self.outputs_per_group))
+        for g, group in enumerate(self.groups):
+            for t, tree in enumerate(group):
+                values[:, g, t] = tree.predict(X).reshape(X.shape[0], self.outputs_per_group)
+        return values
+
+class FlatForest(PerTreeForest):
+    """
+    Forest prediction over flat node arrays, vectorized across rows and
+    trees: every step advances all unfinished (row, tree) pairs one level
+    down. Matches RandomForestRegressor / MultiOutputRegressor.predict.
+    """
+
+    def __init__(self, arrays: dict, max_depth: int, n_groups: int):
+        for name in NODE_ARRAYS:
+            setattr(self, name, arrays[name])
+        self.max_depth = max_depth
+        self.n_groups = n_groups
+        self.n_trees = len(self.roots)
+        self.trees_per_group = self.n_trees // n_groups
+        self.outputs_per_group = self.value.shape[1]
+        self.n_outputs_ = n_groups * self.outputs_per_group
+
+    @classmethod
+    def from_model(cls, model):
+        arrays = flatten_forest(model)
+        return cls(arrays, arrays["max_depth"], arrays["n_groups"])
+
+    def apply(self, X) -> np.ndarray:
+        """Leaf node index of every row in every tree, shape (n_rows, n_trees)"""
+        # Trees compare float32 features against float64 thresholds
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        n_rows, n_features = X.shape
+        flat_X = X.ravel()
+        # Pairs are ordered tree-major so neighbouring lookups hit the same
+        # tree's nodes; base is each pair's row offset into flat_X
+        leaves = np.empty(n_rows * self.n_trees, dtype=self.left.dtype)
+        pairs = np.arange(leaves.size)
+        nodes = np.repeat(self.roots, n_rows)
+        base = np.tile(np.arange(n_rows) * n_features, self.n_trees)
+        step = 0
+        while pairs.size:
+            go_left = flat_X[base + self.feature[nodes]] <= self.threshold[nodes]
+            parents, nodes = nodes, np.where(go_left, self.left[nodes], self.right[nodes])
+            step += 1
+            # Every few steps, drop the pairs that reached a leaf (leaves point
+            # at themselves); most trees are much shallower than the deepest one
+            if step % 4:
+                continue
+            done = nodes == parents
+            if done.any():
+                leaves[pairs[done]] = nodes[done]
+                pending = ~done
+                pairs, nodes, base = pairs[pending], nodes[pending], base[pending]
+        return leaves.reshape(self.n_trees, n_rows).T
+
+    def tree_values(self, X) -> np.ndarray:
+        leaves = self.apply(X)
+        values = self.value[leaves]
+        return values.reshape(len(leaves), self.n_groups, self.trees_per_group, self.outputs_per_group)
+
+def per_tree_forest(model) -> PerTreeForest:
+    """The model itself if it is a FlatForest, else a CompiledForest over its trees"""
+    return model if isinstance(model, FlatForest) else CompiledForest(model)
+
+class FlatPipeline:
+    """The fitted preprocessor in front of a FlatForest, shaped like the sklearn Pipeline"""
+
+    def __init__(self, preproc, model: FlatForest):
+        self.named_steps = {"preproc": preproc, "model": model}
+
+    def predict(self, X) -> np.ndarray:
+        return self.named_steps["model"].predict(self.named_steps["preproc"].transform(X))
+
+def export_forest(pipeline, pipe_path: str) -> str:
+    """Writes the pipeline's forest as flat .npy arrays next to pipe_path"""
+    directory = forest_dir(pipe_path)
+    os.makedirs(directory, exist_ok=True)
+    arrays = flatten_forest(pipeline.named_steps["model"])
+    for name in NODE_ARRAYS:
+        np.save(os.path.join(directory, name + ".npy"), arrays[name])
+    joblib.dump(pipeline.named_steps["preproc"], os.path.join(directory, "preproc.joblib"))
+    with open(os.path.join(directory, "meta.json"), "w") as f:
+        json.dump({
+            "max_depth": arrays["max_depth"],
+            "n_groups": arrays["n_groups"],
+            "model": artifact_signature(pipe_path),
+        }, f, indent=2)
+    return directory
+
+def load_forest_pipeline(pipe_path: str):
+    """Maps the exported forest read-only, or returns None if it is missing or stale"""
+    directory = forest_dir(pipe_path)
+    meta_path = os.path.join(directory, "meta.json")
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path) as f:
+        meta = json.load(f)
+    if os.path.exists(pipe_path) and not matches_signature(pipe_path, meta.get("model")):
+        print(f"Warning: {directory} was built from a different {pipe_path}, ignoring it. "
+              f"Run forest_store.py to export it again.")
+        return None
+
+    arrays = {name: np.load(os.path.join(directory, name + ".npy"), mmap_mode="r") for name in NODE_ARRAYS}
+    preproc = joblib.load(os.path.join(directory, "preproc.joblib"))
+    return FlatPipeline(preproc, FlatForest(arrays, meta["max_depth"], meta["n_groups"]))
+
+if __name__ == "__main__":
+    # Convert an existing pickled pipeline: python forest_store.py [odisha_crop_pipeline.joblib]
+    path = sys.argv[1] if len(sys.argv) > 1 else "odisha_crop_pipeline.joblib"
+    print(f"✅ Forest exported to {export_forest(joblib.load(path), path)}")
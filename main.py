@@ -1,44 +1,110 @@
-from io import BytesIO
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 from pydantic import BaseModel
-import joblib
 import pandas as pd
-from typing import Optional
+import numpy as np
+from typing import List, Optional
 from datetime import datetime
-from temperature import temperature_calculator
-from rainfall import get_rainfall_forecast
+from climate import climate
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, StreamingResponse
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 import report_utils  # We'll create this next
 import os
+from batching import MicroBatcher
+from offload import BoundedProcessPool, PoolSaturated, iter_byte_chunks
+from model_registry import ModelRegistry, ModelVersion
+from analytics import DIMENSIONS, StatsCube
+from simple_fertilizer_recommender import recommend_fertilizer, recommend_fertilizer_batch
+from cache import LRUCache, make_etag, etag_matches
+from fastapi.exception_handlers import http_exception_handler
+import metrics
+from metrics import MetricsMiddleware, SlowRequestProfiler, errors_total, render_samples, timed
 
+import hmac
 import tempfile
+import asyncio
+import zipfile
+from collections import deque
+from contextlib import asynccontextmanager
+from starlette.concurrency import run_in_threadpool
 
-app = FastAPI(title="Odisha Crop Yield Predictor")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Every serving process (each uvicorn worker, the --reload child) starts
+    # its background services here; report worker processes only import this
+    # module and never serve, so they start none of them.
+    start_services()
+    yield
+
+app = FastAPI(title="Odisha Crop Yield Predictor", lifespan=lifespan)
+
+# Opt-in: dump a folded-stack profile for every request slower than this
+PROFILE_SLOW_REQUESTS_MS = float(os.environ.get("PROFILE_SLOW_REQUESTS_MS", "0"))
+slow_request_profiler = None
+if PROFILE_SLOW_REQUESTS_MS > 0:
+    slow_request_profiler = SlowRequestProfiler(
+        PROFILE_SLOW_REQUESTS_MS,
+        interval_ms=float(os.environ.get("PROFILE_INTERVAL_MS", "5")),
+        out_dir=os.environ.get("PROFILE_DIR", "profiles"),
+    )
+app.add_middleware(MetricsMiddleware, profiler=slow_request_profiler)
 
 
 # Load the training pipeline (preproc + model)
-PIPE_PATH = "odisha_crop_pipeline.joblib"
-try:
-    pipeline = joblib.load(PIPE_PATH)
-    # Check how many outputs the model has
-    if hasattr(pipeline.named_steps['model'], 'estimators_'):
-        n_outputs = len(pipeline.named_steps['model'].estimators_)
-        print(f"Model loaded with {n_outputs} outputs")
-    else:
-        # For MultiOutputRegressor, we need to check the number of estimators
-        n_outputs = len(pipeline.named_steps['model'].estimators_)
-        print(f"Model loaded with {n_outputs} outputs")
-except FileNotFoundError:
-    print(f"Warning: Model file {PIPE_PATH} not found. Please train the model first.")
-    pipeline = None
-    n_outputs = 0
+PIPE_PATH = os.environ.get("MODEL_PATH", "odisha_crop_pipeline.joblib")
+# "mmap" maps the flat forest exported next to the pipeline so workers share
+# its pages, "pickle" unpickles the joblib file, "auto" prefers mmap.
+MODEL_LOAD_MODE = os.environ.get("MODEL_LOAD_MODE", "auto")
+MODEL_BACKGROUND_LOAD = os.environ.get("MODEL_BACKGROUND_LOAD", "1") == "1"
+# The /admin endpoints are disabled unless a token is configured
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN")
+# Requests for a slot that is still loading get a 503 with this Retry-After
+MODEL_RETRY_AFTER_S = int(os.environ.get("MODEL_RETRY_AFTER_S", "5"))
+
+def parse_model_sources(spec: str) -> dict:
+    """Extra model slots from MODEL_PATHS, e.g. "kharif=models/kharif.joblib,b=model_b.joblib" """
+    sources = {}
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, path = entry.partition("=")
+        sources[name.strip()] = path.strip()
+    return sources
+
+# Named model slots; requests pick one with the optional "model" field
+registry = ModelRegistry(
+    {"default": PIPE_PATH, **parse_model_sources(os.environ.get("MODEL_PATHS", ""))},
+    max_bytes=int(float(os.environ.get("MODEL_MEMORY_BUDGET_MB", "2048")) * 2**20),
+    load_mode=MODEL_LOAD_MODE,
+    watch_interval=float(os.environ.get("MODEL_WATCH_INTERVAL_S", "5")),
+)
+
+# Historical statistics, pre-aggregated once and refreshed as rows are appended
+stats_cube = StatsCube(watch_interval=float(os.environ.get("STATS_WATCH_INTERVAL_S", "5")))
+
+services_started = False
+
+def start_services():
+    """
+    Load the models and statistics and start the file watchers and the
+    slow-request profiler. Runs once per process, from the app's lifespan;
+    callers driving the app without lifespan events (e.g. benchmark.py) call it directly.
+    """
+    global services_started
+    if services_started:
+        return
+    services_started = True
+    if slow_request_profiler is not None:
+        slow_request_profiler.start()
+    registry.start(background=MODEL_BACKGROUND_LOAD)
+    # Weather files changed on disk are rebuilt in the background and swapped in
+    climate.start(watch_interval=float(os.environ.get("CLIMATE_WATCH_INTERVAL_S", "5")))
+    stats_cube.start(background=MODEL_BACKGROUND_LOAD)
 
 class PredictionRequest(BaseModel):
     district: str
     crop: str
     season: str
     sowing_date: str  # "YYYY-MM-DD"
+    model: Optional[str] = None  # registry slot, e.g. an A/B variant; default model if omitted
+    include_intervals: bool = False  # add P10/P50/P90 of yield and harvest days across the trees
 
 class PredictionResponse(BaseModel):
     predicted_environmental_conditions: dict
@@ -46,134 +112,937 @@ class PredictionResponse(BaseModel):
     predicted_fertilizer_recommendation: dict
     predicted_yield_kg_per_ha: float
     predicted_harvest_days: float
+    prediction_intervals: Optional[dict] = None
 
-@app.post("/predict", response_model=PredictionResponse)
-def predict(req: PredictionRequest):
-    if pipeline is None:
-        raise HTTPException(status_code=503, detail="Model not loaded. Please train the model first.")
-    
-    # Convert sowing_date to day of year and extract month/day for weather calculations
-    try:
-        sow_dt = pd.to_datetime(req.sowing_date)
-        sowing_doy = int(sow_dt.dayofyear)
-        month = sow_dt.month
-        day = sow_dt.day
-    except:
-        raise HTTPException(status_code=400, detail="Invalid sowing_date format. Use YYYY-MM-DD.")
-    
-    # Calculate temperature and rainfall for the season
-    try:
-        # Calculate average temperature for the next 100 days
-        avg_temp = temperature_calculator.get_avg_temperature(
-            req.district, month, day, days=100
-        )
-        
-        # Calculate total rainfall for the next 100 days
-        total_rainfall = get_rainfall_forecast(
-            req.district, req.sowing_date
-        )
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Weather data error: {str(e)}")
-    
-    # Build input data with only the provided features (no weather data)
-    data = {
-        "district": req.district,
-        "crop": req.crop,
-        "season": req.season,
-        "sowing_doy": sowing_doy
+class BatchPredictionRequest(BaseModel):
+    items: List[PredictionRequest]
+
+class BatchPredictionItem(BaseModel):
+    index: int
+    result: Optional[PredictionResponse] = None
+    error: Optional[str] = None
+
+class BatchPredictionResponse(BaseModel):
+    results: List[BatchPredictionItem]
+
+MAX_BATCH_ITEMS = 10000
+
+class SowingWindowRequest(BaseModel):
+    district: str
+    crop: str
+    season: str
+    start_date: Optional[str] = None  # "YYYY-MM-DD", defaults to January 1 of the current year
+    end_date: Optional[str] = None  # inclusive, defaults to one year after start_date
+    top_k: int = 10
+    model: Optional[str] = None
+
+class SowingDateScore(BaseModel):
+    sowing_date: str
+    predicted_yield_kg_per_ha: float
+    predicted_harvest_days: float
+    season_total_rainfall_mm: float
+    season_avg_temp_c: float
+
+class SowingWindowResponse(BaseModel):
+    district: str
+    crop: str
+    season: str
+    model_version: str
+    best_dates: List[SowingDateScore]  # top_k dates by predicted yield
+    curve: List[SowingDateScore]  # every candidate date in calendar order
+
+MAX_SOWING_WINDOW_DAYS = 366
+
+class FertilizerBatchRequest(BaseModel):
+    # Parallel columns rather than one object per plot, so large soil-card
+    # uploads parse quickly; null readings skip that adjustment
+    crops: List[str]
+    soil_N: Optional[List[Optional[float]]] = None
+    soil_P: Optional[List[Optional[float]]] = None
+    soil_K: Optional[List[Optional[float]]] = None
+
+class FertilizerBatchResponse(BaseModel):
+    # null for crops without a rule
+    N: List[Optional[float]]
+    P: List[Optional[float]]
+    K: List[Optional[float]]
+
+MAX_FERTILIZER_PLOTS = 1_000_000
+
+class ReportExportRequest(BaseModel):
+    items: List[PredictionRequest]
+    format: str = "pdf"  # "pdf": one document with every report, "zip": one PDF per item
+
+MAX_EXPORT_ITEMS = 50000
+
+# Models trained without the fertilizer targets predict the first 9 outputs only
+FERTILIZER_OUTPUTS = slice(9, 12)
+SOIL_NPK_OUTPUTS = slice(2, 5)
+# "model" reports the model's fertilizer outputs, "rules" the rule table of
+# simple_fertilizer_recommender applied to the predicted soil N/P/K. Models
+# without fertilizer outputs always use the rules. Crops without a rule fall
+# back to the model's outputs, or to null N/P/K when it has none.
+FERTILIZER_SOURCE = os.environ.get("FERTILIZER_SOURCE", "model")
+
+def uses_fertilizer_rules(n_outputs: int) -> bool:
+    return FERTILIZER_SOURCE == "rules" or n_outputs <= FERTILIZER_OUTPUTS.start
+
+# Percentiles of the per-tree predictions reported by include_intervals
+INTERVAL_PERCENTILES = (10, 50, 90)
+INTERVAL_NAMES = ("p10", "p50", "p90")
+
+def build_prediction_response(preds_row, total_rainfall, avg_temp, quantiles=None, fertilizer=None) -> PredictionResponse:
+    """
+    Turn one row of the 12 model outputs plus weather into a response.
+    quantiles, if given, holds the P10/P50/P90 rows of the same outputs;
+    fertilizer, if given, replaces outputs 9-11 with a rule-based N/P/K;
+    NaN there means no rule covered the crop.
+    """
+    # The model now predicts 12 outputs in this order:
+    # 0: season_avg_humidity
+    # 1: soil_pH
+    # 2: soil_N_kg_ha
+    # 3: soil_P_kg_ha
+    # 4: soil_K_kg_ha
+    # 5: organic_carbon_pct
+    # 6: soil_moisture_pct
+    # 7: yield_kg_per_ha
+    # 8: harvest_days
+    # 9: fertilizer_N_kg_ha
+    # 10: fertilizer_P_kg_ha
+    # 11: fertilizer_K_kg_ha
+
+    # Use calculated weather data from external services
+    environmental_conditions = {
+        "season_total_rainfall_mm": round(float(total_rainfall), 1),
+        "season_avg_temp_c": round(float(avg_temp), 1),
+        "season_avg_humidity": round(float(preds_row[0]), 1)  # First output from model
     }
-    
-    X = pd.DataFrame([data])
-    
-    try:
-        # Get predictions for all target features
-        preds = pipeline.predict(X)
-        
-        # The model now predicts 12 outputs in this order:
-        # 0: season_avg_humidity
-        # 1: soil_pH
-        # 2: soil_N_kg_ha
-        # 3: soil_P_kg_ha
-        # 4: soil_K_kg_ha
-        # 5: organic_carbon_pct
-        # 6: soil_moisture_pct
-        # 7: yield_kg_per_ha
-        # 8: harvest_days
-        # 9: fertilizer_N_kg_ha
-        # 10: fertilizer_P_kg_ha
-        # 11: fertilizer_K_kg_ha
-        
-        # Use calculated weather data from external services
-        environmental_conditions = {
-            "season_total_rainfall_mm": round(float(total_rainfall), 1),
-            "season_avg_temp_c": round(float(avg_temp), 1),
-            "season_avg_humidity": round(float(preds[0, 0]), 1)  # First output from model
-        }
-        
-        soil_conditions = {
-            "soil_pH": round(float(preds[0, 1]), 1),
-            "soil_N_kg_ha": round(float(preds[0, 2]), 1),
-            "soil_P_kg_ha": round(float(preds[0, 3]), 1),
-            "soil_K_kg_ha": round(float(preds[0, 4]), 1),
-            "organic_carbon_pct": round(float(preds[0, 5]), 2),
-            "soil_moisture_pct": round(float(preds[0, 6]), 1)
-        }
-        
+
+    soil_conditions = {
+        "soil_pH": round(float(preds_row[1]), 1),
+        "soil_N_kg_ha": round(float(preds_row[2]), 1),
+        "soil_P_kg_ha": round(float(preds_row[3]), 1),
+        "soil_K_kg_ha": round(float(preds_row[4]), 1),
+        "organic_carbon_pct": round(float(preds_row[5]), 2),
+        "soil_moisture_pct": round(float(preds_row[6]), 1)
+    }
+
+    if fertilizer is None or np.isnan(fertilizer).any():
+        fertilizer = preds_row[FERTILIZER_OUTPUTS] if len(preds_row) > FERTILIZER_OUTPUTS.start else None
+    if fertilizer is None:
+        fertilizer_recommendation = {"N": None, "P": None, "K": None}
+    else:
         fertilizer_recommendation = {
-            "N": round(float(preds[0, 9]), 1),
-            "P": round(float(preds[0, 10]), 1),
-            "K": round(float(preds[0, 11]), 1)
+            "N": round(float(fertilizer[0]), 1),
+            "P": round(float(fertilizer[1]), 1),
+            "K": round(float(fertilizer[2]), 1)
+        }
+
+    prediction_intervals = None
+    if quantiles is not None:
+        prediction_intervals = {
+            "yield_kg_per_ha": {name: round(float(q[7]), 2) for name, q in zip(INTERVAL_NAMES, quantiles)},
+            "harvest_days": {name: round(float(q[8]), 1) for name, q in zip(INTERVAL_NAMES, quantiles)},
         }
-        
-        yield_kg_per_ha = round(float(preds[0, 7]), 2)
-        harvest_days = round(float(preds[0, 8]), 1)
-            
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
 
     return PredictionResponse(
         predicted_environmental_conditions=environmental_conditions,
         predicted_soil_conditions=soil_conditions,
         predicted_fertilizer_recommendation=fertilizer_recommendation,
-        predicted_yield_kg_per_ha=yield_kg_per_ha,
-        predicted_harvest_days=harvest_days
+        predicted_yield_kg_per_ha=round(float(preds_row[7]), 2),
+        predicted_harvest_days=round(float(preds_row[8]), 1),
+        prediction_intervals=prediction_intervals
+    )
+
+def weather_error_detail(req: PredictionRequest, month: int, day: int) -> str:
+    """Re-run the scalar weather lookups to report why a batched lookup came back empty"""
+    try:
+        climate.avg_temperature(req.district, month, day, days=100)
+        climate.rainfall_forecast(req.district, req.sowing_date)
+    except Exception as e:
+        return f"Weather data error: {str(e)}"
+    return "Weather data error: no weather data for this date range."
+
+MODEL_NOT_LOADED = "Model not loaded. Please train the model first."
+MODEL_LOADING = "Model is loading. Please retry shortly."
+
+# Error detail prefixes -> the cause label of odisha_errors_total
+ERROR_CAUSES = [
+    ("Invalid sowing_date", "invalid_date"),
+    ("Invalid start_date", "invalid_date"),
+    ("Weather data error", "weather_data"),
+    (MODEL_NOT_LOADED, "model_not_loaded"),
+    (MODEL_LOADING, "model_loading"),
+    ("Unknown model", "unknown_model"),
+    ("Prediction error", "prediction"),
+    ("Report generation is busy", "report_pool_saturated"),
+    ("Batch too large", "batch_too_large"),
+    ("Unknown export format", "unknown_export_format"),
+    ("Statistics are not loaded", "stats_not_loaded"),
+    ("Unknown stats filter", "unknown_stats_filter"),
+    ("Admin endpoints are disabled", "admin_disabled"),
+    ("Invalid admin token", "invalid_admin_token"),
+]
+
+def error_cause(exc: HTTPException) -> str:
+    detail = str(exc.detail)
+    for prefix, cause in ERROR_CAUSES:
+        if detail.startswith(prefix):
+            return cause
+    return f"http_{exc.status_code}"
+
+@app.exception_handler(HTTPException)
+async def count_http_errors(request: Request, exc: HTTPException):
+    route = request.scope.get("route")
+    errors_total.inc(getattr(route, "path", "unmatched"), error_cause(exc))
+    return await http_exception_handler(request, exc)
+
+def resolve_model(name: Optional[str]) -> ModelVersion:
+    """Current version of a registry slot, or an HTTPException explaining why there is none"""
+    try:
+        version = registry.get(name)
+    except KeyError:
+        raise HTTPException(status_code=400, detail=f"Unknown model '{name}'. Available: {sorted(registry.sources)}")
+    if version is None and name and name != registry.default:
+        # Secondary slots load on their first request, in the background so
+        # the scoring thread is never blocked by an unpickle
+        registry.reload(name)
+    if version is None and (name or registry.default) in registry.loading:
+        raise HTTPException(status_code=503, detail=MODEL_LOADING, headers={"Retry-After": str(MODEL_RETRY_AFTER_S)})
+    if version is None:
+        raise HTTPException(status_code=503, detail=MODEL_NOT_LOADED)
+    return version
+
+def live_model(version: ModelVersion):
+    try:
+        return version.get_pipeline()
+    except FileNotFoundError:
+        raise HTTPException(status_code=503, detail=MODEL_NOT_LOADED)
+
+def interval_model(version: ModelVersion):
+    try:
+        return version.get_interval_model()
+    except FileNotFoundError:
+        raise HTTPException(status_code=503, detail=MODEL_NOT_LOADED)
+
+def rule_fertilizer(req: PredictionRequest, preds_row):
+    """N/P/K from the rule table and the predicted soil, or None to use the model's outputs"""
+    if not uses_fertilizer_rules(len(preds_row)):
+        return None
+    soil_N, soil_P, soil_K = (float(value) for value in preds_row[SOIL_NPK_OUTPUTS])
+    rec = recommend_fertilizer(req.crop, soil_N, soil_P, soil_K)
+    if rec is None:
+        return None
+    return rec["N"], rec["P"], rec["K"]
+
+def score_single(req: PredictionRequest, version: ModelVersion):
+    """score_group for one item without pandas: scalar lookups and the fast path"""
+    try:
+        with timed("parse_date"):
+            sow_dt = datetime.strptime(req.sowing_date, "%Y-%m-%d")
+    except ValueError:
+        return HTTPException(status_code=400, detail="Invalid sowing_date format. Use YYYY-MM-DD.")
+    sowing_doy = sow_dt.timetuple().tm_yday
+
+    try:
+        with timed("temperature"):
+            avg_temp = climate.avg_temperature(req.district, sow_dt.month, sow_dt.day, days=100)
+        with timed("rainfall"):
+            total_rainfall = climate.rainfall_forecast(req.district, req.sowing_date)
+    except Exception as e:
+        return HTTPException(status_code=400, detail=f"Weather data error: {str(e)}")
+
+    if req.include_intervals:
+        # One traversal gives both the point prediction and the per-tree spread
+        try:
+            preproc, forest = interval_model(version)
+        except HTTPException as e:
+            return e
+        fast_path = version.fast_path
+        try:
+            with timed("predict_intervals"):
+                if fast_path is not None:
+                    X = fast_path.transform_one(req.district, req.crop, req.season, sowing_doy)
+                else:
+                    X = preproc.transform(pd.DataFrame([{"district": req.district, "crop": req.crop, "season": req.season, "sowing_doy": sowing_doy}]))
+                preds, quantiles = forest.predict_with_quantiles(X, INTERVAL_PERCENTILES)
+        except Exception as e:
+            return HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
+        with timed("build_response"):
+            return build_prediction_response(preds[0], total_rainfall, avg_temp, quantiles[:, 0],
+                                             rule_fertilizer(req, preds[0]))
+
+    preds_row = None
+    if version.grid is not None:
+        with timed("grid_lookup"):
+            preds_row = version.grid.lookup(req.district, req.crop, req.season, sowing_doy)
+    if preds_row is None:
+        # Unseen combination, fall back to the live model
+        try:
+            model = live_model(version)
+        except HTTPException as e:
+            return e
+        fast_path = version.fast_path
+        try:
+            with timed("predict"):
+                if fast_path is not None:
+                    preds_row = fast_path.predict_one(req.district, req.crop, req.season, sowing_doy)
+                else:
+                    X = pd.DataFrame([{"district": req.district, "crop": req.crop, "season": req.season, "sowing_doy": sowing_doy}])
+                    preds_row = model.predict(X)[0]
+        except Exception as e:
+            return HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
+
+    with timed("build_response"):
+        return build_prediction_response(preds_row, total_rainfall, avg_temp, fertilizer=rule_fertilizer(req, preds_row))
+
+def score_one_by_one(items: List[PredictionRequest], version: ModelVersion, mask: np.ndarray, results: list):
+    """Fills results[i] for every item in mask with its own score_single result"""
+    for i in np.flatnonzero(mask):
+        results[i] = score_single(items[i], version)
+
+def score_group(items: List[PredictionRequest], version: ModelVersion) -> list:
+    """
+    Score many requests against one model version with bulk date parsing,
+    batched weather lookups and one predict call. Returns a
+    PredictionResponse or an HTTPException per item. When a batched
+    predict call fails, its items are scored one by one so the error only
+    reaches the items that cause it.
+    """
+    n_items = len(items)
+    if n_items == 1:
+        return [score_single(items[0], version)]
+    results: list = [None] * n_items
+    if n_items == 0:
+        return results
+
+    with timed("build_frame"):
+        frame = pd.DataFrame({
+            "district": [item.district for item in items],
+            "crop": [item.crop for item in items],
+            "season": [item.season for item in items],
+        })
+
+    # Parse all sowing dates at once; unparseable ones become NaT
+    with timed("parse_date"):
+        sow_dt = pd.to_datetime(
+            pd.Series([item.sowing_date for item in items]), format="%Y-%m-%d", errors="coerce"
+        )
+        valid_date = sow_dt.notna().to_numpy()
+        frame["sowing_doy"] = sow_dt.dt.dayofyear.fillna(1).astype(int)
+        months = sow_dt.dt.month.fillna(1).astype(int).to_numpy()
+        days = sow_dt.dt.day.fillna(1).astype(int).to_numpy()
+
+    # Batched weather lookups, NaN marks unknown districts or empty windows
+    with timed("temperature"):
+        avg_temp = climate.avg_temperature_batch(frame["district"], months, days, days=100)
+    with timed("rainfall"):
+        total_rainfall = climate.rainfall_forecast_batch(frame["district"], months, days)
+
+    for i in range(n_items):
+        if not valid_date[i]:
+            results[i] = HTTPException(status_code=400, detail="Invalid sowing_date format. Use YYYY-MM-DD.")
+        elif np.isnan(avg_temp[i]) or np.isnan(total_rainfall[i]):
+            results[i] = HTTPException(status_code=400, detail=weather_error_detail(items[i], months[i], days[i]))
+
+    ok = np.array([result is None for result in results])
+    wants_intervals = ok & np.array([item.include_intervals for item in items])
+    preds = None
+    if version.grid is not None:
+        with timed("grid_lookup"):
+            rows, found = version.grid.lookup_batch(frame["district"], frame["crop"], frame["season"], frame["sowing_doy"])
+        preds = rows.astype(np.float64)
+        missing = ok & ~found & ~wants_intervals
+    else:
+        missing = ok & ~wants_intervals
+
+    # Items asking for intervals share one per-tree traversal
+    quantiles = None
+    if wants_intervals.any():
+        try:
+            preproc, forest = interval_model(version)
+            with timed("predict_intervals"):
+                X = preproc.transform(frame.loc[wants_intervals].reset_index(drop=True))
+                interval_preds, interval_q = forest.predict_with_quantiles(X, INTERVAL_PERCENTILES)
+        except Exception:
+            score_one_by_one(items, version, wants_intervals, results)
+            ok &= ~wants_intervals
+            wants_intervals[:] = False
+        else:
+            if preds is None:
+                preds = np.zeros((n_items, interval_preds.shape[1]))
+            preds[wants_intervals] = interval_preds
+            quantiles = np.zeros((len(INTERVAL_PERCENTILES), n_items, interval_preds.shape[1]))
+            quantiles[:, wants_intervals] = interval_q
+
+    # Combinations outside the grid go through the live model in one call
+    if missing.any():
+        try:
+            model = live_model(version)
+            with timed("predict"):
+                missing_preds = model.predict(frame.loc[missing].reset_index(drop=True))
+        except Exception:
+            score_one_by_one(items, version, missing, results)
+            ok &= ~missing
+        else:
+            if preds is None:
+                preds = np.zeros((n_items, missing_preds.shape[1]))
+            preds[missing] = missing_preds
+
+    fertilizer = None
+    if ok.any() and uses_fertilizer_rules(preds.shape[1]):
+        # One vectorized rule pass over the predicted soil of every item
+        soil = preds[:, SOIL_NPK_OUTPUTS]
+        fertilizer = recommend_fertilizer_batch(frame["crop"], soil[:, 0], soil[:, 1], soil[:, 2])
+
+    with timed("build_response"):
+        for i in np.flatnonzero(ok):
+            row_quantiles = quantiles[:, i] if wants_intervals[i] else None
+            row_fertilizer = fertilizer[i] if fertilizer is not None else None
+            results[i] = build_prediction_response(preds[i], total_rainfall[i], avg_temp[i], row_quantiles, row_fertilizer)
+    return results
+
+def score_requests(items: List[PredictionRequest]) -> list:
+    """
+    Score requests that may target different registry slots: each slot's
+    items are scored as one group. Returns one PredictionResponse or
+    HTTPException per item, so the micro-batcher only fails the callers
+    whose own item failed.
+    """
+    groups = {}
+    for i, item in enumerate(items):
+        groups.setdefault(item.model or registry.default, []).append(i)
+
+    results: list = [None] * len(items)
+    for name, indices in groups.items():
+        try:
+            version = resolve_model(name)
+        except HTTPException as e:
+            for i in indices:
+                results[i] = e
+            continue
+        try:
+            group_results = score_group([items[i] for i in indices], version)
+        except Exception as e:
+            group_results = [HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")] * len(indices)
+        for i, result in zip(indices, group_results):
+            results[i] = result
+    return results
+
+# Concurrent /predict calls are coalesced and scored together
+predict_batcher = MicroBatcher(
+    score_requests,
+    window_ms=float(os.environ.get("PREDICT_BATCH_WINDOW_MS", "2")),
+    max_batch_size=int(os.environ.get("PREDICT_MAX_BATCH_SIZE", "256")),
+    workers=int(os.environ.get("PREDICT_BATCH_WORKERS", "1")),
+)
+
+# Responses are cached by their canonical inputs, the model version and the
+# climate data version, so a swapped model or reloaded weather data invalidates them.
+prediction_cache = LRUCache(int(float(os.environ.get("PREDICTION_CACHE_MB", "64")) * 2**20))
+report_cache = LRUCache(int(float(os.environ.get("REPORT_CACHE_MB", "128")) * 2**20))
+cached_climate_version = climate.version
+
+def current_fingerprint() -> str:
+    global cached_climate_version
+    fingerprint = climate.version
+    if fingerprint != cached_climate_version:
+        cached_climate_version = fingerprint
+        prediction_cache.clear()
+        report_cache.clear()
+    return fingerprint
+
+def prediction_cache_key(req: PredictionRequest):
+    """Only the day of year of sowing_date reaches the model and the climatology, not the year"""
+    try:
+        sow_dt = datetime.strptime(req.sowing_date, "%Y-%m-%d")
+        version = registry.get(req.model)
+    except (ValueError, KeyError):
+        return None
+    if version is None:
+        return None
+    return (version.version, req.district, req.crop, req.season, sow_dt.timetuple().tm_yday, sow_dt.month, sow_dt.day,
+            req.include_intervals)
+
+async def get_prediction(req: PredictionRequest, fingerprint: str, key):
+    """Returns (PredictionResponse, JSON body), from the cache when possible"""
+    cache_key = (fingerprint, key)
+    if key is not None:
+        cached = prediction_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+    with timed("micro_batch"):
+        result = await predict_batcher.submit(req)
+    if isinstance(result, HTTPException):
+        raise result
+
+    # Leave prediction_intervals out of the body unless it was asked for
+    with timed("serialize"):
+        body = result.model_dump_json(exclude_none=True).encode()
+    if key is not None:
+        prediction_cache.put(cache_key, (result, body), 2 * len(body) + 512)
+    return result, body
+
+@app.post("/predict", response_model=PredictionResponse)
+async def predict(req: PredictionRequest, request: Request):
+    fingerprint = current_fingerprint()
+    key = prediction_cache_key(req)
+    headers = {}
+    if key is not None:
+        headers["ETag"] = make_etag(fingerprint, key)
+        if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+
+    _, body = await get_prediction(req, fingerprint, key)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+@app.post("/predict/batch", response_model=BatchPredictionResponse)
+def predict_batch(batch: BatchPredictionRequest):
+    """Score many requests with bulk date parsing, batched weather lookups and one predict call"""
+    if len(batch.items) > MAX_BATCH_ITEMS:
+        raise HTTPException(status_code=400, detail=f"Batch too large. At most {MAX_BATCH_ITEMS} items per call.")
+
+    results = []
+    for i, result in enumerate(score_requests(batch.items)):
+        if isinstance(result, HTTPException):
+            errors_total.inc("/predict/batch", error_cause(result))
+            results.append(BatchPredictionItem(index=i, error=result.detail))
+        else:
+            results.append(BatchPredictionItem(index=i, result=result))
+
+    return BatchPredictionResponse(results=results)
+
+@app.post("/recommend-fertilizer/batch", response_model=FertilizerBatchResponse)
+def recommend_fertilizer_plots(batch: FertilizerBatchRequest):
+    """Rule-based N/P/K for many plots from measured soil readings; needs no model. Crops without a rule get null"""
+    n_plots = len(batch.crops)
+    if n_plots > MAX_FERTILIZER_PLOTS:
+        raise HTTPException(status_code=400, detail=f"Batch too large. At most {MAX_FERTILIZER_PLOTS} plots per call.")
+    readings = []
+    for name in ("soil_N", "soil_P", "soil_K"):
+        values = getattr(batch, name)
+        if values is not None and len(values) != n_plots:
+            raise HTTPException(status_code=400, detail=f"{name} has {len(values)} values for {n_plots} crops.")
+        readings.append(None if values is None else np.array(values, dtype=np.float64))
+    with timed("fertilizer_rules"):
+        doses = recommend_fertilizer_batch(batch.crops, *readings)
+    values = doses.astype(object)
+    values[np.isnan(doses)] = None
+    return FertilizerBatchResponse(N=values[:, 0].tolist(), P=values[:, 1].tolist(), K=values[:, 2].tolist())
+
+def sowing_window_dates(req: SowingWindowRequest) -> pd.DatetimeIndex:
+    """Candidate sowing dates for the requested range, or an HTTPException if it is invalid"""
+    try:
+        start = datetime.strptime(req.start_date, "%Y-%m-%d") if req.start_date else datetime(datetime.now().year, 1, 1)
+        end = (datetime.strptime(req.end_date, "%Y-%m-%d") if req.end_date
+               else pd.Timestamp(start) + pd.DateOffset(years=1) - pd.Timedelta(days=1))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid start_date or end_date format. Use YYYY-MM-DD.")
+    dates = pd.date_range(start, end, freq="D")
+    if len(dates) == 0:
+        raise HTTPException(status_code=400, detail="end_date must not be before start_date.")
+    if len(dates) > MAX_SOWING_WINDOW_DAYS:
+        raise HTTPException(status_code=400, detail=f"Date range too long. At most {MAX_SOWING_WINDOW_DAYS} days per call.")
+    return dates
+
+def score_sowing_window(req: SowingWindowRequest, version: ModelVersion) -> SowingWindowResponse:
+    """Every candidate date of one district/crop/season with batched weather and a single predict"""
+    dates = sowing_window_dates(req)
+    n_dates = len(dates)
+    months = dates.month.to_numpy()
+    days = dates.day.to_numpy()
+    doys = dates.dayofyear.to_numpy()
+
+    districts = [req.district] * n_dates
+    avg_temp = climate.avg_temperature_batch(districts, months, days, days=100)
+    total_rainfall = climate.rainfall_forecast_batch(districts, months, days)
+    has_weather = ~(np.isnan(avg_temp) | np.isnan(total_rainfall))
+    if not has_weather.any():
+        probe = PredictionRequest(district=req.district, crop=req.crop, season=req.season,
+                                  sowing_date=dates[0].strftime("%Y-%m-%d"))
+        raise HTTPException(status_code=400, detail=weather_error_detail(probe, months[0], days[0]))
+
+    rows = None
+    if version.grid is not None:
+        rows = version.grid.lookup_days(req.district, req.crop, req.season, doys)
+    if rows is None:
+        # Combination outside the grid: one predict over all candidate days
+        model = live_model(version)
+        X = pd.DataFrame({"district": districts, "crop": req.crop, "season": req.season, "sowing_doy": doys})
+        try:
+            rows = model.predict(X)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
+
+    yields = np.asarray(rows[:, 7], dtype=np.float64)
+    harvest_days = np.asarray(rows[:, 8], dtype=np.float64)
+    labels = dates.strftime("%Y-%m-%d")
+    curve = [
+        SowingDateScore(
+            sowing_date=labels[i],
+            predicted_yield_kg_per_ha=round(float(yields[i]), 2),
+            predicted_harvest_days=round(float(harvest_days[i]), 1),
+            season_total_rainfall_mm=round(float(total_rainfall[i]), 1),
+            season_avg_temp_c=round(float(avg_temp[i]), 1),
+        )
+        for i in np.flatnonzero(has_weather)
+    ]
+    # Highest yield first, earlier dates win ties
+    order = np.argsort(-yields[has_weather], kind="stable")
+    best_dates = [curve[i] for i in order[:max(req.top_k, 0)]]
+
+    return SowingWindowResponse(
+        district=req.district, crop=req.crop, season=req.season, model_version=version.version,
+        best_dates=best_dates, curve=curve,
     )
 
+@app.post("/optimize-sowing-date", response_model=SowingWindowResponse)
+def optimize_sowing_date(req: SowingWindowRequest):
+    """Rank every sowing date in a range (a whole year by default) by predicted yield"""
+    return score_sowing_window(req, resolve_model(req.model))
+
+# Report rendering runs in separate processes so FPDF never blocks the event loop
+REPORT_POOL_SIZE = int(os.environ.get("REPORT_POOL_SIZE", "2"))
+REPORT_QUEUE_LIMIT = int(os.environ.get("REPORT_QUEUE_LIMIT", "16"))
+REPORT_RETRY_AFTER_S = int(os.environ.get("REPORT_RETRY_AFTER_S", "2"))
+report_pool = BoundedProcessPool(REPORT_POOL_SIZE, REPORT_QUEUE_LIMIT, preload=["report_utils"])
+
 @app.post("/download-report")
-async def download_report(req: PredictionRequest):
-    """Generate and return a PDF report for the prediction as bytes"""
-    prediction_response = predict(req)
+async def download_report(req: PredictionRequest, request: Request):
+    """
+    Generate and return a PDF report for the prediction as bytes. Reports
+    are cached per model and climate version, so a cached report keeps the
+    "Generated" time of its first rendering.
+    """
+    fingerprint = current_fingerprint()
+    # Requests that cannot be keyed (bad date, unknown or unloaded model) are never cached
+    prediction_key = prediction_cache_key(req)
+    report_key = None
+    headers = {}
+    if prediction_key is not None:
+        # The sowing date is printed in the report, so it is keyed verbatim
+        report_key = ("report", prediction_key[0], req.district, req.crop, req.season, req.sowing_date)
+        headers["ETag"] = make_etag(fingerprint, report_key)
+        if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+            return Response(status_code=304, headers=headers)
 
-    pdf_content: bytes = report_utils.generate_pdf_report(prediction_response, req)
+    pdf_content = report_cache.get((fingerprint, report_key)) if report_key is not None else None
+    if pdf_content is None:
+        # Scoring goes through the micro-batcher's thread pool, off the event loop
+        prediction_response, _ = await get_prediction(req, fingerprint, prediction_key)
 
-    pdf_stream = BytesIO(pdf_content)
+        try:
+            with timed("render_pdf"):
+                pdf_content = await report_pool.run(
+                    report_utils.render_report_bytes, prediction_response.model_dump(), req.model_dump()
+                )
+        except PoolSaturated:
+            raise HTTPException(
+                status_code=503,
+                detail="Report generation is busy. Please retry shortly.",
+                headers={"Retry-After": str(REPORT_RETRY_AFTER_S)}
+            )
+        if report_key is not None:
+            report_cache.put((fingerprint, report_key), pdf_content, len(pdf_content))
 
     return StreamingResponse(
-        pdf_stream,
+        iter_byte_chunks(pdf_content),
         media_type="application/pdf",
         headers={
-            "Content-Disposition": f"attachment; filename=crop_report_{req.district}_{req.crop}.pdf"
+            "Content-Disposition": f"attachment; filename=crop_report_{req.district}_{req.crop}.pdf",
+            "Content-Length": str(len(pdf_content)),
+            **headers
         }
     )
 
+# Bulk exports are scored and rendered chunk by chunk, with up to one chunk
+# per report worker in flight, so memory stays flat for any number of items
+EXPORT_CHUNK_SIZE = int(os.environ.get("EXPORT_CHUNK_SIZE", "250"))
+EXPORT_FORMATS = {"pdf": "application/pdf", "zip": "application/zip"}
+
+class ZipSink:
+    """Write-only buffer for zipfile; having no seek() makes it emit a streamable archive"""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+def render_separately(render, payload: list, generated_at: str) -> list:
+    """
+    Fallback for a chunk that failed to render: each item on its own, so one
+    bad item only costs its own report, which becomes an error page.
+    Returns one rendered entry per item, like render.
+    """
+    rendered = []
+    for response, request in payload:
+        try:
+            rendered.extend(render([(response, request)], generated_at))
+            continue
+        except Exception as e:
+            errors_total.inc("/download-report/bulk", "report_render")
+            error = {"error": f"Report rendering error: {str(e)}"}
+        try:
+            rendered.extend(render([(error, request)], generated_at))
+        except Exception:
+            # Even the request's own fields cannot be printed
+            rendered.extend(render([(error, dict.fromkeys(request, "-"))], generated_at))
+    return rendered
+
+async def render_export_chunk(items: List[PredictionRequest], render, generated_at: str) -> list:
+    """
+    Score one chunk in a thread and render its reports in a worker process.
+    Never raises: the response is already streaming, so failures become
+    error pages for the items they affect.
+    """
+    with timed("export_score"):
+        try:
+            results = await run_in_threadpool(score_requests, items)
+        except Exception as e:
+            results = [HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")] * len(items)
+    payload = []
+    for req, result in zip(items, results):
+        if isinstance(result, HTTPException):
+            errors_total.inc("/download-report/bulk", error_cause(result))
+            payload.append(({"error": str(result.detail)}, req.model_dump()))
+        else:
+            payload.append((result.model_dump(), req.model_dump()))
+    with timed("render_pdf"):
+        try:
+            return await report_pool.run(render, payload, generated_at)
+        except PoolSaturated:
+            # The response is already streaming, so render here rather than fail it
+            try:
+                return await run_in_threadpool(render, payload, generated_at)
+            except Exception as e:
+                failure = e
+        except Exception as e:
+            failure = e
+        print(f"Warning: rendering an export chunk of {len(payload)} reports failed, rendering them one by one: {failure}")
+        return await run_in_threadpool(render_separately, render, payload, generated_at)
+
+async def export_chunks(items: List[PredictionRequest], render, generated_at: str):
+    """Rendered chunks in request order, keeping REPORT_POOL_SIZE + 1 chunks in flight"""
+    starts = iter(range(0, len(items), EXPORT_CHUNK_SIZE))
+    pending = deque()
+    try:
+        for start in starts:
+            pending.append(asyncio.ensure_future(
+                render_export_chunk(items[start:start + EXPORT_CHUNK_SIZE], render, generated_at)
+            ))
+            if len(pending) > REPORT_POOL_SIZE:
+                yield await pending.popleft()
+        while pending:
+            yield await pending.popleft()
+    finally:
+        # A client that disconnects mid-download leaves nothing running
+        for task in pending:
+            task.cancel()
+
+async def stream_report_pdf(items: List[PredictionRequest], generated_at: str):
+    writer = report_utils.PdfStreamWriter(report_utils.report_template())
+    yield writer.header()
+    async for chunk in export_chunks(items, report_utils.render_report_pages, generated_at):
+        yield b"".join(writer.pages(contents) for contents in chunk)
+    yield writer.trailer()
+
+async def stream_report_zip(items: List[PredictionRequest], generated_at: str):
+    sink = ZipSink()
+    date_time = datetime.strptime(generated_at, "%Y-%m-%d %H:%M:%S").timetuple()[:6]
+    index = 0
+    # PDFs are already deflated, so entries are stored as they are
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_STORED) as archive:
+        async for chunk in export_chunks(items, report_utils.render_report_files, generated_at):
+            for pdf_content in chunk:
+                req = items[index]
+                name = f"{index + 1:05d}_{req.district}_{req.crop}_{req.season}.pdf".replace("/", "-")
+                archive.writestr(zipfile.ZipInfo(name, date_time), pdf_content)
+                index += 1
+            yield sink.drain()
+    yield sink.drain()
+
+@app.post("/download-report/bulk")
+async def download_reports(export: ReportExportRequest):
+    """
+    Reports for many predictions, streamed as one multi-page PDF or as a ZIP
+    of PDFs. Items that cannot be scored get a page stating why.
+    """
+    if export.format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unknown export format {export.format!r}. Use 'pdf' or 'zip'.")
+    if len(export.items) > MAX_EXPORT_ITEMS:
+        raise HTTPException(status_code=400, detail=f"Batch too large. At most {MAX_EXPORT_ITEMS} reports per export.")
+    # Fail before streaming starts; later errors can only show up in the file
+    if not registry.ready():
+        raise HTTPException(status_code=503, detail=MODEL_NOT_LOADED)
+
+    generated_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    stream = stream_report_pdf if export.format == "pdf" else stream_report_zip
+    return StreamingResponse(
+        stream(export.items, generated_at),
+        media_type=EXPORT_FORMATS[export.format],
+        headers={"Content-Disposition": f"attachment; filename=crop_reports.{export.format}"}
+    )
+
+def current_stats_view():
+    view = stats_cube.view
+    if view is None:
+        raise HTTPException(status_code=503, detail="Statistics are not loaded yet. Please retry shortly.")
+    return view
+
+def stats_filters(district, crop, season, sowing_month) -> dict:
+    return {"district": district, "crop": crop, "season": season, "sowing_month": sowing_month}
+
+@app.get("/stats")
+def stats(district: Optional[str] = None, crop: Optional[str] = None, season: Optional[str] = None,
+          sowing_month: Optional[int] = None):
+    """Historical yield, harvest days and fertilizer statistics; filters left out are aggregated over"""
+    view = current_stats_view()
+    filters = stats_filters(district, crop, season, sowing_month)
+    try:
+        result = view.query(filters)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=f"Unknown stats filter {e.args[0]}.")
+    return dict(filters={k: v for k, v in filters.items() if v is not None}, **result)
+
+@app.get("/stats/by/{dimension}")
+def stats_by(dimension: str, district: Optional[str] = None, crop: Optional[str] = None,
+             season: Optional[str] = None, sowing_month: Optional[int] = None):
+    """The same statistics for every value of one dimension, e.g. /stats/by/district?crop=Rice"""
+    if dimension not in DIMENSIONS:
+        raise HTTPException(status_code=400, detail=f"Unknown dimension '{dimension}'. Use one of {DIMENSIONS}.")
+    view = current_stats_view()
+    filters = stats_filters(district, crop, season, sowing_month)
+    try:
+        groups = view.breakdown(dimension, filters)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=f"Unknown stats filter {e.args[0]}.")
+    return {"dimension": dimension, "filters": {k: v for k, v in filters.items() if v is not None}, "groups": groups}
+
+@app.get("/forecast-temp")
+def forecast_temp(
+    district: str = Query(..., description="District name (e.g., 'Cuttack')"),
+    start_date: str = Query(..., description="Start date in YYYY-MM-DD format (year is ignored)")
+):
+    """Average daily temperature over the 100 days starting from the given MM-DD"""
+    try:
+        start_date_obj = datetime.strptime(start_date, "%Y-%m-%d")
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD.")
+    try:
+        avg_temp = climate.avg_temperature(district, start_date_obj.month, start_date_obj.day, days=100)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return {
+        "district": district.strip().title(),
+        "start_date_mmdd": start_date_obj.strftime("%m-%d"),
+        "period_days": 100,
+        "total_temp_c": round(avg_temp * 100, 2),
+        "average_temp_c_per_day": round(avg_temp, 2)
+    }
+
 @app.get("/")
 def read_root():
     return {"message": "Odisha Crop Yield Prediction API"}
 
+@app.get("/ready")
+def ready():
+    """Readiness probe: 200 once predictions can be served, 503 before that"""
+    version = registry.current.get(registry.default)
+    status = {
+        "ready": registry.ready(),
+        "model_loaded": version is not None and version.pipeline is not None,
+        "model_loading": registry.default in registry.loading,
+        "model_load_mode": version.mode if version is not None else None,
+        "model_load_seconds": version.load_seconds if version is not None else None,
+        "prediction_grid": version is not None and version.grid is not None
+    }
+    if not status["ready"]:
+        return JSONResponse(status_code=503, content=status)
+    return status
+
 @app.get("/model-info")
 def model_info():
     """Check what the model is configured to predict"""
-    if pipeline is None:
-        return {"error": "Model not loaded"}
+    version = registry.current.get(registry.default)
+    if version is None:
+        return {"error": "Model not loaded", "registry": registry.info()}
     
     # The new model has 12 outputs
     info = {
-        "outputs": n_outputs,
-        "has_fertilizer_predictions": n_outputs >= 12  # 12 outputs total
+        "outputs": version.n_outputs,
+        "has_fertilizer_predictions": version.n_outputs >= 12,  # 12 outputs total
+        "fertilizer_source": "rules" if uses_fertilizer_rules(version.n_outputs) else "model",
+        "version": version.version,
+        "registry": registry.info(),
+        "caches": {
+            "predictions": prediction_cache.stats(),
+            "reports": report_cache.stats()
+        },
+        "climate": climate.info()
     }
     
     return info
 
+@app.get("/metrics")
+def prometheus_metrics():
+    """Request, error and per-stage latency metrics plus model and cache state, in Prometheus text format"""
+    versions = [registry.current[name] for name in registry.sources if name in registry.current]
+    model_gauges = render_samples(
+        "odisha_model_load_seconds", "Time the resident model version took to load", ["model", "version", "mode"],
+        {(v.name, v.version, v.mode): v.load_seconds for v in versions if v.load_seconds is not None},
+    ) + render_samples(
+        "odisha_model_resident_bytes", "Bytes of model artifacts held by each slot", ["model", "version"],
+        {(v.name, v.version): v.nbytes for v in versions},
+    ) + render_samples(
+        "odisha_model_ready", "1 once the default model can serve requests", [], {(): int(registry.ready())},
+    )
+
+    cache_stats = {"prediction": prediction_cache.stats(), "report": report_cache.stats()}
+    cache_gauges = []
+    for field, help_text, kind in [("hits", "Cache hits", "counter"), ("misses", "Cache misses", "counter"),
+                                   ("evictions", "Cache evictions", "counter"), ("entries", "Cached entries", "gauge"),
+                                   ("bytes", "Approximate cached bytes", "gauge")]:
+        name = f"odisha_cache_{field}_total" if kind == "counter" else f"odisha_cache_{field}"
+        cache_gauges += render_samples(name, help_text, ["cache"],
+                                     {(cache, ): stats[field] for cache, stats in cache_stats.items()}, kind)
+
+    return Response(content=metrics.render(model_gauges, cache_gauges), media_type="text/plain; version=0.0.4")
+
+def check_admin(request: Request):
+    """Admin endpoints are closed unless ADMIN_TOKEN is set and sent as X-Admin-Token"""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled. Set ADMIN_TOKEN to enable them.")
+    if not hmac.compare_digest(request.headers.get("x-admin-token", "").encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail="Invalid admin token.")
+
+@app.post("/admin/reload-model", status_code=202)
+def reload_model(request: Request, name: Optional[str] = None):
+    """Load a slot's artifact again in the background and swap it in when ready"""
+    check_admin(request)
+    try:
+        started = registry.reload(name)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown model '{name}'. Available: {sorted(registry.sources)}")
+    return {"model": name or registry.default, "reload_started": started}
+
+@app.post("/admin/refresh-stats")
+def refresh_stats(request: Request):
+    """Fold rows appended to the crop CSV into the stats cube now instead of at the next poll"""
+    check_admin(request)
+    return {"new_rows": stats_cube.refresh(), **stats_cube.info()}
+
 origins = ["http://localhost:3000", "http://127.0.0.1:5500", "http://localhost:8000"]
 app.add_middleware(
     CORSMiddleware,
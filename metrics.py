@@ -0,0 +1,219 @@
+# metrics.py
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter as StackCounter, deque
+from contextlib import contextmanager
+
+# In-process counters and latency histograms rendered in the Prometheus
+# text format. Recording is a perf_counter call, a bisect and a locked
+# increment, cheap enough to leave on in the hot path.
+
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(names, values, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labelnames=()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.labelnames, labels)} {value}")
+        return lines
+
+class Histogram:
+    """Cumulative-bucket histogram per label combination, as Prometheus expects"""
+
+    def __init__(self, name: str, help_text: str, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}  # labels -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = {labels: list(series) for labels, series in self._series.items()}
+        for labels, series in sorted(snapshot.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), series[:-1]):
+                cumulative += count
+                le = f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {series[-1]}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+def render_samples(name: str, help_text: str, labelnames, samples: dict, kind: str = "gauge") -> list:
+    """A metric computed at scrape time from {label values: value}; kind="counter" for running totals"""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    for labels, value in samples.items():
+        lines.append(f"{name}{_labels(labelnames, labels)} {value}")
+    return lines
+
+request_seconds = Histogram("odisha_request_duration_seconds", "HTTP request latency", ["path"])
+requests_total = Counter("odisha_requests_total", "HTTP requests by route and status", ["path", "status"])
+errors_total = Counter("odisha_errors_total", "Failed requests and batch items by cause", ["path", "cause"])
+stage_seconds = Histogram("odisha_stage_duration_seconds", "Latency of each request-handling stage", ["stage"])
+
+@contextmanager
+def timed(stage: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stage_seconds.observe(time.perf_counter() - start, stage)
+
+def render(*extra_sections) -> str:
+    lines = []
+    for metric in (requests_total, errors_total, request_seconds, stage_seconds):
+        lines.extend(metric.render())
+    for section in extra_sections:
+        lines.extend(section)
+    return "\n".join(lines) + "\n"
+
+# Threads parked in these frames are idle and left out of profiles
+IDLE_FRAMES = {
+    ("threading.py", "wait"), ("selectors.py", "select"), ("queue.py", "get"),
+    ("thread.py", "_worker"), ("base_events.py", "_run_once"),
+    # Watcher threads sleeping between checks; while a check runs, its
+    # frames sit above _watch and are sampled as usual
+    ("model_registry.py", "_watch"), ("climate.py", "_watch"), ("analytics.py", "_watch"),
+}
+
+def _folded_stack(frame):
+    """'outer;...;leaf' frame labels for one thread, or None if it is idle"""
+    if (os.path.basename(frame.f_code.co_filename), frame.f_code.co_name) in IDLE_FRAMES:
+        return None
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+class SlowRequestProfiler:
+    """
+    Opt-in sampling profiler. A daemon thread records the Python stack of
+    every busy thread each interval_ms into a short ring buffer; when a
+    request exceeds threshold_ms, the samples taken during it are written
+    as folded stacks ("a;b;c count" lines) that flamegraph.pl and
+    speedscope read. Samples are process-wide, so concurrent requests
+    show up in each other's profiles.
+    """
+
+    def __init__(self, threshold_ms: float, interval_ms: float = 5.0, out_dir: str = "profiles",
+                 history_s: float = 60.0):
+        self.threshold_s = threshold_ms / 1000
+        self.interval_s = interval_ms / 1000
+        self.out_dir = out_dir
+        self.samples = deque(maxlen=max(1, int(history_s / self.interval_s)))
+        self.dumped = 0
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="slow-request-profiler", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while True:
+            time.sleep(self.interval_s)
+            now = time.perf_counter()
+            stacks = [
+                stack for thread_id, frame in sys._current_frames().items()
+                if thread_id != own_id and (stack := _folded_stack(frame)) is not None
+            ]
+            self.samples.append((now, stacks))
+
+    def request_finished(self, name: str, start: float, end: float):
+        """Writes the profile of a slow request and returns its path, None if it was fast"""
+        if end - start < self.threshold_s:
+            return None
+        counts = StackCounter(
+            stack for taken_at, stacks in list(self.samples) if start <= taken_at <= end for stack in stacks
+        )
+        if not counts:
+            return None
+        os.makedirs(self.out_dir, exist_ok=True)
+        safe_name = "".join(c if c.isalnum() else "_" for c in name.strip("/")) or "root"
+        path = os.path.join(self.out_dir, f"{time.strftime('%Y%m%d-%H%M%S')}-{int((end - start) * 1000)}ms-{safe_name}.folded")
+        with open(path, "w") as f:
+            for stack, count in counts.most_common():
+                f.write(f"{stack} {count}\n")
+        self.dumped += 1
+        return path
+
+class MetricsMiddleware:
+    """Plain ASGI middleware: per-route request counts and latency, plus the slow-request profiler hook"""
+
+    def __init__(self, app, profiler: SlowRequestProfiler = None):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        except Exception:
+            errors_total.inc(self._path(scope), "unhandled")
+            raise
+        finally:
+            end = time.perf_counter()
+            path = self._path(scope)
+            request_seconds.observe(end - start, path)
+            requests_total.inc(path, str(status))
+            if self.profiler is not None:
+                profile = self.profiler.request_finished(path, start, end)
+                if profile is not None:
+                    print(f"Slow request {path} took {(end - start) * 1000:.0f} ms, profile written to {profile}")
+
+    @staticmethod
+    def _path(scope) -> str:
+        # The route template keeps label cardinality bounded
+        route = scope.get("route")
+        return getattr(route, "path", "unmatched")
@@ -0,0 +1,259 @@
+# model_registry.py
+import hashlib
+import os
+import threading
+import time
+from datetime import datetime
+import joblib
+from prediction_grid import PredictionGrid, grid_paths
+from forest_store import forest_dir, load_forest_pipeline, per_tree_forest
+from fast_path import build_fast_path
+
+def count_model_outputs(pipe) -> int:
+    """Check how many outputs the model has"""
+    model = pipe.named_steps['model']
+    if hasattr(model, 'n_outputs_'):
+        # A natively multi-output forest has one set of trees for all targets
+        return model.n_outputs_
+    # For MultiOutputRegressor, we need to check the number of estimators
+    return len(model.estimators_)
+
+def artifact_files(path: str):
+    """Every file a model version is loaded from"""
+    return [path, *grid_paths(path), os.path.join(forest_dir(path), "meta.json")]
+
+def artifact_version(path: str) -> str:
+    """Short id that changes whenever any of the version's files change"""
+    digest = hashlib.sha1()
+    for file in artifact_files(path):
+        try:
+            stat = os.stat(file)
+            digest.update(f"{file}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+        except OSError:
+            digest.update(f"{file}:missing;".encode())
+    return digest.hexdigest()[:12]
+
+class ModelVersion:
+    """
+    One loaded artifact: the prediction grid (if any) plus the pipeline.
+
+    With a grid the pipeline is only loaded on the first miss; without one
+    it is loaded up front. A mapped forest serves batches of any size in
+    row chunks, so the pickle is only loaded when no forest was exported.
+    Objects are never mutated once they serve traffic except for that lazy
+    load and unload(), so a request that holds a version keeps working
+    while the registry swaps in a new one.
+    """
+
+    def __init__(self, name: str, path: str, load_mode: str = "auto"):
+        self.name = name
+        self.path = path
+        self.load_mode = load_mode
+        self.version = artifact_version(path)
+        self.grid = PredictionGrid.load(path)
+        self.pipeline = None
+        self.fast_path = None
+        self.interval_model = None
+        self.n_outputs = self.grid.n_outputs if self.grid is not None else 0
+        self.mode = None
+        self.nbytes = 0
+        self.loaded_at = datetime.now().isoformat(timespec="seconds")
+        self.load_seconds = None
+        self.last_used = time.monotonic()
+        self._lock = threading.Lock()
+        self.on_load = None
+
+    def _load_artifact(self):
+        """Returns (pipeline, mode, resident bytes) according to load_mode"""
+        if self.load_mode in ("auto", "mmap"):
+            mapped = load_forest_pipeline(self.path)
+            if mapped is not None:
+                directory = forest_dir(self.path)
+                nbytes = sum(os.path.getsize(os.path.join(directory, f)) for f in os.listdir(directory))
+                return mapped, "mmap", nbytes
+            print(f"Warning: no usable exported forest for {self.path}, falling back to the pickle. "
+                  f"Run forest_store.py to export it.")
+        return joblib.load(self.path), "pickle", os.path.getsize(self.path)
+
+    def get_pipeline(self):
+        """Load the pipeline once; raises FileNotFoundError if the model file is missing"""
+        pipeline = self.pipeline
+        if pipeline is not None:
+            return pipeline
+        loaded = None
+        with self._lock:
+            pipeline = self.pipeline
+            if pipeline is None:
+                start = time.perf_counter()
+                loaded, mode, nbytes = self._load_artifact()
+                self.n_outputs = count_model_outputs(loaded)
+                # Single rows skip pandas and the ColumnTransformer when this checks out
+                self.fast_path = build_fast_path(loaded)
+                self.mode, self.nbytes = mode, nbytes
+                self.load_seconds = round(time.perf_counter() - start, 3)
+                self.pipeline = pipeline = loaded
+                print(f"Model '{self.name}' {self.version} loaded with {self.n_outputs} outputs ({mode}, {self.load_seconds}s)")
+        # Outside the lock: the budget check takes other versions' locks
+        if loaded is not None and self.on_load is not None:
+            self.on_load(self)
+        return pipeline
+
+    def get_interval_model(self):
+        """(preproc, per-tree forest) for prediction intervals"""
+        pipeline = self.get_pipeline()
+        interval_model = self.interval_model
+        if interval_model is not None:
+            return interval_model
+        with self._lock:
+            if self.interval_model is None:
+                self.interval_model = (pipeline.named_steps['preproc'], per_tree_forest(pipeline.named_steps['model']))
+            return self.interval_model
+
+    def unload(self, blocking: bool = True) -> bool:
+        """Drop the loaded pipelines; False if blocking is off and the version is busy loading"""
+        if not self._lock.acquire(blocking):
+            return False
+        try:
+            self.pipeline = None
+            self.fast_path = None
+            self.interval_model = None
+            self.nbytes = 0
+        finally:
+            self._lock.release()
+        return True
+
+    def info(self) -> dict:
+        return {
+            "name": self.name,
+            "path": self.path,
+            "version": self.version,
+            "outputs": self.n_outputs,
+            "loaded_at": self.loaded_at,
+            "load_seconds": self.load_seconds,
+            "load_mode": self.mode,
+            "model_in_memory": self.pipeline is not None,
+            "resident_bytes": self.nbytes,
+            "prediction_grid_shape": list(self.grid.grid.shape) if self.grid is not None else None,
+        }
+
+class ModelRegistry:
+    """
+    Named model slots (e.g. "default", per-season or A/B variants), each
+    pointing at its current ModelVersion.
+
+    New versions are loaded on a background thread and swapped in with a
+    single assignment, so in-flight requests finish on the version they
+    started with. Resident pipelines are kept under max_bytes by unloading
+    the least recently used ones; they reload lazily on their next use.
+    """
+
+    def __init__(self, sources: dict, default: str = "default", max_bytes: int = 2 * 2**30,
+                 load_mode: str = "auto", watch_interval: float = 0.0):
+        self.sources = dict(sources)
+        self.default = default
+        self.max_bytes = max_bytes
+        self.load_mode = load_mode
+        self.watch_interval = watch_interval
+        self.current = {}
+        self.loading = set()
+        self.last_error = {}
+        self._lock = threading.Lock()
+        self._watched = {}
+
+    def get(self, name: str = None):
+        """Current version for a slot, None while it is not loaded yet; KeyError if unknown"""
+        name = name or self.default
+        if name not in self.sources:
+            raise KeyError(name)
+        version = self.current.get(name)
+        if version is not None:
+            version.last_used = time.monotonic()
+        return version
+
+    def ready(self) -> bool:
+        return self.current.get(self.default) is not None
+
+    def _load(self, name: str):
+        path = self.sources[name]
+        try:
+            version = ModelVersion(name, path, self.load_mode)
+            version.on_load = self._enforce_budget
+            if version.grid is None:
+                version.get_pipeline()
+            elif name in self.current and self.current[name].pipeline is not None:
+                # Keep warm slots warm across a swap
+                version.get_pipeline()
+            self.current[name] = version  # atomic swap
+            self.last_error.pop(name, None)
+        except FileNotFoundError:
+            self.last_error[name] = f"Model file {path} not found. Please train the model first."
+            print(f"Warning: Model file {path} not found. Please train the model first.")
+        except Exception as e:
+            self.last_error[name] = str(e)
+            print(f"Warning: loading model '{name}' from {path} failed: {e}")
+        finally:
+            self._watched[name] = artifact_version(path)
+            with self._lock:
+                self.loading.discard(name)
+
+    def reload(self, name: str = None, background: bool = True) -> bool:
+        """Load the slot's artifact again and swap it in; False if a load is already running"""
+        name = name or self.default
+        if name not in self.sources:
+            raise KeyError(name)
+        with self._lock:
+            if name in self.loading:
+                return False
+            self.loading.add(name)
+        if background:
+            threading.Thread(target=self._load, args=(name,), name=f"model-loader-{name}", daemon=True).start()
+        else:
+            self._load(name)
+        return True
+
+    def start(self, background: bool = True):
+        self.reload(self.default, background=background)
+        if self.watch_interval > 0:
+            threading.Thread(target=self._watch, name="model-watcher", daemon=True).start()
+
+    def _watch(self):
+        # Reload once an artifact changed and has been stable for one interval,
+        # so a retrain that writes several files is picked up as one version
+        pending = {}
+        while True:
+            time.sleep(self.watch_interval)
+            for name, path in self.sources.items():
+                if name != self.default and name not in self.current:
+                    continue  # not in use yet, loads on first request
+                version = artifact_version(path)
+                if version == self._watched.get(name):
+                    pending.pop(name, None)
+                elif pending.get(name) == version:
+                    pending.pop(name, None)
+                    self.reload(name)
+                else:
+                    pending[name] = version
+
+    def _enforce_budget(self, just_loaded: ModelVersion):
+        resident = [v for v in self.current.values() if v.pipeline is not None and v is not just_loaded]
+        total = just_loaded.nbytes + sum(v.nbytes for v in resident)
+        for version in sorted(resident, key=lambda v: v.last_used):
+            if total <= self.max_bytes:
+                break
+            # A version that is loading right now is skipped rather than waited on
+            nbytes = version.nbytes
+            if version.unload(blocking=False):
+                total -= nbytes
+                print(f"Unloading model '{version.name}' {version.version} to stay within the memory budget")
+
+    def info(self) -> dict:
+        return {
+            "default": self.default,
+            "memory_budget_bytes": self.max_bytes,
+            "resident_bytes": sum(v.nbytes for v in self.current.values()),
+            "models": [
+                dict(self.current[name].info(), loading=name in self.loading) if name in self.current
+                else {"name": name, "path": path, "loading": name in self.loading, "error": self.last_error.get(name)}
+                for name, path in self.sources.items()
+            ],
+        }
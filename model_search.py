@@ -0,0 +1,212 @@
+# model_search.py
+import hashlib
+import io
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.metrics import mean_squared_error, r2_score
+from sklearn.model_selection import KFold
+from forest_store import FlatForest
+from cache import artifact_signature
+from train_model import (
+    DATA_PATH, RANDOM_STATE, build_model, build_preprocessor, feature_cols, load_dataset, target_cols,
+)
+
+# Cross-validated hyperparameter search. The fitted ColumnTransformer output
+# of every fold is written once as .npy files, so candidates only fit the
+# forest; each finished (candidate, fold) is appended to results.jsonl and
+# skipped when an interrupted search is started again.
+
+SEARCH_DIR = "model_search"
+DEFAULT_SEARCH_GRID = "kind=multioutput,native;n_estimators=50,100,200;max_depth=None,20;min_samples_leaf=1,4"
+
+def _parse_value(text: str):
+    if text == "None":
+        return None
+    for cast in (int, float):
+        try:
+            return cast(text)
+        except ValueError:
+            pass
+    return text
+
+def parse_search_grid(spec: str) -> list:
+    """'kind=native;n_estimators=50,100' -> every combination as a list of parameter dicts"""
+    axes = {}
+    for part in spec.split(";"):
+        if not part.strip():
+            continue
+        name, _, values = part.partition("=")
+        axes[name.strip()] = [_parse_value(v.strip()) for v in values.split(",")]
+    return [dict(zip(axes, combo)) for combo in itertools.product(*axes.values())]
+
+def candidate_id(params: dict) -> str:
+    return ",".join(f"{name}={params[name]}" for name in sorted(params))
+
+def prepare_folds(X: pd.DataFrame, y: pd.DataFrame, n_folds: int, root: str = SEARCH_DIR,
+                  data_path: str = DATA_PATH) -> str:
+    """
+    Fits the preprocessor on each training fold and caches the transformed
+    folds under a directory keyed by the dataset and the split; returns it.
+    """
+    key = hashlib.sha1(json.dumps({
+        "data": artifact_signature(data_path) if os.path.exists(data_path) else None,
+        "rows": len(X), "folds": n_folds, "random_state": RANDOM_STATE,
+    }, sort_keys=True).encode()).hexdigest()[:12]
+    cache_dir = os.path.join(root, key)
+    if os.path.exists(os.path.join(cache_dir, "folds.json")):
+        return cache_dir
+
+    os.makedirs(cache_dir, exist_ok=True)
+    splits = KFold(n_splits=n_folds, shuffle=True, random_state=RANDOM_STATE).split(X)
+    for fold, (train_idx, val_idx) in enumerate(splits):
+        preproc = build_preprocessor().fit(X.iloc[train_idx])
+        # Trees compare float32 features, so float32 loses nothing
+        arrays = {
+            "X_train": preproc.transform(X.iloc[train_idx]).astype(np.float32),
+            "X_val": preproc.transform(X.iloc[val_idx]).astype(np.float32),
+            "y_train": y.iloc[train_idx].to_numpy(dtype=np.float64),
+            "y_val": y.iloc[val_idx].to_numpy(dtype=np.float64),
+        }
+        for name, array in arrays.items():
+            np.save(os.path.join(cache_dir, f"fold{fold}_{name}.npy"), array)
+    with open(os.path.join(cache_dir, "folds.json"), "w") as f:
+        json.dump({"folds": n_folds, "rows": len(X)}, f)
+    return cache_dir
+
+def evaluate_candidate(cache_dir: str, fold: int, params: dict, n_latency: int = 50) -> dict:
+    """Fit one candidate on one cached fold; runs in a pool worker"""
+    load = lambda name: np.load(os.path.join(cache_dir, f"fold{fold}_{name}.npy"), mmap_mode="r")
+    X_train, X_val, y_train, y_val = load("X_train"), load("X_val"), load("y_train"), load("y_val")
+
+    # One core per worker, the pool provides the parallelism
+    model = build_model(n_jobs=1, **params)
+    start = time.perf_counter()
+    model.fit(X_train, y_train)
+    fit_s = time.perf_counter() - start
+
+    y_pred = model.predict(X_val)
+    rmse = [float(np.sqrt(mean_squared_error(y_val[:, i], y_pred[:, i]))) for i in range(len(target_cols))]
+    r2 = [float(r2_score(y_val[:, i], y_pred[:, i])) for i in range(len(target_cols))]
+
+    # Latency as served: the flattened forest, one row and a 1000-row batch
+    flat = FlatForest.from_model(model)
+    row = np.asarray(X_val[:1])
+    flat.predict(row)  # warm-up
+    timings = []
+    for _ in range(n_latency):
+        start = time.perf_counter()
+        flat.predict(row)
+        timings.append(time.perf_counter() - start)
+    batch = np.asarray(X_val[:1000])
+    start = time.perf_counter()
+    flat.predict(batch)
+    batch_ms = (time.perf_counter() - start) * 1000
+
+    buffer = io.BytesIO()
+    joblib.dump(model, buffer)
+
+    return {
+        "candidate": candidate_id(params),
+        "params": params,
+        "fold": fold,
+        "fit_s": fit_s,
+        "single_ms": float(np.median(timings)) * 1000,
+        "batch_ms_per_1k": batch_ms * 1000 / len(batch),
+        "size_mb": buffer.tell() / 1e6,
+        "rmse": rmse,
+        "r2": r2,
+    }
+
+def load_results(path: str) -> list:
+    """
+    Finished (candidate, fold) results. A last line cut off by an
+    interruption is truncated away, so the next result appended starts on
+    a line of its own.
+    """
+    results = []
+    if not os.path.exists(path):
+        return results
+    with open(path, "rb+") as f:
+        data = f.read()
+        if data and not data.endswith(b"\n"):
+            f.truncate(data.rfind(b"\n") + 1)
+    with open(path) as f:
+        for line in f:
+            try:
+                results.append(json.loads(line))
+            except json.JSONDecodeError:
+                pass
+    return results
+
+def build_leaderboard(results: list, candidates: list) -> pd.DataFrame:
+    """Per-candidate means over folds, best mean R2 first, lower single-row latency breaking ties"""
+    wanted = {candidate_id(params) for params in candidates}
+    rows = []
+    for result in results:
+        if result["candidate"] not in wanted:
+            continue
+        rows.append({
+            "candidate": result["candidate"],
+            "mean_r2": float(np.mean(result["r2"])),
+            "yield_rmse": result["rmse"][target_cols.index("yield_kg_per_ha")],
+            "yield_r2": result["r2"][target_cols.index("yield_kg_per_ha")],
+            "harvest_days_rmse": result["rmse"][target_cols.index("harvest_days")],
+            "fit_s": result["fit_s"],
+            "single_ms": result["single_ms"],
+            "batch_ms_per_1k": result["batch_ms_per_1k"],
+            "size_mb": result["size_mb"],
+        })
+    if not rows:
+        return pd.DataFrame()
+    board = pd.DataFrame(rows).groupby("candidate").agg(
+        folds=("mean_r2", "size"), **{col: (col, "mean") for col in rows[0] if col != "candidate"}
+    )
+    return board.sort_values(["mean_r2", "single_ms"], ascending=[False, True]).reset_index()
+
+def run_search(args):
+    """Parallel k-fold CV over the hyperparameter grid, resumable, ending with a leaderboard"""
+    candidates = parse_search_grid(args.grid)
+    df = load_dataset(args.data)
+    X, y = df[feature_cols], df[target_cols]
+
+    print(f"Preparing {args.folds} cached preprocessing folds...")
+    cache_dir = prepare_folds(X, y, args.folds, data_path=args.data)
+    results_path = os.path.join(cache_dir, "results.jsonl")
+    results = load_results(results_path)
+    done = {(result["candidate"], result["fold"]) for result in results}
+    tasks = [
+        (params, fold) for params in candidates for fold in range(args.folds)
+        if (candidate_id(params), fold) not in done
+    ]
+    print(f"{len(candidates)} candidates x {args.folds} folds: {len(tasks)} fits to run, "
+          f"{len(candidates) * args.folds - len(tasks)} already done in {cache_dir}")
+
+    if tasks:
+        with ProcessPoolExecutor(max_workers=args.jobs) as pool, open(results_path, "a") as out:
+            futures = {pool.submit(evaluate_candidate, cache_dir, fold, params): (params, fold) for params, fold in tasks}
+            for i, future in enumerate(as_completed(futures), 1):
+                params, fold = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"Warning: {candidate_id(params)} fold {fold} failed: {e}")
+                    continue
+                # One line per finished fit so an interrupted search resumes from here
+                out.write(json.dumps(result) + "\n")
+                out.flush()
+                results.append(result)
+                print(f"[{i}/{len(tasks)}] {result['candidate']} fold {fold}: "
+                      f"mean R2={np.mean(result['r2']):.3f}, fit {result['fit_s']:.1f}s, {result['single_ms']:.2f} ms/row")
+
+    board = build_leaderboard(results, candidates)
+    leaderboard_path = os.path.join(SEARCH_DIR, "leaderboard.csv")
+    board.to_csv(leaderboard_path, index=False)
+    with pd.option_context("display.width", 200, "display.max_columns", None, "display.float_format", "{:.3f}".format):
+        print("\n" + board.to_string(index=False))
+    print(f"✅ Leaderboard saved as {leaderboard_path}")
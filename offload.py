@@ -0,0 +1,56 @@
+# offload.py
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+class PoolSaturated(Exception):
+    """Raised when a BoundedProcessPool already has queue_limit jobs waiting"""
+
+class BoundedProcessPool:
+    """
+    Process pool for CPU-bound work that must not run on the event loop.
+
+    At most `workers` jobs run at once and at most `queue_limit` more may
+    wait; further calls fail fast with PoolSaturated instead of piling up.
+    Workers come from a forkserver that only preloads `preload`, so they do
+    not inherit the API process's model or threads. Where there is no
+    forkserver (Windows) they are spawned, which also starts them clean.
+    """
+
+    def __init__(self, workers: int = 2, queue_limit: int = 16, preload=()):
+        self.workers = max(workers, 1)
+        self.queue_limit = max(queue_limit, 0)
+        self.preload = list(preload)
+        self._executor = None
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                if "forkserver" in multiprocessing.get_all_start_methods():
+                    context = multiprocessing.get_context("forkserver")
+                    context.set_forkserver_preload(self.preload)
+                else:
+                    context = multiprocessing.get_context("spawn")
+                self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+            return self._executor
+
+    async def run(self, fn, *args):
+        with self._lock:
+            if self._in_flight >= self.workers + self.queue_limit:
+                raise PoolSaturated()
+            self._in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+def iter_byte_chunks(data: bytes, chunk_size: int = 64 * 1024):
+    """Yield zero-copy slices of data for a StreamingResponse"""
+    view = memoryview(data)
+    for start in range(0, len(view), chunk_size):
+        yield view[start:start + chunk_size]
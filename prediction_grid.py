@@ -0,0 +1,115 @@
+# prediction_grid.py
+import json
+import os
+import numpy as np
+import pandas as pd
+from cache import artifact_signature, matches_signature
+
+# The model only sees (district, crop, season, sowing_doy), so every possible
+# prediction can be computed ahead of time and served by direct indexing.
+GRID_DAYS = 366
+GRID_ROWS_PER_PREDICT = 50000
+
+def grid_paths(pipe_path: str):
+    base, _ = os.path.splitext(pipe_path)
+    return base + ".grid.npy", base + ".grid.json"
+
+def build_prediction_grid(pipeline, districts, crops, seasons) -> np.ndarray:
+    """
+    Evaluates the pipeline on every (district, crop, season, sowing_doy)
+    combination and returns a float32 array of shape
+    (n_districts, n_crops, n_seasons, 366, n_outputs).
+    """
+    doys = np.arange(1, GRID_DAYS + 1)
+    d_idx, c_idx, s_idx, doy_idx = np.meshgrid(
+        np.arange(len(districts)), np.arange(len(crops)), np.arange(len(seasons)), np.arange(GRID_DAYS),
+        indexing="ij"
+    )
+    X = pd.DataFrame({
+        "district": np.asarray(districts, dtype=object)[d_idx.ravel()],
+        "crop": np.asarray(crops, dtype=object)[c_idx.ravel()],
+        "season": np.asarray(seasons, dtype=object)[s_idx.ravel()],
+        "sowing_doy": doys[doy_idx.ravel()],
+    })
+
+    chunks = []
+    for start in range(0, len(X), GRID_ROWS_PER_PREDICT):
+        chunks.append(pipeline.predict(X.iloc[start:start + GRID_ROWS_PER_PREDICT]).astype(np.float32))
+    preds = np.concatenate(chunks)
+    return preds.reshape(len(districts), len(crops), len(seasons), GRID_DAYS, -1)
+
+def save_prediction_grid(grid: np.ndarray, districts, crops, seasons, pipe_path: str):
+    grid_path, vocab_path = grid_paths(pipe_path)
+    np.save(grid_path, grid)
+    with open(vocab_path, "w") as f:
+        json.dump({
+            "districts": list(districts),
+            "crops": list(crops),
+            "seasons": list(seasons),
+            "model": artifact_signature(pipe_path),
+        }, f, indent=2)
+
+def model_categories(pipeline):
+    """Category vocabularies the fitted one-hot encoder knows about"""
+    ohe = pipeline.named_steps["preproc"].named_transformers_["cat"].named_steps["ohe"]
+    return [list(categories) for categories in ohe.categories_]
+
+class PredictionGrid:
+    def __init__(self, grid: np.ndarray, districts, crops, seasons):
+        self.grid = grid
+        self.n_outputs = grid.shape[-1]
+        self.district_codes = {name: i for i, name in enumerate(districts)}
+        self.crop_codes = {name: i for i, name in enumerate(crops)}
+        self.season_codes = {name: i for i, name in enumerate(seasons)}
+
+    @classmethod
+    def load(cls, pipe_path: str):
+        """Memory-maps the grid next to the pipeline, or returns None if missing or stale"""
+        grid_path, vocab_path = grid_paths(pipe_path)
+        if not (os.path.exists(grid_path) and os.path.exists(vocab_path)):
+            return None
+        with open(vocab_path) as f:
+            vocab = json.load(f)
+        if os.path.exists(pipe_path) and not matches_signature(pipe_path, vocab.get("model")):
+            print(f"Warning: {grid_path} was built from a different {pipe_path}, ignoring it. "
+                  f"Predictions fall back to the model until train_model.py rebuilds it.")
+            return None
+        grid = np.load(grid_path, mmap_mode="r")
+        return cls(grid, vocab["districts"], vocab["crops"], vocab["seasons"])
+
+    def lookup(self, district: str, crop: str, season: str, sowing_doy: int):
+        """The 12 model outputs for one combination, or None if it is not in the grid"""
+        d = self.district_codes.get(district)
+        c = self.crop_codes.get(crop)
+        s = self.season_codes.get(season)
+        if d is None or c is None or s is None or not 1 <= sowing_doy <= GRID_DAYS:
+            return None
+        return self.grid[d, c, s, sowing_doy - 1]
+
+    def lookup_days(self, district: str, crop: str, season: str, sowing_doys):
+        """Rows for many sowing days of one combination, or None if it is not in the grid"""
+        d = self.district_codes.get(district)
+        c = self.crop_codes.get(crop)
+        s = self.season_codes.get(season)
+        doys = np.asarray(sowing_doys, dtype=np.int64)
+        if d is None or c is None or s is None or not ((doys >= 1) & (doys <= GRID_DAYS)).all():
+            return None
+        return self.grid[d, c, s, doys - 1]
+
+    def lookup_batch(self, districts, crops, seasons, sowing_doys):
+        """Returns (rows, found) where rows is only meaningful where found is True"""
+        d = pd.Series(districts, dtype=object).map(self.district_codes)
+        c = pd.Series(crops, dtype=object).map(self.crop_codes)
+        s = pd.Series(seasons, dtype=object).map(self.season_codes)
+        doys = np.asarray(sowing_doys, dtype=np.int64)
+        found = (d.notna() & c.notna() & s.notna()).to_numpy() & (doys >= 1) & (doys <= GRID_DAYS)
+
+        rows = np.zeros((len(doys), self.n_outputs), dtype=np.float32)
+        if found.any():
+            rows[found] = self.grid[
+                d[found].to_numpy(dtype=np.int64),
+                c[found].to_numpy(dtype=np.int64),
+                s[found].to_numpy(dtype=np.int64),
+                doys[found] - 1,
+            ]
+        return rows, found
@@ -1,69 +1,278 @@
 from fpdf import FPDF
 from datetime import datetime
+from types import SimpleNamespace
+import re
+import zlib
 
-def generate_pdf_report(prediction_response, prediction_request):
-    pdf = FPDF()
-    pdf.add_page()
-    
+def report_fields(prediction_response, prediction_request, generated_at: str) -> dict:
+    """Every value printed on a report page, as the text that is printed"""
+    env = prediction_response.predicted_environmental_conditions
+    soil = prediction_response.predicted_soil_conditions
+    fert = prediction_response.predicted_fertilizer_recommendation
+    return {
+        "district": prediction_request.district,
+        "crop": prediction_request.crop,
+        "season": prediction_request.season,
+        "sowing_date": prediction_request.sowing_date,
+        "rainfall": env['season_total_rainfall_mm'],
+        "temp": env['season_avg_temp_c'],
+        "humidity": env['season_avg_humidity'],
+        "pH": soil['soil_pH'],
+        "soil_N": soil['soil_N_kg_ha'],
+        "soil_P": soil['soil_P_kg_ha'],
+        "soil_K": soil['soil_K_kg_ha'],
+        "organic_carbon": soil['organic_carbon_pct'],
+        "moisture": soil['soil_moisture_pct'],
+        # No rule and no model output for this crop
+        "fert_N": fert['N'] if fert['N'] is not None else "n/a",
+        "fert_P": fert['P'] if fert['P'] is not None else "n/a",
+        "fert_K": fert['K'] if fert['K'] is not None else "n/a",
+        "yield": prediction_response.predicted_yield_kg_per_ha,
+        "harvest_days": prediction_response.predicted_harvest_days,
+        "generated_at": generated_at,
+    }
+
+def draw_report(pdf: FPDF, f: dict):
+    """Lays out one report from the current page of pdf on; it runs over several pages"""
     # Set title
     pdf.set_font("Arial", "B", 16)
     pdf.cell(0, 10, "Crop Yield Prediction Report", 0, 1, "C")
     pdf.ln(10)
-    
+
     # Add request details
     pdf.set_font("Arial", "B", 12)
     pdf.cell(0, 10, "Input Parameters:", 0, 1)
     pdf.set_font("Arial", "", 12)
-    pdf.cell(0, 10, f"District: {prediction_request.district}", 0, 1)
-    pdf.cell(0, 10, f"Crop: {prediction_request.crop}", 0, 1)
-    pdf.cell(0, 10, f"Season: {prediction_request.season}", 0, 1)
-    pdf.cell(0, 10, f"Sowing Date: {prediction_request.sowing_date}", 0, 1)
+    pdf.cell(0, 10, f"District: {f['district']}", 0, 1)
+    pdf.cell(0, 10, f"Crop: {f['crop']}", 0, 1)
+    pdf.cell(0, 10, f"Season: {f['season']}", 0, 1)
+    pdf.cell(0, 10, f"Sowing Date: {f['sowing_date']}", 0, 1)
     pdf.ln(10)
-    
+
     # Add environmental conditions
     pdf.set_font("Arial", "B", 12)
     pdf.cell(0, 10, "Environmental Conditions:", 0, 1)
     pdf.set_font("Arial", "", 12)
-    env = prediction_response.predicted_environmental_conditions
-    pdf.cell(0, 10, f"Total Rainfall: {env['season_total_rainfall_mm']} mm", 0, 1)
-    pdf.cell(0, 10, f"Average Temperature: {env['season_avg_temp_c']} °C", 0, 1)
-    pdf.cell(0, 10, f"Average Humidity: {env['season_avg_humidity']}%", 0, 1)
+    pdf.cell(0, 10, f"Total Rainfall: {f['rainfall']} mm", 0, 1)
+    pdf.cell(0, 10, f"Average Temperature: {f['temp']} °C", 0, 1)
+    pdf.cell(0, 10, f"Average Humidity: {f['humidity']}%", 0, 1)
     pdf.ln(10)
-    
+
     # Add soil conditions
     pdf.set_font("Arial", "B", 12)
     pdf.cell(0, 10, "Soil Conditions:", 0, 1)
     pdf.set_font("Arial", "", 12)
-    soil = prediction_response.predicted_soil_conditions
-    pdf.cell(0, 10, f"pH: {soil['soil_pH']}", 0, 1)
-    pdf.cell(0, 10, f"Nitrogen: {soil['soil_N_kg_ha']} kg/ha", 0, 1)
-    pdf.cell(0, 10, f"Phosphorus: {soil['soil_P_kg_ha']} kg/ha", 0, 1)
-    pdf.cell(0, 10, f"Potassium: {soil['soil_K_kg_ha']} kg/ha", 0, 1)
-    pdf.cell(0, 10, f"Organic Carbon: {soil['organic_carbon_pct']}%", 0, 1)
-    pdf.cell(0, 10, f"Moisture: {soil['soil_moisture_pct']}%", 0, 1)
+    pdf.cell(0, 10, f"pH: {f['pH']}", 0, 1)
+    pdf.cell(0, 10, f"Nitrogen: {f['soil_N']} kg/ha", 0, 1)
+    pdf.cell(0, 10, f"Phosphorus: {f['soil_P']} kg/ha", 0, 1)
+    pdf.cell(0, 10, f"Potassium: {f['soil_K']} kg/ha", 0, 1)
+    pdf.cell(0, 10, f"Organic Carbon: {f['organic_carbon']}%", 0, 1)
+    pdf.cell(0, 10, f"Moisture: {f['moisture']}%", 0, 1)
     pdf.ln(10)
-    
+
     # Add fertilizer recommendation
     pdf.set_font("Arial", "B", 12)
     pdf.cell(0, 10, "Fertilizer Recommendation:", 0, 1)
     pdf.set_font("Arial", "", 12)
-    fert = prediction_response.predicted_fertilizer_recommendation
-    pdf.cell(0, 10, f"Nitrogen (N): {fert['N']} kg/ha", 0, 1)
-    pdf.cell(0, 10, f"Phosphorus (P): {fert['P']} kg/ha", 0, 1)
-    pdf.cell(0, 10, f"Potassium (K): {fert['K']} kg/ha", 0, 1)
+    pdf.cell(0, 10, f"Nitrogen (N): {f['fert_N']} kg/ha", 0, 1)
+    pdf.cell(0, 10, f"Phosphorus (P): {f['fert_P']} kg/ha", 0, 1)
+    pdf.cell(0, 10, f"Potassium (K): {f['fert_K']} kg/ha", 0, 1)
     pdf.ln(10)
-    
+
     # Add yield prediction
     pdf.set_font("Arial", "B", 12)
     pdf.cell(0, 10, "Yield Prediction:", 0, 1)
     pdf.set_font("Arial", "", 12)
-    pdf.cell(0, 10, f"Expected Yield: {prediction_response.predicted_yield_kg_per_ha} kg/ha", 0, 1)
-    pdf.cell(0, 10, f"Harvest Days: {prediction_response.predicted_harvest_days} days", 0, 1)
+    pdf.cell(0, 10, f"Expected Yield: {f['yield']} kg/ha", 0, 1)
+    pdf.cell(0, 10, f"Harvest Days: {f['harvest_days']} days", 0, 1)
     pdf.ln(10)
-    
+
     # Add footer with date
     pdf.set_y(-30)
     pdf.set_font("Arial", "I", 10)
-    pdf.cell(0, 10, f"Report generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", 0, 0, "C")
-    
-    return pdf.output(dest="S").encode("latin1")
\ No newline at end of file
+    pdf.cell(0, 10, f"Report generated on: {f['generated_at']}", 0, 0, "C")
+
+# Longer error details are cut so they fit on one line of the error page
+MAX_ERROR_CHARS = 70
+
+def draw_error(pdf: FPDF, f: dict):
+    """Page standing in for a request that could not be scored"""
+    pdf.set_font("Arial", "B", 16)
+    pdf.cell(0, 10, "Crop Yield Prediction Report", 0, 1, "C")
+    pdf.ln(10)
+    pdf.set_font("Arial", "B", 12)
+    pdf.cell(0, 10, "No prediction for:", 0, 1)
+    pdf.set_font("Arial", "", 12)
+    pdf.cell(0, 10, f"District: {f['district']}", 0, 1)
+    pdf.cell(0, 10, f"Crop: {f['crop']}", 0, 1)
+    pdf.cell(0, 10, f"Season: {f['season']}", 0, 1)
+    pdf.cell(0, 10, f"Sowing Date: {f['sowing_date']}", 0, 1)
+    pdf.ln(10)
+    pdf.cell(0, 10, f"Reason: {f['error']}", 0, 1)
+
+    # Same footer, so the page uses the same fonts as a report, kept on this page
+    pdf.set_auto_page_break(False)
+    pdf.set_y(-30)
+    pdf.set_font("Arial", "I", 10)
+    pdf.cell(0, 10, f"Report generated on: {f['generated_at']}", 0, 0, "C")
+
+def error_fields(error: str, prediction_request) -> dict:
+    if len(error) > MAX_ERROR_CHARS:
+        error = error[:MAX_ERROR_CHARS - 3] + "..."
+    return {
+        "district": prediction_request.district,
+        "crop": prediction_request.crop,
+        "season": prediction_request.season,
+        "sowing_date": prediction_request.sowing_date,
+        "error": error,
+    }
+
+def generate_pdf_report(prediction_response, prediction_request):
+    pdf = FPDF()
+    pdf.add_page()
+    draw_report(pdf, report_fields(prediction_response, prediction_request,
+                                   datetime.now().strftime('%Y-%m-%d %H:%M:%S')))
+    return pdf.output(dest="S").encode("latin1")
+
+# --- Pre-laid-out template ---
+# FPDF lays out one report with a placeholder in every field once per process;
+# its page content streams are then filled by string joins and wrapped in a minimal
+# PDF by PdfStreamWriter, so many reports skip FPDF entirely and can be
+# written out page by page.
+
+# Same width as any real timestamp, so the centered footer stays centered
+TIMESTAMP_PLACEHOLDER = "0000-00-00 00:00:00"
+_PLACEHOLDER = re.compile(r"@@(\w+)@@")
+
+class ReportTemplate:
+    def __init__(self, draw, field_names):
+        pdf = FPDF()
+        pdf.add_page()
+        fields = {name: f"@@{name}@@" for name in field_names}
+        fields["generated_at"] = TIMESTAMP_PLACEHOLDER
+        draw(pdf, fields)
+        # A report runs over several pages; each is alternating literal text and field names
+        self.pages = [
+            _PLACEHOLDER.split(pdf.pages[n].replace(TIMESTAMP_PLACEHOLDER, "@@generated_at@@"))
+            for n in sorted(pdf.pages)
+        ]
+        self.fonts = sorted((font["i"], font["name"]) for font in pdf.fonts.values())
+        self.media_box = f"[0 0 {pdf.w_pt:.2f} {pdf.h_pt:.2f}]"
+
+    def render(self, fields: dict) -> list:
+        """Deflated content stream of every page of one report"""
+        values = {name: _escape(str(value)) for name, value in fields.items()}
+        return [
+            zlib.compress("".join(part if i % 2 == 0 else values[part] for i, part in enumerate(parts))
+                          .encode("latin1", "replace"))
+            for parts in self.pages
+        ]
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace(")", "\\)").replace("(", "\\(").replace("\r", "\\r")
+
+_SAMPLE = SimpleNamespace(
+    district="", crop="", season="", sowing_date="",
+    predicted_environmental_conditions={"season_total_rainfall_mm": "", "season_avg_temp_c": "", "season_avg_humidity": ""},
+    predicted_soil_conditions={"soil_pH": "", "soil_N_kg_ha": "", "soil_P_kg_ha": "", "soil_K_kg_ha": "",
+                               "organic_carbon_pct": "", "soil_moisture_pct": ""},
+    predicted_fertilizer_recommendation={"N": "", "P": "", "K": ""},
+    predicted_yield_kg_per_ha="", predicted_harvest_days="",
+)
+_templates = {}
+
+def report_template(kind: str = "report") -> ReportTemplate:
+    """The template of report or error pages, laid out on first use in each process"""
+    if kind not in _templates:
+        if kind == "report":
+            _templates[kind] = ReportTemplate(draw_report, report_fields(_SAMPLE, _SAMPLE, ""))
+        else:
+            _templates[kind] = ReportTemplate(draw_error, error_fields("", _SAMPLE))
+    return _templates[kind]
+
+class PdfStreamWriter:
+    """
+    Writes a multi-page PDF incrementally: header() first, then pages() for
+    every report, then trailer(). Only the byte offsets of the
+    objects are kept, so memory does not grow with the page contents.
+    Objects 1-2 are the catalog and page tree, then the fonts, then one
+    page object and one content object per page.
+    """
+
+    def __init__(self, template: ReportTemplate):
+        self.template = template
+        self.offsets = {}
+        self.position = 0
+        self.page_ids = []
+        self.next_id = 3 + len(template.fonts)
+
+    def _object(self, obj_id: int, body: bytes) -> bytes:
+        self.offsets[obj_id] = self.position
+        data = b"%d 0 obj\n" % obj_id + body + b"\nendobj\n"
+        self.position += len(data)
+        return data
+
+    def header(self) -> bytes:
+        data = b"%PDF-1.3\n"
+        self.position = len(data)
+        fonts = []
+        for i, name in self.template.fonts:
+            fonts.append(self._object(2 + i, (
+                f"<</Type /Font /BaseFont /{name} /Subtype /Type1 /Encoding /WinAnsiEncoding>>"
+            ).encode()))
+        return data + b"".join(fonts)
+
+    def pages(self, contents: list) -> bytes:
+        return b"".join(self.page(content) for content in contents)
+
+    def page(self, content: bytes) -> bytes:
+        page_id, content_id = self.next_id, self.next_id + 1
+        self.next_id += 2
+        self.page_ids.append(page_id)
+        font_refs = " ".join(f"/F{i} {2 + i} 0 R" for i, _ in self.template.fonts)
+        page = self._object(page_id, (
+            f"<</Type /Page /Parent 2 0 R /MediaBox {self.template.media_box} "
+            f"/Resources <</Font <<{font_refs}>>>> /Contents {content_id} 0 R>>"
+        ).encode())
+        stream = self._object(content_id, b"<</Filter /FlateDecode /Length %d>>\nstream\n" % len(content)
+                              + content + b"\nendstream")
+        return page + stream
+
+    def trailer(self) -> bytes:
+        kids = " ".join(f"{page_id} 0 R" for page_id in self.page_ids)
+        data = self._object(2, f"<</Type /Pages /Kids [{kids}] /Count {len(self.page_ids)}>>".encode())
+        data += self._object(1, b"<</Type /Catalog /Pages 2 0 R>>")
+        xref_at = self.position
+        n_objects = self.next_id
+        lines = [b"xref\n0 %d\n" % n_objects, b"0000000000 65535 f \n"]
+        lines += [b"%010d 00000 n \n" % self.offsets[obj_id] for obj_id in range(1, n_objects)]
+        lines.append(b"trailer\n<</Size %d /Root 1 0 R>>\nstartxref\n%d\n%%%%EOF\n" % (n_objects, xref_at))
+        return data + b"".join(lines)
+
+def render_report_pages(items: list, generated_at: str) -> list:
+    """
+    Worker entry point: the deflated page contents of each (response dict,
+    request dict) pair. A response of {"error": detail} gets an error page.
+    """
+    pages = []
+    for response, request in items:
+        request = SimpleNamespace(**request)
+        if "error" in response:
+            fields = error_fields(response["error"], request)
+            fields["generated_at"] = generated_at
+            pages.append(report_template("error").render(fields))
+        else:
+            pages.append(report_template().render(report_fields(SimpleNamespace(**response), request, generated_at)))
+    return pages
+
+def report_pdf(contents: list) -> bytes:
+    writer = PdfStreamWriter(report_template())
+    return writer.header() + writer.pages(contents) + writer.trailer()
+
+def render_report_files(items: list, generated_at: str) -> list:
+    """Worker entry point: one complete PDF per (response dict, request dict) pair"""
+    return [report_pdf(contents) for contents in render_report_pages(items, generated_at)]
+
+def render_report_bytes(response_data: dict, request_data: dict) -> bytes:
+    """Entry point for worker processes: takes plain dicts so the API models need not be imported there"""
+    return generate_pdf_report(SimpleNamespace(**response_data), SimpleNamespace(**request_data))
@@ -1,25 +1,66 @@
 # simple_fertilizer_recommender.py
+import numpy as np
+import pandas as pd
+
+# Rule-based N/P/K recommendation: a per-crop baseline dose minus a share of
+# the nutrient already in the soil. The tables are built once at import and
+# indexed by crop code, so one call scores any number of plots. These are
+# example values - you should adjust based on agronomic knowledge. Crops
+# without a rule get no recommendation (None / NaN) rather than a guess.
+
+NUTRIENTS = ("N", "P", "K")
+
+# crop: (baseline N, P, K in kg/ha), (share of soil N, P, K subtracted)
+CROP_RULES = {
+    "rice": ((120, 60, 60), (0.3, 0.3, 0.3)),
+    "maize": ((100, 50, 50), (0.3, 0.3, 0.3)),
+    "groundnut": ((20, 40, 40), (0.3, 0.3, 0.3)),
+    "pulses": ((20, 40, 20), (0.3, 0.3, 0.3)),
+}
+
+CROPS = list(CROP_RULES)
+CROP_CODES = {crop: i for i, crop in enumerate(CROPS)}
+_crop_index = pd.Index(CROPS)
+# The last row stands for crops without a rule and yields NaN
+BASELINES = np.array([rule[0] for rule in CROP_RULES.values()] + [(np.nan, np.nan, np.nan)], dtype=np.float64)
+SOIL_COEFFICIENTS = np.array([rule[1] for rule in CROP_RULES.values()] + [(0, 0, 0)], dtype=np.float64)
+
+def crop_codes(crops) -> np.ndarray:
+    """Row indices into the tables for an array of crop names; unknown crops map to the last row"""
+    # Normalize each distinct name once, not every row
+    inverse, uniques = pd.factorize(np.asarray(crops, dtype=object), use_na_sentinel=False)
+    codes = _crop_index.get_indexer(pd.Index(uniques).astype(str).str.strip().str.lower())
+    codes[codes < 0] = len(CROPS)
+    return codes[inverse]
+
+def recommend_fertilizer_batch(crops, soil_N=None, soil_P=None, soil_K=None) -> np.ndarray:
+    """
+    (n, 3) N/P/K recommendations in kg/ha for arrays of crops and soil
+    readings. A missing array or NaN reading skips that adjustment; rows
+    of crops without a rule are NaN.
+    """
+    codes = crop_codes(crops)
+    doses = BASELINES[codes].copy()
+    for i, soil in enumerate((soil_N, soil_P, soil_K)):
+        if soil is None:
+            continue
+        soil = np.asarray(soil, dtype=np.float64)
+        doses[:, i] -= np.nan_to_num(soil * SOIL_COEFFICIENTS[codes, i])
+    np.maximum(doses, 0, out=doses)
+    return np.round(doses, 2)
+
 def recommend_fertilizer(crop, soil_N=None, soil_P=None, soil_K=None):
-    # Simple fertilizer recommendation based on crop type and soil nutrients
-    # These are example values - you should adjust based on agronomic knowledge
-    crop_recommendations = {
-        'rice': {'N': 120, 'P': 60, 'K': 60},
-        'maize': {'N': 100, 'P': 50, 'K': 50},
-        'groundnut': {'N': 20, 'P': 40, 'K': 40},
-        'pulses': {'N': 20, 'P': 40, 'K': 20}
-    }
-    
-    if crop not in crop_recommendations:
-        return {'N': 0, 'P': 0, 'K': 0}
-    
-    base_rec = crop_recommendations[crop].copy()
-    
-    # Adjust based on soil nutrients if available
-    if soil_N is not None:
-        base_rec['N'] = max(0, base_rec['N'] - soil_N * 0.3)
-    if soil_P is not None:
-        base_rec['P'] = max(0, base_rec['P'] - soil_P * 0.3)
-    if soil_K is not None:
-        base_rec['K'] = max(0, base_rec['K'] - soil_K * 0.3)
-    
-    return {k: round(v, 2) for k, v in base_rec.items()}
\ No newline at end of file
+    """Scalar form of recommend_fertilizer_batch, as a {'N', 'P', 'K'} dict; None for crops without a rule"""
+    code = CROP_CODES.get(str(crop).strip().lower())
+    if code is None:
+        return None
+
+    base, coefficients = BASELINES[code], SOIL_COEFFICIENTS[code]
+    rec = {}
+    # Adjust based on soil nutrients if available; NaN skips it, as in the batch form
+    for i, (name, soil) in enumerate(zip(NUTRIENTS, (soil_N, soil_P, soil_K))):
+        dose = float(base[i])
+        if soil is not None and not np.isnan(soil):
+            dose = max(0.0, dose - soil * float(coefficients[i]))
+        rec[name] = round(dose, 2)
+    return rec
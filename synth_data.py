@@ -0,0 +1,195 @@
+# synth_data.py
+import argparse
+import os
+import time
+import numpy as np
+import pandas as pd
+from data_store import CROP_DATA_PATH, RAINFALL_PATH, TEMPERATURE_PATH
+
+# Statistically similar datasets of any size for scaling tests. Every
+# (district, crop, season) group of the crop CSV is modelled by its observed
+# sowing dates and a multivariate normal over the numeric columns, so the
+# per-group means and the correlations between columns (rainfall vs yield,
+# soil N vs fertilizer N, ...) carry over. Rows are drawn chunk by chunk and
+# appended to the output CSV, so memory does not grow with --rows.
+#
+# Synthetic districts copy the groups and climatology of a random real
+# district with their means shifted, and are written to the rainfall.csv
+# and temperature.csv copies as well. The output files keep the original
+# names so data_store, train_model.py --data and the loaders accept them:
+#
+#   python synth_data.py --rows 10000000 --extra-districts 100 --out synthetic
+
+SYNTHETIC_DISTRICT = "Synthetic {:04d}"
+# Group covariances are shrunk towards the pooled within-group covariance
+# with the weight of this many rows, since most groups have ~20 rows
+PRIOR_ROWS = 20
+# Shift of a synthetic district's group means, in pooled standard deviations
+DISTRICT_SHIFT_SD = 0.25
+RAINFALL_SCALE_SD = 0.1
+TEMPERATURE_SHIFT_C = 0.5
+
+GROUP_COLS = ["district", "crop", "season"]
+
+class CropProfile:
+    """
+    Per-(district, crop, season) distributions learned from the crop CSV:
+    row weights, observed sowing dates and a mean vector and Cholesky
+    factor over the numeric columns.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.numeric_cols = [
+            col for col in df.columns
+            if col not in GROUP_COLS and pd.api.types.is_numeric_dtype(df[col])
+        ]
+        values = df[self.numeric_cols].to_numpy(dtype=np.float64)
+        self.low, self.high = np.nanmin(values, axis=0), np.nanmax(values, axis=0)
+        # Whole-number columns are written back as integers, the rest with 2 decimals
+        self.decimals = [0 if np.all(np.nan_to_num(values[:, i]) % 1 == 0) else 2 for i in range(values.shape[1])]
+
+        groups = df.groupby(GROUP_COLS, sort=True, observed=True)
+        self.keys = list(groups.groups)
+        codes = groups.ngroup().to_numpy()
+        self.weights = np.bincount(codes, minlength=len(self.keys)).astype(np.float64)
+
+        # Pooled within-group covariance, the prior for small groups
+        means = np.stack([np.nanmean(values[codes == g], axis=0) for g in range(len(self.keys))])
+        residuals = np.nan_to_num(values - means[codes])
+        pooled = residuals.T @ residuals / max(len(values) - len(self.keys), 1)
+        self.pooled_sd = np.sqrt(np.diag(pooled))
+
+        k = len(self.numeric_cols)
+        self.means = means
+        self.chol = np.empty((len(self.keys), k, k))
+        for g in range(len(self.keys)):
+            r = residuals[codes == g]
+            n = len(r)
+            cov = (r.T @ r + PRIOR_ROWS * pooled) / (n + PRIOR_ROWS)
+            # Jitter keeps the factorization defined for constant columns
+            self.chol[g] = np.linalg.cholesky(cov + np.eye(k) * 1e-9 * (1 + np.trace(cov)))
+
+        # Observed sowing dates of every group, concatenated with offsets
+        sowing = df["sowing_date"].to_numpy(dtype="datetime64[D]")
+        order = np.argsort(codes, kind="stable")
+        self.sowing_dates = sowing[order]
+        self.sowing_start = np.concatenate([[0], np.cumsum(self.weights.astype(np.int64))[:-1]])
+
+    def add_district(self, name: str, source: str, rng: np.random.Generator):
+        """Copies the groups of district `source` under `name` with shifted means"""
+        rows = [g for g, key in enumerate(self.keys) if key[0] == source]
+        shift = rng.normal(0.0, DISTRICT_SHIFT_SD, size=len(self.numeric_cols)) * self.pooled_sd
+        self.keys += [(name,) + self.keys[g][1:] for g in rows]
+        self.weights = np.concatenate([self.weights, self.weights[rows]])
+        self.means = np.concatenate([self.means, self.means[rows] + shift])
+        self.chol = np.concatenate([self.chol, self.chol[rows]])
+        self.sowing_start = np.concatenate([self.sowing_start, self.sowing_start[rows]])
+
+    def districts(self) -> list:
+        return list(dict.fromkeys(key[0] for key in self.keys))
+
+    def sample(self, n: int, rng: np.random.Generator) -> pd.DataFrame:
+        """n rows in the crop CSV layout, groups drawn in proportion to their size"""
+        groups = rng.choice(len(self.keys), size=n, p=self.weights / self.weights.sum())
+        z = rng.standard_normal((n, len(self.numeric_cols)))
+        values = self.means[groups] + np.einsum("nij,nj->ni", self.chol[groups], z)
+        values = np.clip(values, self.low, self.high)
+
+        counts = self.weights[groups].astype(np.int64)
+        picks = self.sowing_start[groups] + (rng.random(n) * counts).astype(np.int64)
+        sowing = self.sowing_dates[picks]
+
+        keys = np.array(self.keys, dtype=object)[groups]
+        frame = pd.DataFrame({col: keys[:, i] for i, col in enumerate(GROUP_COLS)})
+        frame["sowing_date"] = sowing
+        for i, col in enumerate(self.numeric_cols):
+            decimals = self.decimals[i]
+            frame[col] = np.round(values[:, i], decimals).astype(np.int64) if decimals == 0 else np.round(values[:, i], decimals)
+        if "harvest_days" in frame:
+            # Keep harvest_date consistent with the sampled growing period
+            frame["harvest_date"] = sowing + frame["harvest_days"].to_numpy().astype("timedelta64[D]")
+        return frame
+
+def synthetic_climatology(rainfall: pd.DataFrame, temperature: pd.DataFrame, new_districts: dict,
+                          rng: np.random.Generator):
+    """
+    rainfall.csv and temperature.csv copies with rows for every new district
+    (name -> source district) added; a source without climate rows borrows
+    a random district's climate.
+    """
+    rain_names = {name.title(): name for name in rainfall["District"].unique()}
+    temp_names = {name.strip().lower(): i for i, name in enumerate(temperature["District"])}
+    month_cols = [col for col in temperature.columns if col != "District"]
+
+    rain_rows, temp_rows = [], []
+    for name, source in new_districts.items():
+        rain_source = rain_names.get(source.title()) or rng.choice(list(rain_names.values()))
+        rows = rainfall[rainfall["District"] == rain_source].copy()
+        rows["District"] = name.upper()
+        rows["Rainfall_mm"] = (rows["Rainfall_mm"] * rng.lognormal(0.0, RAINFALL_SCALE_SD)).round(1)
+        rain_rows.append(rows)
+
+        temp_source = temp_names.get(source.strip().lower())
+        if temp_source is None:
+            temp_source = rng.integers(len(temperature))
+        row = temperature.iloc[[temp_source]].copy()
+        row["District"] = name
+        row[month_cols] = (row[month_cols] + rng.normal(0.0, TEMPERATURE_SHIFT_C)).round(1)
+        temp_rows.append(row)
+
+    return (
+        pd.concat([rainfall] + rain_rows, ignore_index=True),
+        pd.concat([temperature] + temp_rows, ignore_index=True),
+    )
+
+def generate(args):
+    rng = np.random.default_rng(args.seed)
+    os.makedirs(args.out, exist_ok=True)
+
+    df = pd.read_csv(args.data, parse_dates=["sowing_date", "harvest_date"])
+    columns = list(df.columns)
+    profile = CropProfile(df.dropna(subset=GROUP_COLS + ["sowing_date"]))
+    real_districts = profile.districts()
+    print(f"Profiled {len(profile.keys)} (district, crop, season) groups over {len(profile.numeric_cols)} numeric columns")
+
+    new_districts = {}
+    for i in range(args.extra_districts):
+        name = SYNTHETIC_DISTRICT.format(i + 1)
+        new_districts[name] = real_districts[rng.integers(len(real_districts))]
+        profile.add_district(name, new_districts[name], rng)
+
+    rainfall, temperature = synthetic_climatology(
+        pd.read_csv(args.rainfall), pd.read_csv(args.temperature), new_districts, rng
+    )
+    rainfall.to_csv(os.path.join(args.out, RAINFALL_PATH), index=False)
+    temperature.to_csv(os.path.join(args.out, TEMPERATURE_PATH), index=False)
+    print(f"✅ Climatology for {len(real_districts) + len(new_districts)} districts saved in {args.out}")
+
+    out_path = os.path.join(args.out, CROP_DATA_PATH)
+    start = time.perf_counter()
+    written = 0
+    with open(out_path, "w", newline="") as f:
+        while written < args.rows:
+            n = min(args.chunk_size, args.rows - written)
+            chunk = profile.sample(n, rng)[columns]
+            chunk.to_csv(f, header=written == 0, index=False, date_format="%Y-%m-%d")
+            written += n
+            elapsed = time.perf_counter() - start
+            print(f"{written}/{args.rows} rows ({written / elapsed:,.0f} rows/s)", end="\r", flush=True)
+    print(f"\n✅ {written} rows saved as {out_path} ({os.path.getsize(out_path) / 1e6:.0f} MB)")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate a synthetic Odisha crop dataset of any size")
+    parser.add_argument("--rows", type=int, default=100_000, help="crop rows to generate")
+    parser.add_argument("--extra-districts", type=int, default=0,
+                        help="synthetic districts to add on top of the real ones")
+    parser.add_argument("--out", default="synthetic", help="output directory")
+    parser.add_argument("--chunk-size", type=int, default=500_000, help="rows generated and written per chunk")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--data", default=CROP_DATA_PATH, help="crop CSV to learn the distributions from")
+    parser.add_argument("--rainfall", default=RAINFALL_PATH)
+    parser.add_argument("--temperature", default=TEMPERATURE_PATH)
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    generate(parse_args())
@@ -0,0 +1,35 @@
+# tests/conftest.py
+import os
+import sys
+
+# The modules live at the repository root, not in a package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import joblib
+import pytest
+
+@pytest.fixture(scope="session")
+def api(tmp_path_factory):
+    """
+    The app serving a small model trained on a sample of the crop data, so
+    the API tests do not need the production model
+    """
+    from train_model import build_pipeline, feature_cols, load_dataset, target_cols
+    df = load_dataset().sample(3000, random_state=0)
+    pipeline = build_pipeline("multioutput", n_estimators=5)
+    pipeline.fit(df[feature_cols], df[target_cols])
+    path = tmp_path_factory.mktemp("model") / "test_pipeline.joblib"
+    joblib.dump(pipeline, path)
+
+    os.environ.update({
+        "MODEL_PATH": str(path),
+        "MODEL_LOAD_MODE": "pickle",
+        "MODEL_BACKGROUND_LOAD": "0",
+        "MODEL_WATCH_INTERVAL_S": "0",
+        "CLIMATE_WATCH_INTERVAL_S": "0",
+        "STATS_WATCH_INTERVAL_S": "0",
+    })
+    import main
+    from fastapi.testclient import TestClient
+    with TestClient(main.app) as client:
+        yield client
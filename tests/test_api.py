@@ -0,0 +1,213 @@
+# tests/test_api.py
+import time
+
+ITEMS = [
+    {"district": "Cuttack", "crop": "Rice", "season": "Kharif", "sowing_date": "2024-06-15"},
+    {"district": "puri", "crop": "Rice", "season": "Rabi", "sowing_date": "2024-11-30"},
+    {"district": "Khurda", "crop": "Maize", "season": "Kharif", "sowing_date": "2024-02-29"},
+    {"district": "Angul", "crop": "Groundnut", "season": "Rabi", "sowing_date": "2023-12-31"},
+    {"district": "Ganjam", "crop": "Pulses", "season": "Kharif", "sowing_date": "2024-07-01", "include_intervals": True},
+    {"district": "Balasore", "crop": "Rice", "season": "Kharif", "sowing_date": "2024-01-01", "include_intervals": True},
+]
+
+def predict_one(api, item):
+    response = api.post("/predict", json=item)
+    return response.status_code, response.json()
+
+def without_nulls(result):
+    # /predict leaves prediction_intervals out unless it was asked for
+    return {key: value for key, value in result.items() if value is not None}
+
+def test_batch_matches_single_predictions(api):
+    response = api.post("/predict/batch", json={"items": ITEMS})
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [result["index"] for result in results] == list(range(len(ITEMS)))
+    for item, result in zip(ITEMS, results):
+        status, single = predict_one(api, item)
+        assert status == 200
+        assert result["error"] is None
+        assert without_nulls(result["result"]) == single
+
+def test_batch_errors_are_per_item(api):
+    items = [
+        ITEMS[0],
+        dict(ITEMS[0], sowing_date="15-06-2024"),
+        dict(ITEMS[0], district="Atlantis"),
+        dict(ITEMS[0], model="no-such-slot"),
+        ITEMS[1],
+    ]
+    results = api.post("/predict/batch", json={"items": items}).json()["results"]
+    assert results[1]["error"].startswith("Invalid sowing_date")
+    assert results[2]["error"].startswith("Weather data error")
+    assert results[3]["error"].startswith("Unknown model")
+    for i in (0, 4):
+        assert results[i]["error"] is None
+        assert without_nulls(results[i]["result"]) == predict_one(api, items[i])[1]
+    # The single endpoint reports the same errors
+    assert predict_one(api, items[1])[0] == 400
+    assert predict_one(api, items[2])[0] == 400
+
+def test_batch_size_limit(api):
+    import main
+    response = api.post("/predict/batch", json={"items": [ITEMS[0]] * (main.MAX_BATCH_ITEMS + 1)})
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("Batch too large")
+
+def test_failed_predict_only_fails_its_items(api, monkeypatch):
+    import main
+    real_live_model = main.live_model
+
+    class RejectsSugarcane:
+        def __init__(self, model):
+            self.model = model
+        def predict(self, X):
+            if (X["crop"] == "Sugarcane").any():
+                raise ValueError("cannot score Sugarcane")
+            return self.model.predict(X)
+
+    # Single items would otherwise take the fast path around the model
+    monkeypatch.setattr(main.registry.get(None), "fast_path", None)
+    monkeypatch.setattr(main, "live_model", lambda version: RejectsSugarcane(real_live_model(version)))
+    items = [ITEMS[0], dict(ITEMS[0], crop="Sugarcane"), ITEMS[1]]
+    results = main.score_requests([main.PredictionRequest(**item) for item in items])
+    assert isinstance(results[1], main.HTTPException)
+    assert results[1].detail.startswith("Prediction error")
+    for i in (0, 2):
+        assert not isinstance(results[i], main.HTTPException)
+
+def test_report_is_cached_only_when_keyed(api):
+    import main
+    main.report_cache.clear()
+    response = api.post("/download-report", json=ITEMS[0])
+    assert response.status_code == 200
+    assert response.content.startswith(b"%PDF")
+    assert api.post("/download-report", json=ITEMS[0], headers={"If-None-Match": response.headers["ETag"]}).status_code == 304
+    assert main.report_cache.stats()["entries"] == 1
+
+    # An unknown slot cannot be keyed: no ETag and nothing cached
+    response = api.post("/download-report", json=dict(ITEMS[0], model="no-such-slot"))
+    assert response.status_code == 400
+    assert "ETag" not in response.headers
+    assert main.report_cache.stats()["entries"] == 1
+
+def test_secondary_slot_loads_in_background(api, monkeypatch):
+    import main
+    monkeypatch.setitem(main.registry.sources, "variant", main.PIPE_PATH)
+    item = dict(ITEMS[0], model="variant")
+    try:
+        response = api.post("/predict", json=item)
+        assert response.status_code == 503
+        assert response.json()["detail"].startswith("Model is loading")
+        assert response.headers["Retry-After"] == str(main.MODEL_RETRY_AFTER_S)
+        for _ in range(600):
+            if main.registry.get("variant") is not None:
+                break
+            time.sleep(0.05)
+        response = api.post("/predict", json=item)
+        assert response.status_code == 200
+        assert response.json() == predict_one(api, ITEMS[0])[1]
+    finally:
+        main.registry.current.pop("variant", None)
+
+def test_admin_endpoints_need_a_configured_token(api, monkeypatch):
+    import main
+    for path in ("/admin/reload-model", "/admin/refresh-stats"):
+        response = api.post(path)
+        assert response.status_code == 403
+        assert response.json()["detail"].startswith("Admin endpoints are disabled")
+
+    monkeypatch.setattr(main, "ADMIN_TOKEN", "secret")
+    assert api.post("/admin/refresh-stats", headers={"X-Admin-Token": "wrong"}).status_code == 403
+    assert api.post("/admin/refresh-stats", headers={"X-Admin-Token": "secret"}).status_code == 200
+
+def test_sowing_window_matches_single_predictions(api):
+    window = {"district": "Cuttack", "crop": "Rice", "season": "Kharif",
+              "start_date": "2024-01-01", "end_date": "2024-12-31", "top_k": 5}
+    response = api.post("/optimize-sowing-date", json=window)
+    assert response.status_code == 200
+    body = response.json()
+    curve = {score["sowing_date"]: score for score in body["curve"]}
+    assert len(curve) == 366 and "2024-02-29" in curve
+
+    for date in ("2024-01-01", "2024-02-29", "2024-06-15", "2024-12-31"):
+        single = predict_one(api, {"district": "Cuttack", "crop": "Rice", "season": "Kharif", "sowing_date": date})[1]
+        assert curve[date] == {
+            "sowing_date": date,
+            "predicted_yield_kg_per_ha": single["predicted_yield_kg_per_ha"],
+            "predicted_harvest_days": single["predicted_harvest_days"],
+            "season_total_rainfall_mm": single["predicted_environmental_conditions"]["season_total_rainfall_mm"],
+            "season_avg_temp_c": single["predicted_environmental_conditions"]["season_avg_temp_c"],
+        }
+
+    best = [score["predicted_yield_kg_per_ha"] for score in body["best_dates"]]
+    assert len(best) == 5
+    assert best == sorted(best, reverse=True)
+    assert best[0] == max(score["predicted_yield_kg_per_ha"] for score in body["curve"])
+
+def test_sowing_window_across_year_end(api):
+    window = {"district": "Puri", "crop": "Rice", "season": "Rabi", "start_date": "2024-12-25", "end_date": "2025-01-05"}
+    dates = [score["sowing_date"] for score in api.post("/optimize-sowing-date", json=window).json()["curve"]]
+    assert dates == [f"2024-12-{day}" for day in range(25, 32)] + [f"2025-01-0{day}" for day in range(1, 6)]
+
+def test_sowing_window_errors(api):
+    base = {"district": "Cuttack", "crop": "Rice", "season": "Kharif"}
+    cases = [
+        (dict(base, start_date="01-01-2024"), "Invalid start_date"),
+        (dict(base, start_date="2024-03-01", end_date="2024-02-01"), "end_date must not be before"),
+        (dict(base, start_date="2024-01-01", end_date="2025-06-01"), "Date range too long"),
+        (dict(base, district="Atlantis"), "Weather data error"),
+        (dict(base, model="no-such-slot"), "Unknown model"),
+    ]
+    for window, detail in cases:
+        response = api.post("/optimize-sowing-date", json=window)
+        assert response.status_code == 400
+        assert response.json()["detail"].startswith(detail)
+
+def test_fertilizer_rules_only_cover_known_crops(api, monkeypatch):
+    import main
+    body = api.post("/recommend-fertilizer/batch", json={
+        "crops": ["Rice", "Cotton", "pulses"], "soil_N": [100, 100, None],
+    }).json()
+    assert body == {"N": [90.0, None, 20.0], "P": [60.0, None, 40.0], "K": [60.0, None, 20.0]}
+
+    # With the rules selected, crops they do not cover keep the model's outputs
+    model_outputs = [predict_one(api, dict(ITEMS[0], crop=crop))[1]["predicted_fertilizer_recommendation"]
+                     for crop in ("Rice", "Cotton")]
+    monkeypatch.setattr(main, "FERTILIZER_SOURCE", "rules")
+    main.prediction_cache.clear()
+    rules = [predict_one(api, dict(ITEMS[0], crop=crop))[1]["predicted_fertilizer_recommendation"]
+             for crop in ("Rice", "Cotton")]
+    batch = api.post("/predict/batch", json={"items": [dict(ITEMS[0], crop=crop) for crop in ("Rice", "Cotton")]}).json()
+    main.prediction_cache.clear()
+    assert rules[0] != model_outputs[0]
+    assert rules[1] == model_outputs[1]
+    assert [result["result"]["predicted_fertilizer_recommendation"] for result in batch["results"]] == rules
+
+def test_export_survives_failed_chunks(api, monkeypatch):
+    import io
+    import zipfile
+    import main
+    import report_utils
+
+    render_report_files = report_utils.render_report_files
+
+    async def broken_pool(fn, *args):
+        raise RuntimeError("worker died")
+
+    def render_files(items, generated_at):
+        # The Cotton report cannot be rendered; its error page can
+        if any(response.get("error") is None and request["crop"] == "Cotton" for response, request in items):
+            raise ValueError("bad page")
+        return render_report_files(items, generated_at)
+
+    monkeypatch.setattr(main.report_pool, "run", broken_pool)
+    monkeypatch.setattr(main, "EXPORT_CHUNK_SIZE", 2)
+    monkeypatch.setattr(report_utils, "render_report_files", render_files)
+    items = [ITEMS[0], dict(ITEMS[0], crop="Cotton"), dict(ITEMS[0], sowing_date="bad"), ITEMS[1], ITEMS[2]]
+    response = api.post("/download-report/bulk", json={"items": items, "format": "zip"})
+    assert response.status_code == 200
+    archive = zipfile.ZipFile(io.BytesIO(response.content))
+    names = archive.namelist()
+    assert len(names) == len(items)
+    assert all(archive.read(name).startswith(b"%PDF") for name in names)
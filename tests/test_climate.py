@@ -0,0 +1,188 @@
+# tests/test_climate.py
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+import pytest
+import os
+import shutil
+from climate import MAX_RESOLVED_NAMES, ClimateService, DistrictTable, climate
+from data_store import RAINFALL_PATH, TEMPERATURE_PATH
+
+# Start days covering every month, both ends of February and the year end
+START_DATES = [f"2024-{month:02d}-{day:02d}" for month in range(1, 13) for day in (1, 15, 28)] + [
+    "2024-02-29", "2024-03-01", "2024-09-22", "2024-09-23", "2024-11-21", "2024-11-22", "2024-12-31",
+]
+
+def baseline_rainfall(df: pd.DataFrame, district: str, start_date_str: str) -> float:
+    """The original rainfall.get_rainfall_forecast: monthly rows expanded to days and masked"""
+    district_data = df[df["District"] == district.strip().title()].copy()
+    ref_year = 2000
+    district_data["RefDate"] = pd.to_datetime(district_data["Date"].dt.strftime(f"{ref_year}-%m-%d"))
+    district_data["DaysInMonth"] = district_data["RefDate"].dt.days_in_month
+    daily_rows = []
+    for _, row in district_data.iterrows():
+        for d in range(1, row["DaysInMonth"] + 1):
+            daily_rows.append({"Date": datetime(ref_year, row["RefDate"].month, d),
+                               "Rainfall_mm": row["Rainfall_mm"] / row["DaysInMonth"]})
+    daily_data = pd.DataFrame(daily_rows)
+    start = datetime.strptime(start_date_str, "%Y-%m-%d")
+    ref_start = datetime(ref_year, start.month, start.day)
+    ref_end = ref_start + timedelta(days=100)
+    if ref_end.year > ref_year:
+        mask = (daily_data["Date"] >= ref_start) | (daily_data["Date"] < ref_end.replace(year=ref_year))
+    else:
+        mask = (daily_data["Date"] >= ref_start) & (daily_data["Date"] < ref_end)
+    return daily_data.loc[mask, "Rainfall_mm"].sum()
+
+@pytest.fixture(scope="module")
+def rainfall_df():
+    df = pd.read_csv(RAINFALL_PATH)
+    df["Date"] = pd.to_datetime(df["Year"].astype(str) + "-" + df["Month"], format="%Y-%B")
+    df["District"] = df["District"].str.title()
+    return df
+
+def plain_districts(df: pd.DataFrame) -> list:
+    """Districts with one row per month under a single spelling, where nothing is merged or averaged"""
+    counts = df.groupby("District")["Date"].agg(["size", "nunique"])
+    return sorted(counts.index[(counts["size"] == 12) & (counts["nunique"] == 12)])
+
+def crosses_leap_day_on_wrap(start_date_str: str) -> bool:
+    start = datetime.strptime(start_date_str, "%Y-%m-%d")
+    end = datetime(2000, start.month, start.day) + timedelta(days=100)
+    return end.year > 2000 and end.replace(year=2000) > datetime(2000, 2, 29)
+
+def test_rainfall_matches_baseline(rainfall_df):
+    districts = plain_districts(rainfall_df)
+    assert len(districts) > 20
+    for district in districts:
+        for start in START_DATES:
+            if crosses_leap_day_on_wrap(start):
+                continue
+            assert climate.rainfall_forecast(district, start) == pytest.approx(baseline_rainfall(rainfall_df, district, start))
+
+def test_rainfall_wrapping_windows_are_exactly_100_days(rainfall_df):
+    # The baseline re-projected the end of a year-end window onto the leap
+    # reference year and so summed 101 days; the window is now the 100
+    # consecutive days of the leap reference year, wrapping at December 31
+    district = "Cuttack"
+    rows = rainfall_df[rainfall_df["District"] == district]
+    monthly = dict(zip(rows["Date"].dt.month, rows["Rainfall_mm"]))
+    days = pd.date_range("2000-01-01", "2000-12-31")
+    daily = np.array([monthly[day.month] / day.days_in_month for day in days])
+    for start in ("2024-11-22", "2024-12-01", "2024-12-31"):
+        assert crosses_leap_day_on_wrap(start)
+        offset = days.get_loc(pd.Timestamp(start).replace(year=2000))
+        window = daily[(offset + np.arange(100)) % len(days)]
+        assert climate.rainfall_forecast(district, start) == pytest.approx(window.sum())
+        extra_day = daily[(offset + 100) % len(days)]
+        assert baseline_rainfall(rainfall_df, district, start) == pytest.approx(window.sum() + extra_day)
+
+def test_rainfall_leap_day_start(rainfall_df):
+    # February 29 is its own slot of the leap reference year
+    assert climate.rainfall_forecast("Puri", "2023-03-01") != climate.rainfall_forecast("Puri", "2024-02-29")
+    assert climate.rainfall_forecast("Puri", "2024-02-29") == pytest.approx(baseline_rainfall(rainfall_df, "Puri", "2024-02-29"))
+
+def test_rainfall_batch_matches_scalar():
+    dates = pd.to_datetime(START_DATES)
+    districts = ["Cuttack", "puri", "KHURDA", "Atlantis"] * len(START_DATES)
+    months = np.repeat(dates.month, 4)
+    days = np.repeat(dates.day, 4)
+    totals = climate.rainfall_forecast_batch(districts, months, days)
+    for district, date, total in zip(districts, np.repeat(START_DATES, 4), totals):
+        if district == "Atlantis":
+            assert np.isnan(total)
+        else:
+            assert total == pytest.approx(climate.rainfall_forecast(district, date))
+
+def test_rainfall_errors():
+    with pytest.raises(ValueError, match="not found"):
+        climate.rainfall_forecast("Atlantis", "2024-06-15")
+    with pytest.raises(ValueError, match="Invalid date format"):
+        climate.rainfall_forecast("Cuttack", "15/06/2024")
+
+@pytest.fixture(scope="module")
+def temperature_df():
+    return pd.read_csv(TEMPERATURE_PATH)
+
+def baseline_temperature(df: pd.DataFrame, district: str, month: int, day: int, days: int) -> float:
+    """The original TemperatureCalculator: unweighted mean of every month the window touches"""
+    row = df[df["District"].str.lower() == district.lower()].iloc[0]
+    start = datetime(2023, month, day)
+    touched = {(start + timedelta(days=i)).strftime("%b-%Y") for i in range(days)}
+    return float(np.mean([row[col] for col in df.columns[1:] if col in touched]))
+
+def day_weighted_temperature(df: pd.DataFrame, district: str, month: int, day: int, days: int) -> float:
+    """Mean over the window's days, each taking its month's temperature"""
+    row = df[df["District"].str.lower() == district.lower()].iloc[0]
+    start = datetime(2023, month, day)
+    return float(np.mean([row[(start + timedelta(days=i)).strftime("%b-%Y")] for i in range(days)]))
+
+@pytest.mark.parametrize("days", [75, 100])
+def test_temperature_is_day_weighted(temperature_df, days):
+    for district in temperature_df["District"]:
+        for start in START_DATES:
+            date = datetime.strptime(start, "%Y-%m-%d")
+            if (date.month, date.day) == (2, 29):
+                continue
+            assert climate.avg_temperature(district, date.month, date.day, days=days) == pytest.approx(
+                day_weighted_temperature(temperature_df, district, date.month, date.day, days))
+
+def test_temperature_matches_baseline_within_one_month(temperature_df):
+    # Weighting only changes windows that span several months
+    for district in temperature_df["District"]:
+        for month in range(1, 13):
+            assert climate.avg_temperature(district, month, 1, days=28) == pytest.approx(
+                baseline_temperature(temperature_df, district, month, 1, 28))
+
+def test_temperature_leap_day_start():
+    # The data starts in 2023, where February 29 falls on March 1; the
+    # original raised on datetime(2023, 2, 29)
+    assert climate.avg_temperature("Cuttack", 2, 29, days=100) == climate.avg_temperature("Cuttack", 3, 1, days=100)
+
+def test_temperature_batch_matches_scalar():
+    districts = ["Cuttack", "BARGARH", "Atlantis"] * 12
+    months = np.repeat(np.arange(1, 13), 3)
+    days = np.full(len(months), 20)
+    means = climate.avg_temperature_batch(districts, months, days, days=100)
+    for district, month, mean in zip(districts, months, means):
+        if district == "Atlantis":
+            assert np.isnan(mean)
+        else:
+            assert mean == pytest.approx(climate.avg_temperature(district, int(month), 20, days=100))
+
+def test_temperature_unknown_district():
+    with pytest.raises(ValueError, match="not found"):
+        climate.avg_temperature("Atlantis", 6, 15)
+
+def test_district_spellings_and_aliases():
+    assert climate.rainfall_forecast("khurda", "2024-06-15") == climate.rainfall_forecast("Khordha", "2024-06-15")
+    assert climate.rainfall_forecast(" CUT-TACK ", "2024-06-15") == climate.rainfall_forecast("Cuttack", "2024-06-15")
+    assert climate.avg_temperature("Khurda", 6, 15) == climate.avg_temperature("khordha", 6, 15)
+
+def test_split_district_rows_are_averaged():
+    # Khordha's months are spread over two spellings; every month is found
+    for month in range(1, 13):
+        assert climate.rainfall_forecast("Khordha", f"2024-{month:02d}-01", days=1) > 0
+
+def test_resolved_spellings_are_bounded():
+    table = DistrictTable()
+    table.intern("Cuttack")
+    for i in range(MAX_RESOLVED_NAMES + 100):
+        assert table.lookup("Cut" + "." * i + "tack") == 0
+    assert table.lookup("Atlantis") == -1
+    assert len(table._resolved) == MAX_RESOLVED_NAMES
+
+def test_changed_file_is_reloaded(tmp_path):
+    for path in (RAINFALL_PATH, TEMPERATURE_PATH):
+        shutil.copy(path, tmp_path / path)
+    service = ClimateService(str(tmp_path / RAINFALL_PATH), str(tmp_path / TEMPERATURE_PATH))
+    before, version = service.rainfall_forecast("Puri", "2024-06-15"), service.version
+    assert service.check() == []
+
+    df = pd.read_csv(tmp_path / RAINFALL_PATH)
+    df.loc[df["District"].str.title() == "Puri", "Rainfall_mm"] *= 2
+    df.to_csv(tmp_path / RAINFALL_PATH, index=False)
+    os.utime(tmp_path / RAINFALL_PATH, ns=(1, 1))
+    assert service.check() == ["rainfall"]
+    assert service.version != version
+    assert service.rainfall_forecast("Puri", "2024-06-15") == pytest.approx(2 * before)
@@ -0,0 +1,75 @@
+# tests/test_fast_path.py
+import numpy as np
+import pandas as pd
+import pytest
+from fast_path import FastFeaturizer, equivalence_samples
+from forest_store import FlatForest, FlatPipeline
+from train_model import build_pipeline, feature_cols, load_dataset, target_cols
+
+# First and last day of every month, in leap and non-leap years
+BOUNDARY_DOYS = sorted({
+    doy for year in (2023, 2024)
+    for start in pd.date_range(f"{year}-01-01", periods=12, freq="MS")
+    for doy in (start.dayofyear, (start + pd.offsets.MonthEnd(0)).dayofyear)
+})
+
+@pytest.fixture(scope="module")
+def training_data():
+    df = load_dataset().sample(3000, random_state=0)
+    return df[feature_cols], df[target_cols]
+
+@pytest.fixture(scope="module", params=["multioutput", "native", "flat"])
+def pipeline(request, training_data):
+    X, y = training_data
+    pipe = build_pipeline("native" if request.param == "native" else "multioutput", n_estimators=5)
+    pipe.fit(X, y)
+    if request.param == "flat":
+        return FlatPipeline(pipe.named_steps["preproc"], FlatForest.from_model(pipe.named_steps["model"]))
+    return pipe
+
+def edge_cases(fast: FastFeaturizer) -> pd.DataFrame:
+    districts, crops, seasons = ([*columns] for columns in fast.category_columns)
+    return pd.DataFrame([
+        {"district": "Atlantis", "crop": crops[0], "season": seasons[0], "sowing_doy": 100},
+        {"district": districts[0], "crop": "Quinoa", "season": "Monsoon", "sowing_doy": 100},
+        {"district": None, "crop": crops[-1], "season": None, "sowing_doy": 1},
+        {"district": districts[-1], "crop": crops[-1], "season": seasons[-1], "sowing_doy": None},
+    ])
+
+def samples(fast: FastFeaturizer) -> pd.DataFrame:
+    return pd.concat([equivalence_samples(fast, BOUNDARY_DOYS), edge_cases(fast)], ignore_index=True)
+
+def test_features_match_preprocessor(pipeline):
+    fast = FastFeaturizer(pipeline)
+    X = samples(fast)
+    expected = pipeline.named_steps["preproc"].transform(X)
+    actual = np.vstack([
+        fast.transform_one(row.district, row.crop, row.season, None if pd.isna(row.sowing_doy) else row.sowing_doy).copy()
+        for row in X.itertuples(index=False)
+    ])
+    np.testing.assert_allclose(actual, expected)
+
+def test_predictions_match_pipeline(pipeline):
+    fast = FastFeaturizer(pipeline)
+    X = samples(fast)
+    expected = pipeline.predict(X)
+    actual = np.array([
+        fast.predict_one(row.district, row.crop, row.season, None if pd.isna(row.sowing_doy) else row.sowing_doy)
+        for row in X.itertuples(index=False)
+    ])
+    np.testing.assert_allclose(actual, expected)
+
+def test_flat_forest_matches_sklearn_across_chunks(training_data):
+    import forest_store
+    X, y = training_data
+    pipe = build_pipeline("multioutput", n_estimators=5).fit(X, y)
+    model = pipe.named_steps["model"]
+    features = pipe.named_steps["preproc"].transform(X)
+    flat = FlatForest.from_model(model)
+    # More rows than one chunk, so the last chunk is a partial one
+    assert len(features) > forest_store.ROWS_PER_CHUNK
+    np.testing.assert_allclose(flat.predict(features), model.predict(features))
+    mean, quantiles = flat.predict_with_quantiles(features)
+    compiled_mean, compiled_quantiles = forest_store.CompiledForest(model).predict_with_quantiles(features)
+    np.testing.assert_allclose(mean, compiled_mean)
+    np.testing.assert_allclose(quantiles, compiled_quantiles)
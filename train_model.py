@@ -1,3 +1,8 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
 import pandas as pd
 import numpy as np
 from sklearn.model_selection import train_test_split
@@ -9,15 +14,18 @@ from sklearn.impute import SimpleImputer
 from sklearn.preprocessing import OneHotEncoder, StandardScaler
 from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
 import joblib
+from prediction_grid import build_prediction_grid, grid_paths, save_prediction_grid, model_categories
+from forest_store import export_forest
+from data_store import load_table, iter_chunks
 
-RANDOM_STATE = 42
-
-# 1) Load dataset
-df = pd.read_csv("odisha_all_districts_crop_data.csv", parse_dates=["sowing_date", "harvest_date"])
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
 
-# 2) Feature engineering
-df["harvest_days"] = (df["harvest_date"] - df["sowing_date"]).dt.days
-df["sowing_doy"] = df["sowing_date"].dt.dayofyear
+RANDOM_STATE = 42
+DATA_PATH = "odisha_all_districts_crop_data.csv"
+PIPE_PATH = "odisha_crop_pipeline.joblib"
 
 # Features - only the inputs we'll have at prediction time
 feature_cols = [
@@ -26,62 +34,62 @@ feature_cols = [
 
 # Targets (what we want to predict) - all the outputs
 target_cols = [
-    "season_avg_humidity", 
-    "soil_pH", "soil_N_kg_ha", "soil_P_kg_ha", "soil_K_kg_ha", 
+    "season_avg_humidity",
+    "soil_pH", "soil_N_kg_ha", "soil_P_kg_ha", "soil_K_kg_ha",
     "organic_carbon_pct", "soil_moisture_pct",
     "yield_kg_per_ha", "harvest_days",
     "fertilizer_N_kg_ha", "fertilizer_P_kg_ha", "fertilizer_K_kg_ha"
 ]
 
-# Filter only required cols
-df = df[feature_cols + target_cols].copy()
-
-# Drop rows with missing target values
-df = df.dropna(subset=target_cols)
-
-X = df[feature_cols]
-y = df[target_cols]
-
-# 3) Train/test split
-X_train, X_test, y_train, y_test = train_test_split(
-    X, y, test_size=0.2, random_state=RANDOM_STATE
-)
-
-# 4) Preprocessing
 numeric_features = ["sowing_doy"]
 categorical_features = ["district", "crop", "season"]
 
-numeric_transformer = Pipeline(steps=[
-    ("imputer", SimpleImputer(strategy="median")),
-    ("scaler", StandardScaler())
-])
+# "multioutput" trains one forest per target, "native" one forest for all 12
+MODEL_KINDS = ["multioutput", "native"]
+
+def load_dataset(path: str = DATA_PATH) -> pd.DataFrame:
+    # 1) Load dataset from its columnar store (CSV if the store is missing or stale)
+    # 2) Feature engineering: harvest_days and sowing_doy are precomputed by data_store
+    df = load_table(path)
+
+    # Filter only required cols
+    df = df[feature_cols + target_cols].copy()
 
-categorical_transformer = Pipeline(steps=[
-    ("imputer", SimpleImputer(strategy="constant", fill_value="missing")),
-    ("ohe", OneHotEncoder(handle_unknown="ignore", sparse_output=False))
-])
+    # Drop rows with missing target values
+    return df.dropna(subset=target_cols)
 
-preprocessor = ColumnTransformer(transformers=[
-    ("num", numeric_transformer, numeric_features),
-    ("cat", categorical_transformer, categorical_features)
-], remainder="drop")
+def build_preprocessor(categories="auto") -> ColumnTransformer:
+    numeric_transformer = Pipeline(steps=[
+        ("imputer", SimpleImputer(strategy="median")),
+        ("scaler", StandardScaler())
+    ])
 
-# 5) Model: Multi-output RandomForest
-base_reg = RandomForestRegressor(n_estimators=200, random_state=RANDOM_STATE, n_jobs=-1)
-multi_reg = MultiOutputRegressor(base_reg)
+    categorical_transformer = Pipeline(steps=[
+        ("imputer", SimpleImputer(strategy="constant", fill_value="missing")),
+        ("ohe", OneHotEncoder(categories=categories, handle_unknown="ignore", sparse_output=False))
+    ])
 
-pipeline = Pipeline(steps=[
-    ("preproc", preprocessor),
-    ("model", multi_reg)
-])
+    return ColumnTransformer(transformers=[
+        ("num", numeric_transformer, numeric_features),
+        ("cat", categorical_transformer, categorical_features)
+    ], remainder="drop")
 
-# 6) Train model
-print("Training model...")
-pipeline.fit(X_train, y_train)
-print("Model training completed!")
+def build_model(kind: str = "multioutput", n_estimators: int = 200, n_jobs: int = -1, **forest_params):
+    """The forest regressor; forest_params are extra RandomForestRegressor arguments such as max_depth"""
+    if kind == "native":
+        # RandomForestRegressor supports multiple targets directly: one set of
+        # trees whose leaves store all 12 outputs.
+        return RandomForestRegressor(n_estimators=n_estimators, random_state=RANDOM_STATE, n_jobs=n_jobs, **forest_params)
+    elif kind == "multioutput":
+        base_reg = RandomForestRegressor(n_estimators=n_estimators, random_state=RANDOM_STATE, n_jobs=n_jobs, **forest_params)
+        return MultiOutputRegressor(base_reg)
+    raise ValueError(f"Unknown model kind '{kind}'. Use one of {MODEL_KINDS}.")
 
-# 7) Evaluation
-y_pred = pipeline.predict(X_test)
+def build_pipeline(kind: str = "multioutput", n_estimators: int = 200, categories="auto") -> Pipeline:
+    return Pipeline(steps=[
+        ("preproc", build_preprocessor(categories)),
+        ("model", build_model(kind, n_estimators))
+    ])
 
 def print_metrics(y_true, y_pred, name):
     for i, col in enumerate(y_true.columns):
@@ -92,13 +100,292 @@ def print_metrics(y_true, y_pred, name):
         r2 = r2_score(y_true[col], y_pred[:, i])
         print(f"{name} - {col}: RMSE={rmse:.2f}, MAE={mae:.2f}, R2={r2:.3f}")
 
-print_metrics(y_test, y_pred, "Test Set")
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, None where it cannot be measured"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+def print_peak_rss():
+    peak = peak_rss_mb()
+    print(f"Peak RSS: {peak:.0f} MB" if peak is not None else "Peak RSS: not available on this platform")
+
+def holdout_mask(chunk: pd.DataFrame, holdout_pct: float) -> np.ndarray:
+    """
+    Hold-out rows chosen by a hash of their content, so the split does not
+    depend on chunk size, row order or how much data was seen before.
+    """
+    rows = chunk[feature_cols + target_cols].astype({col: "float64" for col in numeric_features + target_cols})
+    hashes = pd.util.hash_pandas_object(rows, index=False).to_numpy()
+    return hashes % 10000 < holdout_pct * 100
+
+class Reservoir:
+    """Uniform random sample of at most `size` rows from a stream of 2-D blocks (Algorithm R)"""
+
+    def __init__(self, size: int, rng: np.random.Generator):
+        self.size = size
+        self.rng = rng
+        self.seen = 0
+        self.rows = None
+
+    def add(self, block: np.ndarray):
+        if self.rows is None:
+            self.rows = np.empty((self.size, block.shape[1]), dtype=block.dtype)
+        positions = self.seen + np.arange(len(block))
+        # The i-th row overall replaces a random slot with probability size / (i + 1)
+        slots = np.where(positions < self.size, positions, self.rng.integers(0, positions + 1))
+        keep = slots < self.size
+        self.rows[slots[keep]] = block[keep]
+        self.seen += len(block)
+
+    def sample(self) -> np.ndarray:
+        if self.rows is None:
+            return np.empty((0, 0))
+        return self.rows[:min(self.seen, self.size)]
+
+def encode_chunk(chunk: pd.DataFrame, vocab: dict) -> np.ndarray:
+    """Category codes, then sowing_doy, then the targets, as one float64 block"""
+    codes = [
+        pd.Index(vocab[col]).get_indexer(np.asarray(chunk[col], dtype=object))
+        for col in categorical_features
+    ]
+    numeric = chunk[numeric_features + target_cols].to_numpy(dtype=np.float64)
+    return np.column_stack(codes + [numeric])
+
+def decode_rows(rows: np.ndarray, vocab: dict):
+    """(X, y) DataFrames back from encode_chunk's layout"""
+    n_cat = len(categorical_features)
+    X = pd.DataFrame({
+        col: pd.Categorical.from_codes(rows[:, i].astype(np.int64), vocab[col])
+        for i, col in enumerate(categorical_features)
+    })
+    for i, col in enumerate(numeric_features):
+        X[col] = rows[:, n_cat + i]
+    y = pd.DataFrame(rows[:, n_cat + len(numeric_features):], columns=target_cols)
+    return X[feature_cols], y
+
+def train_streaming(args) -> Pipeline:
+    """
+    Trains from fixed-size chunks so memory does not grow with the input:
+    one pass collects the category vocabularies, a second keeps a bounded
+    uniform sample of the training rows and of the hash-selected hold-out
+    rows, and the forest is fit on that sample.
+    """
+    columns = feature_cols + target_cols
+
+    # 1) First pass: category vocabularies
+    vocab = {col: set() for col in categorical_features}
+    n_rows = 0
+    for chunk in iter_chunks(args.data, args.chunk_size, columns):
+        chunk = chunk.dropna(subset=target_cols)
+        for col in categorical_features:
+            vocab[col].update(str(value) for value in chunk[col].dropna().unique())
+        n_rows += len(chunk)
+    vocab = {col: sorted(values) for col, values in vocab.items()}
+    print(f"Pass 1: {n_rows} rows, " + ", ".join(f"{len(vocab[col])} {col}s" for col in categorical_features))
+
+    # 2) Second pass + 3) hash-based train/hold-out split, keeping a bounded sample of each side
+    rng = np.random.default_rng(RANDOM_STATE)
+    train = Reservoir(args.max_train_rows, rng)
+    holdout = Reservoir(args.max_holdout_rows, rng)
+    for chunk in iter_chunks(args.data, args.chunk_size, columns):
+        chunk = chunk.dropna(subset=target_cols)
+        block = encode_chunk(chunk, vocab)
+        is_holdout = holdout_mask(chunk, args.holdout_pct)
+        train.add(block[~is_holdout])
+        holdout.add(block[is_holdout])
+    print(f"Pass 2: training on {len(train.sample())} of {train.seen} rows, "
+          f"evaluating on {len(holdout.sample())} of {holdout.seen} hold-out rows")
+
+    # 4) Preprocessing + 5) Model, with the vocabularies from the first pass
+    categories = [vocab[col] for col in categorical_features]
+    pipeline = build_pipeline(args.model, args.n_estimators, categories)
+
+    # 6) Train model
+    X_train, y_train = decode_rows(train.sample(), vocab)
+    print(f"Training {args.model} model with {args.n_estimators} trees per forest...")
+    pipeline.fit(X_train, y_train)
+    print("Model training completed!")
+
+    # 7) Evaluation
+    if holdout.seen:
+        X_holdout, y_holdout = decode_rows(holdout.sample(), vocab)
+        print_metrics(y_holdout, pipeline.predict(X_holdout), "Hold-out Set")
+    print_peak_rss()
+    return pipeline
+
+def benchmark_pipeline(pipeline, X_test, n_single: int = 50) -> dict:
+    """File size, load time and single-row / batch predict latency of a fitted pipeline"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "model.joblib")
+        joblib.dump(pipeline, path)
+        size_mb = os.path.getsize(path) / 1e6
+        start = time.perf_counter()
+        loaded = joblib.load(path)
+        load_s = time.perf_counter() - start
+
+    row = X_test.iloc[:1]
+    loaded.predict(row)  # warm-up
+    timings = []
+    for _ in range(n_single):
+        start = time.perf_counter()
+        loaded.predict(row)
+        timings.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    loaded.predict(X_test)
+    batch_s = time.perf_counter() - start
+
+    return {
+        "size_mb": size_mb,
+        "load_s": load_s,
+        "single_ms": float(np.median(timings)) * 1000,
+        "batch_ms": batch_s * 1000,
+    }
+
+def compare_models(X_train, X_test, y_train, y_test, candidates):
+    """Train each (kind, n_estimators) candidate and print a side-by-side report"""
+    reports = []
+    for kind, n_estimators in candidates:
+        name = f"{kind}({n_estimators})"
+        print(f"Training {name}...")
+        pipeline = build_pipeline(kind, n_estimators)
+        start = time.perf_counter()
+        pipeline.fit(X_train, y_train)
+        fit_s = time.perf_counter() - start
+
+        y_pred = pipeline.predict(X_test)
+        rmse = [np.sqrt(mean_squared_error(y_test[col], y_pred[:, i])) for i, col in enumerate(target_cols)]
+        r2 = [r2_score(y_test[col], y_pred[:, i]) for i, col in enumerate(target_cols)]
+        reports.append((name, fit_s, rmse, r2, benchmark_pipeline(pipeline, X_test)))
+
+    names = [report[0] for report in reports]
+    width = max(24, *(len(name) + 2 for name in names))
+    print("\n" + "target".ljust(24) + "".join(name.rjust(width) for name in names))
+    for i, col in enumerate(target_cols):
+        cells = "".join(f"{report[2][i]:.2f} / {report[3][i]:.3f}".rjust(width) for report in reports)
+        print(col.ljust(24) + cells)
+    print("(cells are RMSE / R2)")
+
+    rows = [
+        ("fit time (s)", lambda r: f"{r[1]:.1f}"),
+        ("model size (MB)", lambda r: f"{r[4]['size_mb']:.1f}"),
+        ("load time (s)", lambda r: f"{r[4]['load_s']:.2f}"),
+        ("single-row predict (ms)", lambda r: f"{r[4]['single_ms']:.2f}"),
+        (f"batch predict {len(X_test)} (ms)", lambda r: f"{r[4]['batch_ms']:.1f}"),
+    ]
+    for label, fmt in rows:
+        print(label.ljust(24) + "".join(fmt(report).rjust(width) for report in reports))
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Train the Odisha crop prediction pipeline")
+    parser.add_argument("--data", default=DATA_PATH,
+                        help="crop CSV to train on, e.g. synthetic/odisha_all_districts_crop_data.csv from synth_data.py")
+    parser.add_argument("--output", "--pipe-path", dest="output", default=None,
+                        help=f"where to save the pipeline; defaults to {PIPE_PATH} for the production CSV "
+                             f"and to a file next to --data for any other dataset")
+    parser.add_argument("--model", choices=MODEL_KINDS, default="multioutput",
+                        help="multioutput: one forest per target (default), native: one multi-output forest")
+    parser.add_argument("--n-estimators", type=int, default=200, help="trees per forest")
+    parser.add_argument("--compare", action="store_true",
+                        help="train the 12-forest baseline and the native forest and print a side-by-side report")
+    parser.add_argument("--compare-estimators", type=int, default=100,
+                        help="trees of the native forest in --compare mode; one forest serves all 12 targets, "
+                             "so it is compared at a smaller size than the --n-estimators baseline")
+    parser.add_argument("--search", action="store_true",
+                        help="k-fold cross-validated hyperparameter search over a process pool, writes a leaderboard")
+    parser.add_argument("--grid", default=None,
+                        help="--search grid, e.g. 'kind=native;n_estimators=50,100;max_depth=None,20'")
+    parser.add_argument("--folds", type=int, default=5, help="cross-validation folds in --search mode")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count(), help="worker processes in --search mode")
+    parser.add_argument("--stream", action="store_true",
+                        help="train from chunks with bounded memory instead of loading the whole dataset")
+    parser.add_argument("--chunk-size", type=int, default=100_000, help="rows per chunk in --stream mode")
+    parser.add_argument("--max-train-rows", type=int, default=500_000,
+                        help="size of the uniform training sample kept in --stream mode")
+    parser.add_argument("--max-holdout-rows", type=int, default=100_000,
+                        help="size of the hold-out sample kept in --stream mode")
+    parser.add_argument("--holdout-pct", type=float, default=20.0,
+                        help="percentage of rows hashed into the hold-out set in --stream mode")
+    return parser.parse_args()
+
+def default_output(data_path: str) -> str:
+    """
+    PIPE_PATH for the production CSV, else a pipeline next to the dataset,
+    so training on e.g. synthetic/ data never replaces the served model
+    """
+    if os.path.abspath(data_path) == os.path.abspath(DATA_PATH):
+        return PIPE_PATH
+    output = os.path.join(os.path.dirname(data_path), PIPE_PATH)
+    if os.path.abspath(output) == os.path.abspath(PIPE_PATH):
+        output = os.path.splitext(data_path)[0] + "_pipeline.joblib"
+    return output
+
+def train_in_memory(args):
+    """The original flow on a fully loaded DataFrame; returns None after --compare"""
+    df = load_dataset(args.data)
+
+    X = df[feature_cols]
+    y = df[target_cols]
+
+    # 3) Train/test split
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=0.2, random_state=RANDOM_STATE
+    )
+
+    if args.compare:
+        compare_models(X_train, X_test, y_train, y_test, [("multioutput", args.n_estimators), ("native", args.compare_estimators)])
+        return None
+
+    # 4) Preprocessing + 5) Model
+    pipeline = build_pipeline(args.model, args.n_estimators)
+
+    # 6) Train model
+    print(f"Training {args.model} model with {args.n_estimators} trees per forest...")
+    pipeline.fit(X_train, y_train)
+    print("Model training completed!")
+
+    # 7) Evaluation
+    y_pred = pipeline.predict(X_test)
+    print_metrics(y_test, y_pred, "Test Set")
+    print_peak_rss()
+    return pipeline
+
+def main():
+    args = parse_args()
+    if args.search:
+        from model_search import DEFAULT_SEARCH_GRID, run_search
+        args.grid = args.grid or DEFAULT_SEARCH_GRID
+        run_search(args)
+        return
+
+    pipeline = train_streaming(args) if args.stream else train_in_memory(args)
+    if pipeline is None:
+        return
+
+    # 8) Save pipeline
+    pipe_path = args.output or default_output(args.data)
+    if os.path.dirname(pipe_path):
+        os.makedirs(os.path.dirname(pipe_path), exist_ok=True)
+    joblib.dump(pipeline, pipe_path)
+    print(f"✅ Model trained and saved as {pipe_path}")
+
+    # Flat, memory-mappable copy of the forest for MODEL_LOAD_MODE=mmap
+    print(f"✅ Forest exported to {export_forest(pipeline, pipe_path)}")
+
+    # 9) Precompute predictions over every (district, crop, season, sowing_doy)
+    print("Precomputing prediction grid...")
+    districts, crops, seasons = model_categories(pipeline)
+    grid = build_prediction_grid(pipeline, districts, crops, seasons)
+    save_prediction_grid(grid, districts, crops, seasons, pipe_path)
+    print(f"✅ Prediction grid {grid.shape} saved as {grid_paths(pipe_path)[0]}")
 
-# 8) Save pipeline
-joblib.dump(pipeline, "odisha_crop_pipeline.joblib")
-print("✅ Model trained and saved as odisha_crop_pipeline.joblib")
+    # 10) Print information about the model outputs
+    print(f"\nModel is configured to predict {len(target_cols)} outputs in this order:")
+    for i, col in enumerate(target_cols):
+        print(f"{i}: {col}")
 
-# 9) Print information about the model outputs
-print(f"\nModel is configured to predict {len(target_cols)} outputs in this order:")
-for i, col in enumerate(target_cols):
-    print(f"{i}: {col}")
\ No newline at end of file
+if __name__ == "__main__":
+    main()